@@ -2,15 +2,23 @@
 
 from tkinter import *
 from tkinter import ttk, filedialog, messagebox
-from extract_pdf_fields import ExtractPdfFields
+from run_metrics import configure_logging
 from Utils import Settings
 from datetime import datetime
+import multiprocessing
 import os
+import queue
 import sys
+import threading
 import time
 
 version = sys.version_info
 
+def warm_extractor():
+    # Runs in a background thread once the window is up: the extraction modules
+    # are imported ahead of the first run, off the GUI thread.
+    import batch_extract
+
 class EPFGUI(Tk):
 
     def __init__(self, master=None):
@@ -18,6 +26,11 @@ class EPFGUI(Tk):
 
         self.finished = False # indicator of completion of PDF extraction job
         self.n_pdf_processed = 0 # number of PDF files processed
+        self.messages = queue.Queue() # progress messages from the extraction thread
+        self.cancel_event = threading.Event() # set to stop the extraction thread
+        self.worker = None # the extraction thread
+        self.start_time = None # start time of the extraction job
+        self.cancelled = False # whether the extraction job was cancelled
         self.dark_bg = '#333333'
         self.light_font = '#f2f2f2'
         self.theme_color = '#0074BF'
@@ -25,7 +38,7 @@ class EPFGUI(Tk):
 
         self.title('PDF Extraction Tool')
         self.resizable(width=False, height=False)
-        self.json_ftypes = [('JSON', '*.json')]
+        self.json_ftypes = [('JSON', '*.json'), ('Compiled template', '*.qtpl')]
 
         # ------------------------------------------- General Settings ----------------------------------------------
         # The content frame will hold all widgets
@@ -66,7 +79,9 @@ class EPFGUI(Tk):
         self.file_dir_inputs = (self.pdf_input, self.json_input, self.out_input)
         self.run_button = EPFRunButton(self.content, text='Run', command=self.run_pdf_extraction)
         self.reset_button = EPFButton(self.content, text='Reset', command=self.reset_input)
+        self.cancel_button = EPFButton(self.content, text='Cancel', command=self.cancel_pdf_extraction)
         self.progress = ttk.Progressbar(self.content, orient=HORIZONTAL, length=100, mode='determinate') # progress bar
+        self.status = Label(self.content, text='', bg=self.dark_bg, fg=self.light_font, anchor=W) # throughput and ETA
 
         # ----------------------------------------- Add Widgets to Window --------------------------------------------
         padx, pady = 4, 4
@@ -91,6 +106,9 @@ class EPFGUI(Tk):
         self.out_button.grid(column=4, row=2, sticky=W, pady=pady)
 
         self.set_screen_position()
+        self.protocol('WM_DELETE_WINDOW', self.close_window)
+        # The window is drawn before the extraction modules are imported.
+        self.after_idle(lambda: threading.Thread(target=warm_extractor, daemon=True).start())
 
         # # TODO: Remove
         # ----------- TEST ONLY ----------------
@@ -100,40 +118,71 @@ class EPFGUI(Tk):
 
 
     def run_pdf_extraction(self):
+        self.finished = False
         self.n_pdf_processed = 0
         self.progress['value'] = 0
         self.progress.pack(side=RIGHT, anchor=E, padx=(0, 4), pady=(4, 0))
+        self.cancel_button.config(state=NORMAL)
+        self.cancel_button.pack(side=RIGHT, anchor=E, padx=(0, 4), pady=(4, 0))
+        self.status.config(text='Loading questionnaire...')
+        self.status.pack(side=LEFT, anchor=W, pady=(4, 0))
+        self.run_button.config(state=DISABLED, bg='#99d6ff')
+        self.reset_button.config(state=DISABLED)
         settings = self.create_settings()
-        pdf_fp = settings.pdf_dir
-        info_fp = settings.json_dir
-        out_fp = settings.out_dir
-        now = datetime.now().strftime('%Y%m%d_%H%M%S')
-        # if pdf_fp is a single PDF file dir, export once
-        if os.path.isfile(pdf_fp):
-            epf = ExtractPdfFields(pdf_fp, info_fp, out_fp, now)
-            epf.export()
-            self.n_pdf_processed+=1
-            self.finished = True
-        elif os.path.isdir(pdf_fp):
-            # The list of files in the folder.
-            fs = os.listdir(pdf_fp)
-            # The list of PDF files in the folder.
-            pdfs = [x for x in fs if os.path.splitext(x)[1].lower() == '.pdf']
-            for pdf in pdfs:
-                pdf_fp_file = pdf_fp + '/' + pdf
-                epf = ExtractPdfFields(pdf_fp_file, info_fp, out_fp, now)
-                epf.export()
-                self.n_pdf_processed += 1
-                self.progress['value']+=100/len(pdfs)
-                self.update_idletasks()
-            self.progress['value']=100
-            self.finished = True
-
-        else:
-            pass
-        self.check_process()
+        self.cancel_event.clear()
+        self.start_time = time.time()
+        # The extraction runs in a worker thread, so the window stays responsive.
+        # The thread only talks to the GUI through the message queue.
+        self.worker = threading.Thread(target=self.extract, args=(settings,), daemon=True)
+        self.worker.start()
+        self.after(100, self.check_process)
         return None
 
+    def extract(self, settings):
+        # Runs in the worker thread: no tkinter calls here.
+        try:
+            # Usually already imported by warm_extractor.
+            from batch_extract import BatchExtractor
+            from extract_pdf_fields import OUTPUT_DEFERRED
+            now = datetime.now().strftime('%Y%m%d_%H%M%S')
+            # Parse the PDFs over a process pool; this thread writes the master files.
+            # The per-PDF XLSX files are converted in parallel once the master files
+            # are done.
+            # This process runs Tk, so the workers are spawned rather than forked.
+            batch = BatchExtractor(settings.pdf_dir, settings.json_dir, settings.out_dir, now,
+                                   output=OUTPUT_DEFERRED,
+                                   mp_context=multiprocessing.get_context('spawn'))
+            batch.run(callback=self.update_progress, cancel=self.cancel_event)
+            self.messages.put(('done', batch.n_processed, batch.cancelled))
+        except Exception as e:
+            self.messages.put(('error', str(e)))
+
+    def update_progress(self, n, total):
+        # Called from the worker thread.
+        self.messages.put(('progress', n, total))
+
+    def show_progress(self, n, total):
+        self.n_pdf_processed = n
+        self.progress['value'] = 100*n/total
+        elapsed = time.time() - self.start_time
+        rate = n/elapsed if elapsed > 0 else 0
+        eta = (total - n)/rate if rate > 0 else 0
+        if n == total:
+            self.status.config(text='%s/%s PDF files - writing output files...' % (n, total))
+        elif not self.cancel_event.is_set():
+            self.status.config(text='%s/%s PDF files - %.1f files/s - ETA %d:%02d'
+                                    % (n, total, rate, eta//60, eta % 60))
+
+    def cancel_pdf_extraction(self):
+        # The worker thread stops after the PDF in progress.
+        self.cancel_event.set()
+        self.cancel_button.config(state=DISABLED)
+        self.status.config(text='Cancelling...')
+
+    def close_window(self):
+        self.cancel_event.set()
+        self.destroy()
+
     def create_settings(self):
         # The inputs are linked to a tkinter variable. Those values will have to be retrieved from each variable
         # and passed on to the settings objects
@@ -162,6 +211,7 @@ class EPFGUI(Tk):
         for input in self.file_dir_inputs:
             input.delete(0, END)
         self.progress.pack_forget()
+        self.status.pack_forget()
 
     def set_screen_position(self):
         self.update()
@@ -172,12 +222,43 @@ class EPFGUI(Tk):
         self.geometry('%dx%d+%d+%d' % (w, h, x, y))
 
     def check_process(self):
-        # Check every 1000 ms whether the process is finished
+        # Drain the messages of the worker thread every 100 ms, until it is finished
+        try:
+            while True:
+                msg = self.messages.get_nowait()
+                if msg[0] == 'progress':
+                    self.show_progress(msg[1], msg[2])
+                elif msg[0] == 'done':
+                    self.n_pdf_processed = msg[1]
+                    self.cancelled = msg[2]
+                    self.finished = True
+                elif msg[0] == 'error':
+                    self.finished = True
+                    self.end_pdf_extraction()
+                    self.progress.pack_forget()
+                    self.status.config(text='Failed')
+                    messagebox.showerror('', 'Extraction failed: %s' % msg[1])
+                    return
+        except queue.Empty:
+            pass
         if self.finished:
-            messagebox.showinfo('', 'Extraction completed: %s PDF files processed.'
-                                    '\nOutput saved at %s' % (self.n_pdf_processed, self.out_dir.get()))
+            self.end_pdf_extraction()
+            if self.cancelled:
+                self.status.config(text='Cancelled')
+                messagebox.showinfo('', 'Extraction cancelled: %s PDF files processed.'
+                                        '\nOutput saved at %s' % (self.n_pdf_processed, self.out_dir.get()))
+            else:
+                self.progress['value'] = 100
+                self.status.config(text='Done')
+                messagebox.showinfo('', 'Extraction completed: %s PDF files processed.'
+                                        '\nOutput saved at %s' % (self.n_pdf_processed, self.out_dir.get()))
         else:
-            self.after(1000, self.check_process)
+            self.after(100, self.check_process)
+
+    def end_pdf_extraction(self):
+        self.cancel_button.pack_forget()
+        self.reset_button.config(state=NORMAL)
+        self.check_file_entries()
 
 class EPFEntry(Entry):
     def __init__(self, parent=None, **kwargs):
@@ -246,7 +327,17 @@ class CreateToolTip(object):
         if tw:
             tw.destroy()
 
-gui = EPFGUI()
-gui.mainloop()
+if __name__ == '__main__':
+    # Needed for the process pool in the frozen executable.
+    multiprocessing.freeze_support()
+    # Progress lines on the console, as before; pass 'DEBUG' to log every scored field.
+    configure_logging()
+    gui = EPFGUI()
+    if '--probe' in sys.argv[1:]:
+        # Startup timing (benchmarks/bench_startup.py): close once drawn.
+        gui.update_idletasks()
+        gui.destroy()
+    else:
+        gui.mainloop()
 
 # TODO: allow pdf input to be either file or directory - hard
\ No newline at end of file
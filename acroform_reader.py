@@ -0,0 +1,704 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+acroform_reader.py
+
+A lightweight reader for the interactive form fields of a PDF. Rather than
+parsing the whole document as PyPDF3 does, it follows the cross-reference
+table from the trailer to the /AcroForm dictionary and resolves only the
+field objects that it references. The file is read through a memory map.
+Anything the reader does not handle (encryption, unusual filters, broken
+cross-reference tables) raises AcroFormReadError, and read_fields falls back
+to PyPDF3.
+"""
+
+
+from collections import namedtuple
+import codecs
+import mmap
+import re
+import zlib
+
+
+# An indirect reference to object num, generation gen.
+IndirectRef = namedtuple('IndirectRef', ['num', 'gen'])
+
+# The attributes that mark a dictionary as a field, as in PyPDF3.getFields.
+FIELD_ATTRIBUTES = ('/FT', '/Parent', '/T', '/TU', '/TM', '/Ff', '/V', '/DV')
+
+# The attributes copied to each returned field, as in PyPDF3.generic.Field.
+# /Parent and /Kids are left as references; all others are resolved.
+FIELD_COPY = ('/FT', '/Parent', '/Kids', '/T', '/TU', '/TM', '/Ff', '/V',
+              '/DV', '/AA')
+
+_WHITESPACE = b' \t\n\r\f\x00'
+_DELIMITERS = b'()<>[]{}/%'
+_RE_NAME = re.compile(rb'/([^\s()<>\[\]{}/%]*)')
+_RE_NUMBER = re.compile(rb'[+-]?(?:\d+\.?\d*|\.\d+)')
+_RE_REF = re.compile(rb'\s+(\d+)\s+R(?=[\s()<>\[\]{}/%]|$)')
+_RE_KEYWORD = re.compile(rb'[A-Za-z]+')
+_RE_OBJ = re.compile(rb'\s*(\d+)\s+(\d+)\s+obj')
+_RE_XREF_SUBSECTION = re.compile(rb'\s*(\d+)\s+(\d+)')
+_RE_XREF_ENTRY = re.compile(rb'\s*(\d{1,10})\s+(\d{1,5})\s+([nf])')
+_LITERAL_ESCAPES = {ord('n'): b'\n', ord('r'): b'\r', ord('t'): b'\t',
+                    ord('b'): b'\b', ord('f'): b'\f', ord('('): b'(',
+                    ord(')'): b')', ord('\\'): b'\\'}
+
+
+def _pdf_doc_encoding():
+    """
+    Parameters: None
+    Returns:    table: list
+                    The PDFDocEncoding code points, with None where the byte
+                    is undefined (the same table as PyPDF3 uses).
+    """
+
+    table = [None] * 24
+    table += [0x02d8, 0x02c7, 0x02c6, 0x02d9, 0x02dd, 0x02db, 0x02da, 0x02dc]
+    table += list(range(0x20, 0x7f)) + [None]
+    table += [0x2022, 0x2020, 0x2021, 0x2026, 0x2014, 0x2013, 0x0192, 0x2044,
+              0x2039, 0x203a, 0x2212, 0x2030, 0x201e, 0x201c, 0x201d, 0x2018,
+              0x2019, 0x201a, 0x2122, 0xfb01, 0xfb02, 0x0141, 0x0152, 0x0160,
+              0x0178, 0x017d, 0x0131, 0x0142, 0x0153, 0x0161, 0x017e, None]
+    table += [0x20ac] + list(range(0xa1, 0x100))
+    table[0xad] = None
+    return [chr(x) if x is not None else None for x in table]
+
+
+_PDF_DOC_ENCODING = _pdf_doc_encoding()
+
+
+class AcroFormReadError(Exception):
+    """
+    Raised when the reader cannot handle a PDF, and the caller should fall
+    back to PyPDF3.
+    """
+
+
+def decode_text_string(data):
+    """
+    Parameters: data: bytes
+                    The raw bytes of a PDF string.
+    Returns:    w: str or bytes
+                    The decoded text. As with PyPDF3.createStringObject, the
+                    bytes are returned unchanged if they are neither UTF-16
+                    nor valid PDFDocEncoding (e.g. text with line breaks).
+    """
+
+    if data.startswith(codecs.BOM_UTF16_BE):
+        return data.decode('utf-16')
+    chars = [_PDF_DOC_ENCODING[x] for x in data]
+    if None in chars:
+        return bytes(data)
+    return ''.join(chars)
+
+
+class _Parser:
+    """
+    Parser of PDF objects in a buffer (a memory map, or decoded stream bytes).
+    """
+
+    def __init__(self, buf):
+        """
+        Parameters: buf: bytes-like
+                        The buffer to parse.
+        Returns:    None
+        """
+
+        self.buf = buf
+
+    def skip(self, pos):
+        """
+        Parameters: pos: int
+                        A position in the buffer.
+        Returns:    pos: int
+                        The position of the next token, after any whitespace
+                        and comments.
+        """
+
+        buf = self.buf
+        n = len(buf)
+        while pos < n:
+            c = buf[pos]
+            if c in _WHITESPACE:
+                pos += 1
+            elif c == 0x25:
+                # A comment runs to the end of the line.
+                while pos < n and buf[pos] not in b'\r\n':
+                    pos += 1
+            else:
+                break
+        return pos
+
+    def parse(self, pos):
+        """
+        Parameters: pos: int
+                        The position at which an object starts.
+        Returns:    obj: object
+                        The parsed object. Dictionaries are dict, arrays are
+                        list, names are str starting with '/', strings are
+                        str or bytes and references are IndirectRef.
+                    pos: int
+                        The position after the object.
+        """
+
+        buf = self.buf
+        pos = self.skip(pos)
+        if pos >= len(buf):
+            raise AcroFormReadError('Unexpected end of data.')
+        c = buf[pos]
+        if c == 0x2f:
+            m = _RE_NAME.match(buf, pos)
+            return self._name(m.group(1)), m.end()
+        if c == 0x3c:
+            if buf[pos + 1:pos + 2] == b'<':
+                return self._dict(pos + 2)
+            return self._hex_string(pos + 1)
+        if c == 0x5b:
+            return self._array(pos + 1)
+        if c == 0x28:
+            return self._literal_string(pos + 1)
+        m = _RE_NUMBER.match(buf, pos)
+        if m:
+            token = m.group(0)
+            if b'.' in token:
+                return float(token), m.end()
+            # An integer may be the start of an indirect reference.
+            r = _RE_REF.match(buf, m.end())
+            if r:
+                return IndirectRef(int(token), int(r.group(1))), r.end()
+            return int(token), m.end()
+        m = _RE_KEYWORD.match(buf, pos)
+        if m:
+            word = m.group(0)
+            if word == b'true':
+                return True, m.end()
+            if word == b'false':
+                return False, m.end()
+            if word == b'null':
+                return None, m.end()
+        raise AcroFormReadError('Unexpected token at offset %d.' % pos)
+
+    def _name(self, raw):
+        """
+        Parameters: raw: bytes
+                        The name without the leading '/'.
+        Returns:    name: str
+                        The name, with '#xx' escapes decoded.
+        """
+
+        if b'#' in raw:
+            raw = re.sub(rb'#([0-9A-Fa-f]{2})', lambda m: bytes([int(m.group(1), 16)]), raw)
+        try:
+            return '/' + raw.decode('utf-8')
+        except UnicodeDecodeError:
+            return '/' + raw.decode('latin-1')
+
+    def _dict(self, pos):
+        """
+        Parameters: pos: int
+                        The position after '<<'.
+        Returns:    d: dict
+                    pos: int
+        """
+
+        buf = self.buf
+        d = {}
+        while True:
+            pos = self.skip(pos)
+            if buf[pos:pos + 2] == b'>>':
+                return d, pos + 2
+            key, pos = self.parse(pos)
+            if not isinstance(key, str) or not key.startswith('/'):
+                raise AcroFormReadError('Dictionary key is not a name.')
+            d[key], pos = self.parse(pos)
+
+    def _array(self, pos):
+        """
+        Parameters: pos: int
+                        The position after '['.
+        Returns:    a: list
+                    pos: int
+        """
+
+        buf = self.buf
+        a = []
+        while True:
+            pos = self.skip(pos)
+            if buf[pos:pos + 1] == b']':
+                return a, pos + 1
+            obj, pos = self.parse(pos)
+            a.append(obj)
+
+    def _hex_string(self, pos):
+        """
+        Parameters: pos: int
+                        The position after '<'.
+        Returns:    w: str or bytes
+                    pos: int
+        """
+
+        end = self.buf.find(b'>', pos)
+        if end < 0:
+            raise AcroFormReadError('Unterminated hex string.')
+        digits = bytes(x for x in self.buf[pos:end] if x not in _WHITESPACE)
+        if len(digits) % 2:
+            digits += b'0'
+        try:
+            data = bytes.fromhex(digits.decode('ascii'))
+        except ValueError:
+            raise AcroFormReadError('Invalid hex string.')
+        return decode_text_string(data), end + 1
+
+    def _literal_string(self, pos):
+        """
+        Parameters: pos: int
+                        The position after '('.
+        Returns:    w: str or bytes
+                    pos: int
+        """
+
+        buf = self.buf
+        n = len(buf)
+        out = bytearray()
+        depth = 1
+        while pos < n:
+            c = buf[pos]
+            if c == 0x5c:
+                pos += 1
+                e = buf[pos]
+                if e in _LITERAL_ESCAPES:
+                    out += _LITERAL_ESCAPES[e]
+                    pos += 1
+                elif 0x30 <= e <= 0x37:
+                    # Up to three octal digits.
+                    end = pos
+                    while end < pos + 3 and 0x30 <= buf[end] <= 0x37:
+                        end += 1
+                    out.append(int(buf[pos:end], 8) & 0xff)
+                    pos = end
+                elif e == 0x0d:
+                    # A line continuation.
+                    pos += 2 if buf[pos + 1:pos + 2] == b'\n' else 1
+                elif e == 0x0a:
+                    pos += 1
+                else:
+                    out.append(e)
+                    pos += 1
+                continue
+            if c == 0x28:
+                depth += 1
+            elif c == 0x29:
+                depth -= 1
+                if depth == 0:
+                    return decode_text_string(bytes(out)), pos + 1
+            out.append(c)
+            pos += 1
+        raise AcroFormReadError('Unterminated literal string.')
+
+
+class AcroFormReader:
+    """
+    Class used to read the form fields of a PDF, resolving only the objects
+    reachable from the /AcroForm dictionary. Use as a context manager, or call
+    close() when done.
+    """
+
+    def __init__(self, pdf_fp):
+        """
+        Parameters: pdf_fp: str
+                        The path to the PDF file.
+        Returns:    None
+        """
+
+        self._pdf_file_path = pdf_fp
+        self._file = open(pdf_fp, 'rb')
+        try:
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # An empty file cannot be memory mapped.
+            self._file.close()
+            raise AcroFormReadError('Empty file.')
+        self._parser = _Parser(self._buf)
+        # Object number to ('n', offset) or ('c', object stream, index).
+        self._xref = {}
+        self._trailer = {}
+        self._objects = {}
+        self._object_streams = {}
+        try:
+            self._read_xref()
+        except (IndexError, ValueError, zlib.error) as e:
+            self.close()
+            raise AcroFormReadError('Malformed cross-reference data: %s' % e)
+        except AcroFormReadError:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        if self._buf is not None:
+            self._buf.close()
+            self._buf = None
+        self._file.close()
+
+    def _read_xref(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        buf = self._buf
+        tail = max(0, len(buf) - 1024)
+        i = buf.rfind(b'startxref', tail)
+        if i < 0:
+            raise AcroFormReadError('No startxref found.')
+        offset, _ = self._parser.parse(i + len(b'startxref'))
+        seen = set()
+        # Follow the /Prev chain from the newest section to the oldest. The
+        # first entry found for an object number is the current one.
+        while offset is not None:
+            if not isinstance(offset, int) or offset in seen or offset >= len(buf):
+                raise AcroFormReadError('Invalid cross-reference offset.')
+            seen.add(offset)
+            pos = self._parser.skip(offset)
+            if buf[pos:pos + 4] == b'xref':
+                trailer = self._read_xref_table(pos + 4)
+                # Hybrid files also carry an xref stream.
+                if isinstance(trailer.get('/XRefStm'), int):
+                    self._read_xref_stream(trailer['/XRefStm'])
+            else:
+                trailer = self._read_xref_stream(pos)
+            for key, val in trailer.items():
+                self._trailer.setdefault(key, val)
+            offset = trailer.get('/Prev')
+        if '/Encrypt' in self._trailer:
+            raise AcroFormReadError('Encrypted PDFs are not supported.')
+        if '/Root' not in self._trailer:
+            raise AcroFormReadError('Trailer has no /Root.')
+
+    def _read_xref_table(self, pos):
+        """
+        Parameters: pos: int
+                        The position after the 'xref' keyword.
+        Returns:    trailer: dict
+        """
+
+        buf = self._buf
+        while True:
+            pos = self._parser.skip(pos)
+            if buf[pos:pos + 7] == b'trailer':
+                trailer, _ = self._parser.parse(pos + 7)
+                return trailer
+            m = _RE_XREF_SUBSECTION.match(buf, pos)
+            if not m:
+                raise AcroFormReadError('Invalid xref subsection.')
+            start, count = int(m.group(1)), int(m.group(2))
+            pos = m.end()
+            for num in range(start, start + count):
+                e = _RE_XREF_ENTRY.match(buf, pos)
+                if not e:
+                    raise AcroFormReadError('Invalid xref entry.')
+                pos = e.end()
+                if num in self._xref:
+                    continue
+                if e.group(3) == b'n':
+                    self._xref[num] = ('n', int(e.group(1)), int(e.group(2)))
+                else:
+                    self._xref[num] = None
+
+    def _read_xref_stream(self, pos):
+        """
+        Parameters: pos: int
+                        The position of the xref stream object.
+        Returns:    trailer: dict
+                        The stream dictionary, which doubles as the trailer.
+        """
+
+        _, _, obj, data = self._read_indirect(pos)
+        if not isinstance(obj, dict) or obj.get('/Type') != '/XRef':
+            raise AcroFormReadError('Expected an xref stream.')
+        widths = obj['/W']
+        size = obj['/Size']
+        index = obj.get('/Index', [0, size])
+        k = 0
+        for s in range(0, len(index), 2):
+            start, count = index[s], index[s + 1]
+            for num in range(start, start + count):
+                fields = []
+                for w in widths:
+                    fields.append(int.from_bytes(data[k:k + w], 'big') if w else None)
+                    k += w
+                if num in self._xref:
+                    continue
+                kind = 1 if widths[0] == 0 else fields[0]
+                if kind == 1:
+                    self._xref[num] = ('n', fields[1], fields[2] or 0)
+                elif kind == 2:
+                    self._xref[num] = ('c', fields[1], fields[2])
+                else:
+                    self._xref[num] = None
+        if k > len(data):
+            raise AcroFormReadError('Truncated xref stream.')
+        return obj
+
+    def _read_indirect(self, pos):
+        """
+        Parameters: pos: int
+                        The position of an 'n g obj' header.
+        Returns:    num: int
+                    gen: int
+                    obj: object
+                    data: bytes
+                        The decoded stream data, or None if the object is
+                        not a stream.
+        """
+
+        m = _RE_OBJ.match(self._buf, pos)
+        if not m:
+            raise AcroFormReadError('No object at offset %d.' % pos)
+        obj, pos = self._parser.parse(m.end())
+        data = None
+        pos = self._parser.skip(pos)
+        if self._buf[pos:pos + 6] == b'stream':
+            pos += 6
+            if self._buf[pos:pos + 2] == b'\r\n':
+                pos += 2
+            elif self._buf[pos:pos + 1] in (b'\n', b'\r'):
+                pos += 1
+            length = self.resolve(obj.get('/Length'))
+            if not isinstance(length, int):
+                raise AcroFormReadError('Stream has no valid /Length.')
+            data = self._decode_stream(obj, self._buf[pos:pos + length])
+        return int(m.group(1)), int(m.group(2)), obj, data
+
+    def _decode_stream(self, obj, data):
+        """
+        Parameters: obj: dict
+                        The stream dictionary.
+                    data: bytes
+                        The raw stream data.
+        Returns:    data: bytes
+                        The decoded data.
+        """
+
+        filters = self.resolve(obj.get('/Filter'))
+        params = self.resolve(obj.get('/DecodeParms'))
+        if filters is None:
+            return data
+        if not isinstance(filters, list):
+            filters, params = [filters], [params]
+        elif not isinstance(params, list):
+            params = [params] * len(filters)
+        for f, p in zip(filters, params):
+            if f != '/FlateDecode':
+                raise AcroFormReadError('Unsupported stream filter %s.' % f)
+            data = zlib.decompress(data)
+            p = self.resolve(p) or {}
+            predictor = p.get('/Predictor', 1)
+            if predictor >= 10:
+                data = self._png_unpredict(data, p.get('/Columns', 1))
+            elif predictor != 1:
+                raise AcroFormReadError('Unsupported predictor %s.' % predictor)
+        return data
+
+    def _png_unpredict(self, data, columns):
+        """
+        Parameters: data: bytes
+                        Data encoded with PNG predictors, one filter byte per
+                        row.
+                    columns: int
+                        The number of bytes per row.
+        Returns:    out: bytes
+        """
+
+        out = bytearray()
+        prev = bytearray(columns)
+        for r in range(0, len(data), columns + 1):
+            kind = data[r]
+            row = bytearray(data[r + 1:r + 1 + columns])
+            if kind == 2:
+                for i in range(len(row)):
+                    row[i] = (row[i] + prev[i]) & 0xff
+            elif kind == 1:
+                for i in range(1, len(row)):
+                    row[i] = (row[i] + row[i - 1]) & 0xff
+            elif kind != 0:
+                raise AcroFormReadError('Unsupported PNG predictor %d.' % kind)
+            out += row
+            prev = row
+        return bytes(out)
+
+    def get_object(self, num):
+        """
+        Parameters: num: int
+                        The object number.
+        Returns:    obj: object
+                        The object, or None if it does not exist.
+        """
+
+        if num in self._objects:
+            return self._objects[num]
+        entry = self._xref.get(num)
+        if entry is None:
+            obj = None
+        elif entry[0] == 'n':
+            found, _, obj, _ = self._read_indirect(entry[1])
+            if found != num:
+                # The offsets do not match the objects (e.g. an xref table
+                # that is not zero-indexed); leave this file to PyPDF3.
+                raise AcroFormReadError('Object %d not at its xref offset.' % num)
+        else:
+            obj = self._from_object_stream(entry[1], entry[2])
+        self._objects[num] = obj
+        return obj
+
+    def _from_object_stream(self, stream_num, index):
+        """
+        Parameters: stream_num: int
+                        The object number of the object stream.
+                    index: int
+                        The index of the object within the stream.
+        Returns:    obj: object
+        """
+
+        if stream_num not in self._object_streams:
+            entry = self._xref.get(stream_num)
+            if entry is None or entry[0] != 'n':
+                raise AcroFormReadError('Missing object stream %d.' % stream_num)
+            _, _, obj, data = self._read_indirect(entry[1])
+            parser = _Parser(data)
+            n = obj['/N']
+            first = obj['/First']
+            offsets = []
+            pos = 0
+            for _ in range(n):
+                num, pos = parser.parse(pos)
+                offset, pos = parser.parse(pos)
+                offsets.append(first + offset)
+            self._object_streams[stream_num] = (parser, offsets)
+        parser, offsets = self._object_streams[stream_num]
+        obj, _ = parser.parse(offsets[index])
+        return obj
+
+    def resolve(self, obj):
+        """
+        Parameters: obj: object
+                        A parsed object, possibly an indirect reference.
+        Returns:    obj: object
+                        The object, with any reference resolved.
+        """
+
+        seen = 0
+        while isinstance(obj, IndirectRef):
+            obj = self.get_object(obj.num)
+            seen += 1
+            if seen > 32:
+                raise AcroFormReadError('Reference loop.')
+        return obj
+
+    def get_fields(self):
+        """
+        Parameters: None
+        Returns:    fields: dict
+                        The form fields, keyed by their names, with the same
+                        keys and values as PyPDF3.PdfFileReader.getFields(),
+                        or None if the PDF has no form.
+        """
+
+        try:
+            root = self.resolve(self._trailer['/Root'])
+            tree = self.resolve(root.get('/AcroForm'))
+            if tree is None:
+                return None
+            retval = {}
+            self._walk(tree, retval, set())
+            return retval
+        except (AttributeError, IndexError, KeyError, TypeError, ValueError,
+                RecursionError, zlib.error) as e:
+            raise AcroFormReadError('Malformed form fields: %s' % e)
+
+    def _walk(self, tree, retval, seen):
+        """
+        Parameters: tree: dict
+                        A node of the field tree.
+                    retval: dict
+                        The fields found so far.
+                    seen: set
+                        The object numbers already visited.
+        Returns:    None
+        """
+
+        # Follow the traversal order of PyPDF3.getFields: the kids of a node
+        # come before the node itself. PyPDF3 walks the kids of a field
+        # twice; they are walked (and checked for loops) once here.
+        if '/Kids' in tree:
+            for kid in self.resolve(tree['/Kids']):
+                self._walk(self._visit(kid, seen), retval, seen)
+        for attr in FIELD_ATTRIBUTES:
+            if attr in tree:
+                self._build_field(tree, retval)
+                break
+        if '/Fields' in tree:
+            for f in self.resolve(tree['/Fields']):
+                self._walk(self._visit(f, seen), retval, seen)
+
+    def _visit(self, ref, seen):
+        """
+        Parameters: ref: IndirectRef or dict
+                    seen: set
+        Returns:    obj: dict
+        """
+
+        if isinstance(ref, IndirectRef):
+            if ref.num in seen:
+                raise AcroFormReadError('Field tree loop at object %d.' % ref.num)
+            seen.add(ref.num)
+        return self.resolve(ref)
+
+    def _build_field(self, field, retval):
+        key = self.resolve(field.get('/TM', field.get('/T')))
+        if key is None:
+            # Ignore no-name field for now
+            return
+        item = {}
+        for attr in FIELD_COPY:
+            if attr in field:
+                val = field[attr]
+                if attr not in ('/Parent', '/Kids'):
+                    val = self.resolve(val)
+                item[attr] = val
+        retval[key] = item
+
+
+def read_fields(pdf_fp, fast=True):
+    """
+    Parameters: pdf_fp: str
+                    The path to the PDF file.
+                fast: bool
+                    If True, try the AcroFormReader first, and fall back to
+                    PyPDF3 if it cannot read the file.
+    Returns:    fields: dict
+                    The form fields, as returned by
+                    PyPDF3.PdfFileReader.getFields().
+    """
+
+    if fast:
+        try:
+            with AcroFormReader(pdf_fp) as reader:
+                return reader.get_fields()
+        except AcroFormReadError:
+            pass
+    import PyPDF3
+    return PyPDF3.PdfFileReader(pdf_fp).getFields()
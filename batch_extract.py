@@ -0,0 +1,535 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+batch_extract.py
+
+Extract the fields of every PDF in a directory. The parsing of each PDF is
+fanned out over a process pool, while the calling process acts as the single
+writer of the master files.
+"""
+
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from itertools import islice
+import os
+import time
+
+from columnar_writer import combine_partitions
+from excel_export import export_per_pdf_excel
+from extract_pdf_fields import COLUMNS, COLUMNS_RAW, OUTPUT_DEFERRED, OUTPUT_EXCEL, OUTPUT_MODES
+from extract_pdf_fields import ExtractPdfFields
+from master_writer import FLUSH_BYTES, FLUSH_ROWS, MasterWriter
+from manifest import ProcessedManifest, file_sha256
+from questionnaire_context import QuestionnaireContext
+from run_metrics import RunMetrics, get_logger
+
+
+log = get_logger(__name__)
+
+
+# The number of chunks of PDFs in flight per worker process. Parsed results
+# wait in memory until the writer reaches them, so this bounds the memory of
+# a run.
+WINDOW = 2
+
+# The questionnaire context and result cache of a worker process, set once by
+# _init_worker.
+_context = None
+_cache = None
+
+
+def _init_worker(context, cache):
+    """
+    Parameters: context: QuestionnaireContext
+                    The shared questionnaire context.
+                cache: ResultCache
+                    The result cache, or None.
+    Returns:    None
+    """
+
+    global _context, _cache
+    _context = context
+    _cache = cache
+
+
+def _extract(pdf_fp, info_fp, out_fp, now, fast_read, output, columnar, digest):
+    """
+    Parameters: pdf_fp: str
+                    The path to the PDF file.
+                info_fp: str
+                    The path to the JSON info file.
+                out_fp: str
+                    The path to output.
+                now: str
+                    The timestamp string.
+                fast_read: bool
+                    If True, read the form fields with the AcroFormReader.
+                output: str
+                    The output mode of the per-PDF files.
+                columnar: bool
+                    If True, also write the columnar partition of the PDF.
+                digest: bool
+                    If True, also hash the PDF for the manifest.
+    Returns:    epf: ExtractPdfFields
+                    The parsed PDF, with its per-PDF files written.
+                fps: list
+                    The per-PDF CSV files written.
+                sha256: str
+                    The SHA-256 hex digest of the PDF, or None.
+    """
+
+    epf = ExtractPdfFields(pdf_fp, info_fp, out_fp, now, context=_context,
+                           fast_read=fast_read, cache=_cache)
+    # The per-PDF files have unique names, so the worker writes them itself.
+    fps = epf.export_responses(output)
+    if columnar:
+        epf.export_columnar()
+    # Hashed here, in parallel, rather than by the writer of the manifest.
+    sha256 = file_sha256(pdf_fp) if digest else None
+    return epf, fps, sha256
+
+
+def _extract_chunk(pdf_fps, *args):
+    """
+    Parameters: pdf_fps: list
+                    The paths to a few PDF files, sent to a worker together
+                    to cut down on the IPC.
+                args: tuple
+                    The other arguments of _extract.
+    Returns:    results: list
+                    The results of _extract for each PDF.
+    """
+
+    return [_extract(x, *args) for x in pdf_fps]
+
+
+def list_pdfs(pdf_fp):
+    """
+    Parameters: pdf_fp: str
+                    The path to a PDF file or to a directory of PDFs, or a
+                    list of PDF file paths (e.g. routed by
+                    template_registry.py).
+    Returns:    pdfs: list
+                    The sorted list of PDF file paths.
+    """
+
+    if isinstance(pdf_fp, (list, tuple)):
+        return sorted(pdf_fp)
+    if os.path.isfile(pdf_fp):
+        return [pdf_fp]
+    if os.path.isdir(pdf_fp):
+        # The list of PDF files in the folder.
+        fs = sorted(os.listdir(pdf_fp))
+        pdfs = [x for x in fs if os.path.splitext(x)[1].lower() == '.pdf']
+        return [pdf_fp + '/' + x for x in pdfs]
+    return []
+
+
+def new_timestamp(out_fp, old=None):
+    """
+    Parameters: out_fp: str
+                    The path to output.
+                old: str
+                    A timestamp that must not be reused.
+    Returns:    now: str
+                    The current time as the timestamp of a new set of master
+                    files, with a suffix if master files of that timestamp
+                    already exist.
+    """
+
+    base = now = datetime.now().strftime('%Y%m%d_%H%M%S')
+    i = 1
+    while now == old or os.path.exists(os.path.join(out_fp, 'response_master_%s.csv' % now)):
+        now = '%s_%d' % (base, i)
+        i += 1
+    return now
+
+
+class BatchExtractor:
+    """
+    Class used to extract fields from all PDFs in a directory (or from a
+    single PDF). Parsing runs in a pool of worker processes. The results are
+    merged into the master files by the calling process, in the sorted order
+    of the PDF file names, so the master files are deterministic and are never
+    appended to by two processes at once.
+    """
+
+    def __init__(self, pdf_fp, info_fp, out_fp, now=None, workers=None,
+                 context=None, fast_read=True, cache=None, incremental=False,
+                 flush_rows=FLUSH_ROWS, flush_bytes=FLUSH_BYTES,
+                 output=OUTPUT_EXCEL, master_excel=False, columnar=False,
+                 window=WINDOW, collect=False, mp_context=None):
+        """
+        Parameters: pdf_fp: str
+                        The path to a PDF file or to a directory of PDFs, or
+                        a list of PDF file paths.
+                    info_fp: str
+                        The path to the JSON info file or compiled template.
+                    out_fp: str
+                        The path to output.
+                    now: str
+                        The timestamp string. Defaults to the current time,
+                        or in incremental mode to the timestamp of the
+                        master files recorded in the manifest.
+                    workers: int
+                        The number of worker processes. Defaults to the
+                        number of CPUs. With 1 worker, everything runs in the
+                        calling process.
+                    context: QuestionnaireContext
+                        The shared questionnaire context. If None, it is
+                        loaded from info_fp.
+                    fast_read: bool
+                        If True, read the form fields with the lightweight
+                        AcroFormReader, falling back to PyPDF3 as needed.
+                    cache: ResultCache
+                        If given, unchanged PDFs are loaded from the cache
+                        instead of being parsed again.
+                    incremental: bool
+                        If True, extract only the PDFs that are new since
+                        they were recorded in the manifest of the output
+                        directory, and append them to the current master
+                        files. If a recorded PDF changed, or the
+                        questionnaire fingerprint differs from the one in
+                        the manifest, every PDF is extracted again into new
+                        master files instead.
+                    flush_rows: int
+                        The number of rows buffered per master file before
+                        they are written out.
+                    flush_bytes: int
+                        The number of characters buffered per master file
+                        before they are written out.
+                    output: str
+                        The output mode of the per-PDF files, one of
+                        extract_pdf_fields.OUTPUT_MODES. With
+                        OUTPUT_DEFERRED, the per-PDF XLSX files are converted
+                        from the CSV files in parallel once the master files
+                        are complete.
+                    master_excel: bool
+                        If True, also write the master XLSX files, in the
+                        same streaming pass as the master CSV files.
+                    columnar: bool
+                        If True, each worker also writes its PDFs as typed
+                        Arrow partitions, and the run ends by combining them
+                        into response_master_<now>.arrow, which can be memory
+                        mapped with columnar_writer.load_master.
+                    window: int
+                        The number of chunks of PDFs submitted ahead per
+                        worker process. Results wait in memory until they are
+                        merged, so a small window keeps the memory flat.
+                    collect: bool
+                        If True, keep the ResponseRecord of every response of
+                        the run in records, e.g. to build the data frames of
+                        the whole wave once with response_data.
+                    mp_context: multiprocessing context
+                        The context of the worker processes, e.g. 'spawn'
+                        when running from a thread of a process that must
+                        not be forked. Defaults to the platform default.
+        Returns:    None
+        """
+
+        self._pdf_file_path = pdf_fp
+        self._info_file_path = info_fp
+        self._out_file_path = out_fp
+        # Load the info map, radio button mapping and risk profile once.
+        if context is None:
+            context = QuestionnaireContext(info_fp)
+        self._context = context
+        self._manifest = None
+        if incremental:
+            self._manifest = ProcessedManifest(out_fp)
+            if now is None:
+                # Keep appending to the master files of the manifest.
+                now = self._manifest.now
+        if now is None:
+            now = datetime.now().strftime('%Y%m%d_%H%M%S')
+        if self._manifest is not None and self._manifest.fingerprint != context.fingerprint:
+            # The master files were extracted with another version of the
+            # questionnaire, so they cannot be appended to: every PDF is
+            # extracted again, into new master files.
+            if self._manifest.now == now:
+                now = new_timestamp(out_fp, now)
+            self._manifest.reset(now, context.fingerprint)
+        elif self._manifest is not None and self._manifest.now != now:
+            self._manifest.reset(now, context.fingerprint)
+        self._now = now
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError('Number of workers must be at least 1.')
+        self._workers = workers
+        self._n_processed = 0
+        self._n_skipped = 0
+        self._cancelled = False
+        self._metrics = RunMetrics()
+        self._fast_read = fast_read
+        self._cache = cache
+        self._flush_rows = flush_rows
+        self._flush_bytes = flush_bytes
+        if window < 1:
+            raise ValueError('Window must be at least 1.')
+        self._window = window
+        self._collect = collect
+        self._mp_context = mp_context
+        self._records = []
+        if output not in OUTPUT_MODES:
+            raise ValueError('Unknown output mode %s.' % output)
+        self._output = output
+        self._master_excel = master_excel
+        self._columnar = columnar
+
+    def _list_pdfs(self):
+        """
+        Parameters: None
+        Returns:    pdfs: list
+                        The sorted list of PDF file paths to extract.
+        """
+
+        return list_pdfs(self.pdf_file_path)
+
+    def _results(self, pdfs):
+        """
+        Parameters: pdfs: list
+                        The PDF file paths to extract.
+        Returns:    results: iterator
+                        The parsed ExtractPdfFields objects, the CSV files
+                        written for them and their hashes (in incremental
+                        mode), in the order of pdfs.
+        """
+
+        args = (self.info_file_path, self.out_file_path, self.now, self.fast_read,
+                self.output, self.columnar, self.manifest is not None)
+        if self.workers == 1 or len(pdfs) < 2:
+            _init_worker(self.context, self.cache)
+            for pdf in pdfs:
+                yield _extract(pdf, *args)
+            return
+        n = min(self.workers, len(pdfs))
+        # Send a few PDFs to a worker at a time to cut down on the IPC.
+        chunksize = max(1, min(8, len(pdfs) // (4 * n)))
+        chunks = (pdfs[i:i + chunksize] for i in range(0, len(pdfs), chunksize))
+        # The context is sent once to each worker, not once per PDF.
+        with ProcessPoolExecutor(max_workers=n, mp_context=self._mp_context,
+                                 initializer=_init_worker,
+                                 initargs=(self.context, self.cache)) as executor:
+            # Only a bounded window of chunks is in flight, unlike
+            # Executor.map, which submits the whole wave at once and holds
+            # every result the writer has not reached yet. Memory stays flat
+            # however many PDFs there are, and the results are still merged
+            # in submission order, so the master files are deterministic.
+            pending = deque(executor.submit(_extract_chunk, x, *args)
+                            for x in islice(chunks, self._window * n))
+            try:
+                while pending:
+                    results = pending.popleft().result()
+                    for x in islice(chunks, 1):
+                        pending.append(executor.submit(_extract_chunk, x, *args))
+                    for result in results:
+                        yield result
+            finally:
+                # If the run stops early, drop the PDFs not yet started rather
+                # than waiting for them.
+                for future in pending:
+                    future.cancel()
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, callback=None, cancel=None):
+        """
+        Parameters: callback: callable
+                        Optional function called as callback(n, total) after
+                        each PDF has been merged into the master files.
+                    cancel: threading.Event
+                        Optional event, e.g. set by a GUI thread, that stops
+                        the run after the current PDF. The PDFs processed so
+                        far stay in the master files and the manifest; the
+                        post-processing stages are skipped.
+        Returns:    n: int
+                        The number of PDFs processed. The stage times and
+                        counters of the run are then in metrics.
+        """
+
+        self._metrics = RunMetrics()
+        t_start = time.perf_counter()
+        with self._metrics.stage('list_pdfs'):
+            pdfs = self._list_pdfs()
+            self._n_skipped = 0
+            if self.manifest is not None:
+                n = len(pdfs)
+                pending = self.manifest.pending(pdfs)
+                changed = [x for x in pending if self.manifest.is_recorded(x)]
+                if len(changed) > 0:
+                    # The rows of the old versions of changed PDFs are in the
+                    # master files, which are only appended to, so the run
+                    # starts new master files with every PDF.
+                    self._now = new_timestamp(self.out_file_path, self.now)
+                    self.manifest.reset(self.now, self.context.fingerprint)
+                    log.info('%d PDFs changed since they were extracted, writing all %d PDFs '
+                             'to new master files %s', len(changed), n, self.now)
+                else:
+                    pdfs = pending
+                self._n_skipped = n - len(pdfs)
+        self._metrics.count('pdfs_skipped', self._n_skipped)
+        log.info('Extracting %d PDFs with %d workers to %s', len(pdfs), self.workers,
+                 self.out_file_path)
+        self._n_processed = 0
+        self._cancelled = False
+        self._records = []
+        # The master files are opened once for the whole batch.
+        writer = MasterWriter(self.out_file_path, self.now, COLUMNS, COLUMNS_RAW,
+                              self._flush_rows, self._flush_bytes, self.master_excel)
+        csv_fps = []
+        results = self._results(pdfs)
+        try:
+            for epf, fps, sha256 in results:
+                csv_fps += fps
+                # This process is the only writer of the master files.
+                epf.export_master(writer)
+                # The stage times and counters of the PDF, from the worker.
+                self._metrics.merge(epf.metrics)
+                if self.collect:
+                    self._records += epf.records
+                self._n_processed += 1
+                if self.manifest is not None:
+                    self.manifest.record(epf.pdf_file_path, sha256)
+                    if self._n_processed % 25 == 0:
+                        # Only save records of rows that are on disk.
+                        writer.flush()
+                        self.manifest.save()
+                if callback is not None:
+                    callback(self._n_processed, len(pdfs))
+                if cancel is not None and cancel.is_set():
+                    self._cancelled = True
+                    break
+        finally:
+            # Stops the workers, if the loop ended early.
+            results.close()
+            # The workers only add entries; the cache is trimmed once, here.
+            if self.cache is not None:
+                with self._metrics.stage('cache_evict'):
+                    self.cache.evict()
+            with self._metrics.stage('export_master'):
+                writer.close()
+            # Whatever made it into the master files is recorded, so an
+            # interrupted run picks up where it stopped.
+            if self.manifest is not None:
+                self.manifest.save()
+        if not self.cancelled:
+            if self.columnar:
+                with self._metrics.stage('combine_partitions'):
+                    combine_partitions(self.out_file_path, self.now)
+            if self.output == OUTPUT_DEFERRED:
+                with self._metrics.stage('deferred_excel'):
+                    self.export_deferred_excel(csv_fps)
+        self._metrics.add_time('total', time.perf_counter() - t_start)
+        self._metrics.log(log, 'Extracted %d PDFs%s' % (
+            self._n_processed, ' (cancelled)' if self.cancelled else ''))
+        return self._n_processed
+
+    def export_deferred_excel(self, csv_fps):
+        """
+        Parameters: csv_fps: list
+                        The per-PDF CSV files to convert to XLSX.
+        Returns:    None
+        """
+
+        # The conversions are independent, so they fan out over the workers
+        # like the parsing did.
+        export_per_pdf_excel(csv_fps, self.workers, self._mp_context)
+
+    def response_data(self):
+        """
+        Parameters: None
+        Returns:    df: pandas.DataFrame
+                        The response data of the whole run, built once from
+                        the collected records (see collect).
+        """
+
+        import pandas as pd
+        return pd.DataFrame([x.row() for x in self._records], columns=COLUMNS)
+
+    def response_data_raw(self):
+        """
+        Parameters: None
+        Returns:    df: pandas.DataFrame
+                        The raw response data of the whole run, built once
+                        from the collected records (see collect).
+        """
+
+        import pandas as pd
+        return pd.DataFrame([x.row_raw() for x in self._records], columns=COLUMNS_RAW)
+
+    # Read-only properties.
+    @property
+    def cache(self):
+        return self._cache
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    @property
+    def collect(self):
+        return self._collect
+
+    @property
+    def columnar(self):
+        return self._columnar
+
+    @property
+    def context(self):
+        return self._context
+
+    @property
+    def fast_read(self):
+        return self._fast_read
+
+    @property
+    def info_file_path(self):
+        return self._info_file_path
+
+    @property
+    def manifest(self):
+        return self._manifest
+
+    @property
+    def master_excel(self):
+        return self._master_excel
+
+    @property
+    def metrics(self):
+        return self._metrics
+
+    @property
+    def n_processed(self):
+        return self._n_processed
+
+    @property
+    def n_skipped(self):
+        return self._n_skipped
+
+    @property
+    def now(self):
+        return self._now
+
+    @property
+    def out_file_path(self):
+        return self._out_file_path
+
+    @property
+    def output(self):
+        return self._output
+
+    @property
+    def pdf_file_path(self):
+        return self._pdf_file_path
+
+    @property
+    def records(self):
+        return self._records
+
+    @property
+    def workers(self):
+        return self._workers
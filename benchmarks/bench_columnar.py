@@ -0,0 +1,91 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+bench_columnar.py
+
+Benchmark of loading the response master data of a synthetic wave and
+summing the risk score per BPCI ID, from the master CSV file with pandas and
+from the memory mapped Arrow file of columnar_writer.
+
+Usage: python benchmarks/bench_columnar.py [n_pdfs] [n_items]
+"""
+
+
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pandas as pd
+
+from columnar_writer import combine_partitions, load_master, partition_dir, write_partition
+from extract_pdf_fields import COLUMNS, COLUMNS_RAW
+from master_writer import MasterWriter
+
+
+RESPONSES = ['Yes', 'No', 'NA', 'Partially', 'Some free text answer']
+
+
+def make_rows(i, n_items):
+    """
+    Parameters: i: int
+                    The PDF number.
+                n_items: int
+                    The number of items per PDF.
+    Returns:    rows: list
+                    Synthetic rows of the response data of one PDF.
+    """
+
+    rows = []
+    for j in range(n_items):
+        response = random.choice(RESPONSES)
+        weight = float(random.randint(0, 3)) if response != 'Some free text answer' else float('nan')
+        level = float(random.randint(1, 3))
+        rows += [['BPCI-%05d' % i, float(j), 'Question %d' % j, response,
+                  weight, level, weight * level]]
+    return rows
+
+
+def main():
+    n_pdfs = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    n_items = int(sys.argv[2]) if len(sys.argv) > 2 else 120
+    random.seed(0)
+    out_fp = tempfile.mkdtemp()
+    try:
+        with MasterWriter(out_fp, 'bench', COLUMNS, COLUMNS_RAW) as writer:
+            for i in range(n_pdfs):
+                rows = make_rows(i, n_items)
+                writer.write('org', 'bpci', rows, [])
+                fp = os.path.join(partition_dir(out_fp, 'bench'), 'q_%05d.arrow' % i)
+                write_partition(fp, rows)
+        t0 = time.perf_counter()
+        fp = combine_partitions(out_fp, 'bench')
+        t_combine = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        df = pd.read_csv(out_fp + '/response_master_bench.csv')
+        csv_sum = df.groupby('BPCI ID')['Risk Score'].sum()
+        t_csv = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        table = load_master(fp)
+        arrow_sum = table.group_by('BPCI ID').aggregate([('Risk Score', 'sum')])
+        t_arrow = time.perf_counter() - t0
+
+        assert len(csv_sum) == arrow_sum.num_rows
+        print('%d rows (%d PDFs x %d items)' % (table.num_rows, n_pdfs, n_items))
+        print('combine partitions:           %8.1f ms' % (1000 * t_combine))
+        print('CSV load + groupby (pandas):  %8.1f ms' % (1000 * t_csv))
+        print('Arrow mmap + group_by:        %8.1f ms' % (1000 * t_arrow))
+    finally:
+        shutil.rmtree(out_fp)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+bench_extract.py
+
+Throughput benchmark of the extraction on synthetic questionnaires (see
+synthetic_pdfs.py), at several batch sizes. For each size, the stages of
+ExtractPdfFields are timed separately on every document, in one process:
+_get_fields, _parse_fields (which includes scoring), the scoring alone
+(_risk_columns) and the export (per-PDF files and master files). Then the
+whole batch is run through BatchExtractor, with its process pool. Each size
+runs in a fresh interpreter, so the peak RSS is that of the size alone.
+
+The results are compared against a stored baseline: a stage whose files/sec
+drops, or a peak RSS that grows, by more than the tolerance is reported as a
+regression, and the exit code is 1.
+
+Usage: python benchmarks/bench_extract.py [--sizes 1,100,10000] [--fields N]
+           [--fill-rate F] [--workers N] [--save-baseline] [--report FILE]
+"""
+
+
+import argparse
+import contextlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ROOT)
+
+# The default stored baseline.
+BASELINE_FILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline_extract.json')
+
+# The timed stages, in report order.
+STAGES = ['get_fields', 'parse_fields', 'scoring', 'export', 'batch']
+
+
+def peak_rss_mb():
+    """
+    Parameters: None
+    Returns:    rss: float
+                    The peak resident set size of this process and of its
+                    (finished) child processes, in MB, or None if unknown.
+    """
+
+    try:
+        import resource
+    except ImportError:
+        # Windows: psutil only reports the peak of this process.
+        try:
+            import psutil
+            return psutil.Process().memory_info().peak_wset / 2 ** 20
+        except (ImportError, AttributeError):
+            return None
+    rss = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+              resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # In bytes on macOS, in KB elsewhere.
+    return rss / 2 ** 20 if sys.platform == 'darwin' else rss / 2 ** 10
+
+
+def run_size(n, n_fields, fill_rate, workers, output):
+    """
+    Parameters: n: int
+                    The number of documents.
+                n_fields: int
+                    The number of form fields per document, or None for the
+                    fields of the info file.
+                fill_rate: float
+                    The probability that a field is filled in.
+                workers: int
+                    The number of worker processes of the batch run.
+                output: str
+                    The output mode of the per-PDF files.
+    Returns:    result: dict
+                    The timings of one batch size.
+    """
+
+    from batch_extract import BatchExtractor
+    from extract_pdf_fields import COLUMNS, COLUMNS_RAW, ExtractPdfFields
+    from master_writer import MasterWriter
+    from questionnaire_context import QuestionnaireContext
+    from synthetic_pdfs import SyntheticQuestionnaire
+
+    info_fp = os.path.join(ROOT, 'info_wave2.json')
+    risk_fp = os.path.join(ROOT, 'risk_profile_wave2.json')
+    tmp = tempfile.mkdtemp()
+    try:
+        pdf_fp = os.path.join(tmp, 'pdf')
+        t0 = time.perf_counter()
+        generator = SyntheticQuestionnaire(info_fp, risk_fp, n_fields, fill_rate)
+        pdfs = generator.write_many(pdf_fp, n)
+        t_generate = time.perf_counter() - t0
+        context = QuestionnaireContext(info_fp, risk_fp)
+        out_fp = os.path.join(tmp, 'out')
+        os.makedirs(out_fp)
+        times = dict.fromkeys(STAGES, 0.0)
+        n_responses = 0
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            with MasterWriter(out_fp, 'bench', COLUMNS, COLUMNS_RAW) as writer:
+                for pdf in pdfs:
+                    epf = ExtractPdfFields(pdf, info_fp, out_fp, 'bench', context=context)
+                    t0 = time.perf_counter()
+                    epf._get_fields()
+                    t1 = time.perf_counter()
+                    epf._parse_fields()
+                    t2 = time.perf_counter()
+                    records = [epf._normalize_field(k, v) for k, v in epf.fields.items()
+                               if k in epf.info and 'id' in epf.info[k]]
+                    t3 = time.perf_counter()
+                    for record in records:
+                        epf._risk_columns(record)
+                    t4 = time.perf_counter()
+                    epf.export_responses(output)
+                    epf.export_master(writer)
+                    t5 = time.perf_counter()
+                    times['get_fields'] += t1 - t0
+                    times['parse_fields'] += t2 - t1
+                    times['scoring'] += t4 - t3
+                    times['export'] += t5 - t4
+                    n_responses += len(records)
+            batch_fp = os.path.join(tmp, 'batch')
+            os.makedirs(batch_fp)
+            t0 = time.perf_counter()
+            BatchExtractor(pdf_fp, info_fp, batch_fp, 'bench', workers=workers,
+                           context=context, output=output).run()
+            times['batch'] = time.perf_counter() - t0
+        stages = {}
+        for stage in STAGES:
+            fps = n / times[stage] if times[stage] > 0 else None
+            stages[stage] = {'seconds': round(times[stage], 6),
+                             'files_per_second': round(fps, 2) if fps else None}
+        return {'n_docs': n, 'n_fields': len(generator.keys), 'fill_rate': fill_rate,
+                'n_responses': n_responses, 'workers': workers, 'output': output,
+                'generate_seconds': round(t_generate, 3), 'stages': stages,
+                'peak_rss_mb': peak_rss_mb()}
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def compare(results, baseline, tolerance):
+    """
+    Parameters: results: dict
+                    The results, by batch size.
+                baseline: dict
+                    The baseline results, by batch size.
+                tolerance: float
+                    The relative change counted as a regression.
+    Returns:    regressions: list
+                    Descriptions of the regressions.
+    """
+
+    regressions = []
+    for size, result in results.items():
+        base = baseline.get(size)
+        if base is None:
+            continue
+        for stage in STAGES:
+            new = result['stages'][stage]['files_per_second']
+            old = base['stages'].get(stage, {}).get('files_per_second')
+            if new and old and new < old * (1 - tolerance):
+                regressions += ['%s docs, %s: %.1f files/s (baseline %.1f)' % (size, stage, new, old)]
+        new, old = result.get('peak_rss_mb'), base.get('peak_rss_mb')
+        if new and old and new > old * (1 + tolerance):
+            regressions += ['%s docs, peak RSS: %.1f MB (baseline %.1f)' % (size, new, old)]
+    return regressions
+
+
+def print_results(results, baseline):
+    """
+    Parameters: results: dict
+                    The results, by batch size.
+                baseline: dict
+                    The baseline results, by batch size.
+    Returns:    None
+    """
+
+    for size, result in results.items():
+        base = baseline.get(size, {}).get('stages', {})
+        print('%s docs, %s fields, fill rate %.2f, peak RSS %s MB' % (
+            size, result['n_fields'], result['fill_rate'],
+            '%.1f' % result['peak_rss_mb'] if result['peak_rss_mb'] else '?'))
+        for stage in STAGES:
+            fps = result['stages'][stage]['files_per_second']
+            old = base.get(stage, {}).get('files_per_second')
+            line = '    %-14s %12.1f files/s' % (stage, fps or 0)
+            if fps and old:
+                line += '   %+6.1f%% vs baseline' % (100 * (fps / old - 1))
+            print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extraction throughput benchmark.')
+    parser.add_argument('--sizes', default='1,100,10000', help='comma separated numbers of documents')
+    parser.add_argument('--fields', type=int, default=None, help='form fields per document')
+    parser.add_argument('--fill-rate', type=float, default=0.9, help='share of filled fields')
+    parser.add_argument('--workers', type=int, default=None, help='workers of the batch run')
+    parser.add_argument('--output', default='csv', help='output mode of the per-PDF files')
+    parser.add_argument('--baseline', default=BASELINE_FILE_PATH, help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='store the results as baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='relative slowdown or memory growth reported as regression')
+    parser.add_argument('--report', default=None, help='write the results to a JSON file')
+    parser.add_argument('--one-size', type=int, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.one_size is not None:
+        # Child process: one batch size, result as JSON on stdout.
+        result = run_size(args.one_size, args.fields, args.fill_rate, args.workers, args.output)
+        sys.stdout.write(json.dumps(result) + '\n')
+        return 0
+    results = {}
+    for size in [int(x) for x in args.sizes.split(',')]:
+        cmd = [sys.executable, os.path.abspath(__file__), '--one-size', str(size),
+               '--fill-rate', str(args.fill_rate), '--output', args.output]
+        if args.fields is not None:
+            cmd += ['--fields', str(args.fields)]
+        if args.workers is not None:
+            cmd += ['--workers', str(args.workers)]
+        out = subprocess.run(cmd, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        results[str(size)] = json.loads(out.strip().splitlines()[-1])
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r') as f:
+            baseline = json.load(f)
+    print_results(results, baseline)
+    regressions = compare(results, baseline, args.tolerance)
+    for x in regressions:
+        print('REGRESSION: ' + x)
+    if args.report is not None:
+        with open(args.report, 'w') as f:
+            json.dump({'results': results, 'regressions': regressions}, f, indent=2)
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print('Baseline saved to %s' % args.baseline)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
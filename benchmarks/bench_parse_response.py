@@ -0,0 +1,110 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+bench_parse_response.py
+
+Micro-benchmark of ExtractPdfFields._parse_response on a synthetic info map,
+comparing the id index of QuestionnaireContext to the former linear scan over
+every info entry.
+
+Usage: python benchmarks/bench_parse_response.py [n_items]
+"""
+
+
+import json
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from extract_pdf_fields import ExtractPdfFields
+from questionnaire_context import QuestionnaireContext
+
+
+def make_info(n):
+    """
+    Parameters: n: int
+                    The number of items.
+    Returns:    info: dict
+                    A synthetic info map, where every third item has a values
+                    remap table.
+    """
+
+    info = {}
+    for i in range(n):
+        item = {'num': i + 1, 'local': i % 10, 'text': 'Question %d' % i,
+                'group': 'Group %d' % (i // 10), 'id': float(i)}
+        if i % 3 == 0:
+            item['values'] = {'Choice1': 'Yes', 'Choice2': 'No'}
+        info['Q%d' % i] = item
+    return info
+
+
+def parse_response_scan(info, response, item_id):
+    """
+    Parameters: info: dict
+                    The info map.
+                response: str
+                    The response to an item.
+                item_id: float
+                    The ID of the item.
+    Returns:    w: str
+                    The parsed response, found with the former linear scan.
+    """
+
+    check_id = lambda x: 'id' in x.keys() and x['id'] == item_id
+    found = [x for x in info.values() if check_id(x)]
+    w = response
+    if len(found) > 0:
+        if 'values' in found[0] and response in found[0]['values']:
+            w = found[0]['values'][response]
+    w = w.replace("\u2018", "'").replace("\u2019", "'").strip()
+    w = w.replace('N/A', 'NA')
+    return w
+
+
+def main():
+    """
+    Parameters: None
+    Returns:    None
+    """
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    info = make_info(n)
+    with tempfile.TemporaryDirectory() as tmp:
+        info_fp = os.path.join(tmp, 'info.json')
+        risk_fp = os.path.join(tmp, 'risk.json')
+        with open(info_fp, 'w') as f:
+            json.dump(info, f)
+        with open(risk_fp, 'w') as f:
+            json.dump({}, f)
+        context = QuestionnaireContext(info_fp, risk_fp)
+    # An extractor without a PDF, so only _parse_response is measured.
+    epf = ExtractPdfFields.__new__(ExtractPdfFields)
+    epf._context = context
+    epf._info = context.info
+    ids = [float(i) for i in range(n)]
+    # Both lookups must agree before they are timed.
+    for i in ids[::max(1, n // 100)]:
+        assert epf._parse_response('Choice1', i) == parse_response_scan(info, 'Choice1', i)
+    # One full questionnaire: every item parsed once.
+    k = 3
+    t_index = min(timeit.repeat(lambda: [epf._parse_response('Choice1', i) for i in ids],
+                                number=1, repeat=k))
+    sample = ids[::max(1, n // 200)]
+    t_scan = min(timeit.repeat(lambda: [parse_response_scan(info, 'Choice1', i) for i in sample],
+                               number=1, repeat=k))
+    # Scale the scan to the full questionnaire; it is O(n) per item.
+    t_scan *= n / len(sample)
+    print('items: %d' % n)
+    print('linear scan: %.4f s per questionnaire (%.2f us per field)' % (t_scan, 1e6 * t_scan / n))
+    print('id index:    %.4f s per questionnaire (%.2f us per field)' % (t_index, 1e6 * t_index / n))
+    print('speedup:     %.0fx' % (t_scan / t_index))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+bench_records.py
+
+Memory and time of the per-response representation over a batch: the former
+path, with a scored and a raw row list per response and two data frames
+built per PDF, against ResponseRecord objects collected across the batch and
+turned into data frames once at the end. The responses are those of real
+parses of synthetic questionnaires (see synthetic_pdfs.py), repeated up to
+the batch size.
+
+Usage: python benchmarks/bench_records.py [n_pdfs]
+"""
+
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import pandas as pd
+
+from extract_pdf_fields import COLUMNS, COLUMNS_RAW, ExtractPdfFields
+from questionnaire_context import QuestionnaireContext
+from response_record import ResponseRecord
+from synthetic_pdfs import SyntheticQuestionnaire
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+
+
+def parsed_values(n_templates=50):
+    """
+    Parameters: n_templates: int
+                    The number of synthetic PDFs parsed.
+    Returns:    pdfs: list
+                    For each PDF, the slot values of its responses.
+    """
+
+    info_fp = os.path.join(ROOT, 'info_wave2.json')
+    risk_fp = os.path.join(ROOT, 'risk_profile_wave2.json')
+    context = QuestionnaireContext(info_fp, risk_fp)
+    with tempfile.TemporaryDirectory() as tmp:
+        fps = SyntheticQuestionnaire(info_fp, risk_fp).write_many(tmp, n_templates)
+        return [[x.values() for x in ExtractPdfFields(fp, info_fp, tmp, 'bench', context).records]
+                for fp in fps]
+
+
+def lists_path(pdfs):
+    """
+    Parameters: pdfs: list
+                    For each PDF, the slot values of its responses.
+    Returns:    held: list
+                    The rows kept for the batch.
+                seconds: dict
+                    The time to build the rows and the data frames.
+    """
+
+    held = []
+    t_rows = t_frames = 0.0
+    for values in pdfs:
+        t0 = time.perf_counter()
+        data = [[x[0], x[1], x[2], x[3], x[4], x[5], x[6]] for x in values]
+        data_raw = [[x[0], x[7], x[8], x[9], x[2], x[10], x[1]] for x in values]
+        data = sorted(data, key=lambda x: x[1])
+        data_raw = sorted(data_raw, key=lambda x: x[-1])
+        t1 = time.perf_counter()
+        pd.DataFrame(data, columns=COLUMNS)
+        pd.DataFrame([x[:-1] for x in data_raw], columns=COLUMNS_RAW)
+        t_rows += t1 - t0
+        t_frames += time.perf_counter() - t1
+        held += [(data, data_raw)]
+    return held, {'rows': t_rows, 'frames': t_frames}
+
+
+def records_path(pdfs):
+    """
+    Parameters: pdfs: list
+                    For each PDF, the slot values of its responses.
+    Returns:    held: list
+                    The records kept for the batch.
+                seconds: dict
+                    The time to build the records and the data frames.
+    """
+
+    held = []
+    t0 = time.perf_counter()
+    for values in pdfs:
+        records = [ResponseRecord(*x) for x in values]
+        records.sort(key=lambda x: x.item_id)
+        held += records
+    t1 = time.perf_counter()
+    pd.DataFrame([x.row() for x in held], columns=COLUMNS)
+    pd.DataFrame([x.row_raw() for x in held], columns=COLUMNS_RAW)
+    return held, {'rows': t1 - t0, 'frames': time.perf_counter() - t1}
+
+
+def measure(path, pdfs):
+    """
+    Parameters: path: callable
+                    lists_path or records_path.
+                pdfs: list
+    Returns:    held: list
+                seconds: dict
+                    The times, and the memory held for the batch in MB.
+    """
+
+    tracemalloc.start()
+    held, seconds = path(pdfs)
+    seconds['held_mb'] = tracemalloc.get_traced_memory()[0] / 2 ** 20
+    tracemalloc.stop()
+    # Timed again without the tracing overhead.
+    held, times = path(pdfs)
+    seconds.update(times)
+    return held, seconds
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    templates = parsed_values()
+    pdfs = [templates[i % len(templates)] for i in range(n)]
+    n_responses = sum(len(x) for x in pdfs)
+    print('%d PDFs, %d responses' % (n, n_responses))
+    results = {}
+    for name, path in [('lists + frames per PDF', lists_path),
+                       ('ResponseRecord + frames once', records_path)]:
+        held, results[name] = measure(path, pdfs)
+        # The results of one PDF, as sent back from a worker process.
+        one = held[0] if path is lists_path else held[:len(pdfs[0])]
+        t0 = time.perf_counter()
+        for _ in range(100):
+            size = len(pickle.dumps(one, pickle.HIGHEST_PROTOCOL))
+        results[name]['pickle_ms'] = (time.perf_counter() - t0) * 10
+        results[name]['pickle_bytes'] = size
+        del held
+    for name, x in results.items():
+        print('%-30s rows %7.3f s   frames %7.3f s   held %7.1f MB   pickle/PDF %6d B %6.3f ms'
+              % (name, x['rows'], x['frames'], x['held_mb'], x['pickle_bytes'], x['pickle_ms']))
+    old, new = results['lists + frames per PDF'], results['ResponseRecord + frames once']
+    print('speed-up %.1fx, memory %.0f%% of the lists' % (
+        (old['rows'] + old['frames']) / (new['rows'] + new['frames']),
+        100 * new['held_mb'] / old['held_mb']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,132 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+bench_startup.py
+
+Startup time of the extractor, the command line entry point and the GUI, each
+in a fresh process (the median of several runs). From source, it times the
+imports of the extraction modules and of pandas, 'extract_cli.py --help', and
+GUI.py until its window has been drawn. With --frozen, it times the
+executables of a cx_Freeze build (python setup.py build) the same way. The
+GUI closes itself once drawn when given --probe, and is skipped if there is
+no display.
+
+Usage: python benchmarks/bench_startup.py [--runs N] [--frozen BUILD_DIR]
+           [--report FILE]
+"""
+
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+
+def time_command(cmd, runs, env=None):
+    """
+    Parameters: cmd: list
+                    The command to run.
+                runs: int
+                    The number of runs.
+                env: dict
+                    Extra environment variables.
+    Returns:    seconds: float
+                    The median wall time of the command, or None if it
+                    failed.
+    """
+
+    environ = dict(os.environ, **(env or {}))
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = subprocess.run(cmd, cwd=ROOT, env=environ, stdout=subprocess.DEVNULL,
+                                stderr=subprocess.DEVNULL)
+        if result.returncode != 0:
+            return None
+        times += [time.perf_counter() - t0]
+    return statistics.median(times)
+
+
+def has_display():
+    """
+    Parameters: None
+    Returns:    ok: bool
+                    True if a Tk window can be opened.
+    """
+
+    cmd = [sys.executable, '-c', 'import tkinter; tkinter.Tk().destroy()']
+    return subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL).returncode == 0
+
+
+def source_commands():
+    """
+    Parameters: None
+    Returns:    commands: list
+                    The name, command and environment of each measurement
+                    from source.
+    """
+
+    py = sys.executable
+    commands = [('python (no imports)', [py, '-c', 'pass'], None),
+                ('import extract_pdf_fields', [py, '-c', 'import extract_pdf_fields'], None),
+                ('import batch_extract', [py, '-c', 'import batch_extract'], None),
+                ('import pandas (first XLSX)', [py, '-c', 'import pandas'], None),
+                ('extract_cli.py --help', [py, 'extract_cli.py', '--help'], None)]
+    if has_display():
+        commands += [('GUI.py window drawn', [py, 'GUI.py', '--probe'], None)]
+    else:
+        print('No display: GUI.py skipped.')
+    return commands
+
+
+def frozen_commands(build_dir):
+    """
+    Parameters: build_dir: str
+                    The cx_Freeze build directory, e.g. build/exe.win-amd64-3.7.
+    Returns:    commands: list
+                    The name, command and environment of each measurement of
+                    the frozen executables.
+    """
+
+    ext = '.exe' if sys.platform == 'win32' else ''
+    commands = []
+    cli = os.path.join(build_dir, 'extract_cli' + ext)
+    if os.path.exists(cli):
+        commands += [('frozen extract_cli --help', [cli, '--help'], None)]
+    gui = os.path.join(build_dir, 'GUI' + ext)
+    if os.path.exists(gui) and has_display():
+        commands += [('frozen GUI window drawn', [gui, '--probe'], None)]
+    if not commands:
+        print('No executables found in %s.' % build_dir)
+    return commands
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Startup time benchmark.')
+    parser.add_argument('--runs', type=int, default=5, help='runs per measurement')
+    parser.add_argument('--frozen', default=None, metavar='BUILD_DIR',
+                        help='also time the executables of a cx_Freeze build')
+    parser.add_argument('--report', default=None, help='write the results to a JSON file')
+    args = parser.parse_args()
+    commands = source_commands()
+    if args.frozen is not None:
+        commands += frozen_commands(os.path.abspath(args.frozen))
+    results = {}
+    for name, cmd, env in commands:
+        results[name] = time_command(cmd, args.runs, env)
+        print('%-30s %s' % (name, 'failed' if results[name] is None
+                            else '%7.3f s' % results[name]))
+    if args.report is not None:
+        with open(args.report, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,220 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+synthetic_pdfs.py
+
+Generate filled questionnaire PDFs with an AcroForm for benchmarks, from the
+info file (made from items.csv by make_json.py), the risk profile and the
+radio button mapping, so no participant PDF is needed. Each PDF has one
+page, with one widget per field: text fields answered with a valid option of
+the risk profile (or free text), radio groups with /Kids and /Choice<code>
+states, and check boxes.
+
+Usage: python benchmarks/synthetic_pdfs.py <out_dir> <n_pdfs> [n_fields] [fill_rate]
+"""
+
+
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from questionnaire_context import RADIO_BUTTON_MAPPING, RISK_PROFILE_FILE_PATH
+
+
+def _pdf_string(s):
+    """
+    Parameters: s: str
+    Returns:    s: str
+                    The PDF literal string of s.
+    """
+
+    return '(' + s.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') + ')'
+
+
+class SyntheticQuestionnaire:
+    """
+    Class used to write synthetic filled questionnaires. The field list is
+    fixed by the info file and n_fields: with fewer fields than the info
+    file, the first n_fields are kept (always with the BPID and name fields);
+    with more, extra free text fields that are not in the info file are
+    added, which the extraction reads but skips.
+    """
+
+    def __init__(self, info_fp, risk_fp=RISK_PROFILE_FILE_PATH, n_fields=None,
+                 fill_rate=0.9, radio_button=None):
+        """
+        Parameters: info_fp: str
+                        The path to the JSON info file.
+                    risk_fp: str
+                        The path to the JSON risk profile.
+                    n_fields: int
+                        The number of form fields. Defaults to the number of
+                        entries in the info file.
+                    fill_rate: float
+                        The probability that a field is filled in.
+                    radio_button: dict
+                        The radio button mapping. Defaults to
+                        RADIO_BUTTON_MAPPING.
+        Returns:    None
+        """
+
+        with open(info_fp, 'r', encoding='utf-8') as f:
+            self.info = json.load(f)
+        with open(risk_fp, 'r', encoding='utf-8') as f:
+            self.risk_profile = json.load(f)
+        self.radio_button = RADIO_BUTTON_MAPPING if radio_button is None else radio_button
+        self.fill_rate = fill_rate
+        keys = list(self.info.keys())
+        ids = [k for k, v in self.info.items() if v.get('text') in ['BPID', 'Participant Legal Name',
+                                                                     'Organization Legal Name']]
+        if n_fields is None:
+            n_fields = len(keys)
+        if n_fields <= len(keys):
+            keys = ids + [k for k in keys if k not in ids][:max(0, n_fields - len(ids))]
+        else:
+            keys += ['Extra%d' % i for i in range(n_fields - len(keys))]
+        self.keys = keys
+
+    def _radio_codes(self, key):
+        """
+        Parameters: key: str
+                        The field key of a radio group.
+        Returns:    codes: list
+                        The option codes with a label that the risk profile
+                        can score (all of them for an item that is not
+                        scored).
+        """
+
+        codes = list(self.radio_button[key])
+        options = self.risk_profile.get(str(self.info.get(key, {}).get('id')))
+        if not options:
+            return codes
+        return [x for x in codes if self.radio_button[key][x].lower() in options
+                or self.radio_button[key][x].lower().startswith('na')] or codes
+
+    def _value(self, key, rng, seed):
+        """
+        Parameters: key: str
+                        The field key.
+                    rng: random.Random
+                    seed: int
+                        The number of the PDF.
+        Returns:    entry: str
+                        The field dictionary entries for the field type and
+                        value of a text field or check box.
+        """
+
+        item = self.info.get(key, {})
+        text = item.get('text')
+        filled = rng.random() < self.fill_rate
+        if key.startswith('Check') or key.isdigit():
+            return '/FT /Btn' + (' /V /Yes' if filled else '')
+        if text == 'BPID':
+            return '/FT /Tx /V ' + _pdf_string('BPCI-%05d' % seed)
+        if text in ['Participant Legal Name', 'Organization Legal Name']:
+            return '/FT /Tx /V ' + _pdf_string('Organization %d' % seed)
+        if not filled:
+            return '/FT /Tx'
+        options = self.risk_profile.get(str(item.get('id')))
+        if options:
+            return '/FT /Tx /V ' + _pdf_string(rng.choice(list(options)).capitalize())
+        value = 'Free text answer %d' % rng.randint(0, 9999)
+        if rng.random() < 0.3:
+            # A line break, as typed into a multi-line text box.
+            return '/FT /Tx /V <%s>' % (value + '\r\nsecond line').encode('utf-8').hex()
+        return '/FT /Tx /V ' + _pdf_string(value)
+
+    def write(self, fp, seed=0):
+        """
+        Parameters: fp: str
+                        The path to the PDF file.
+                    seed: int
+                        The number of the PDF, which also seeds its answers.
+        Returns:    None
+        """
+
+        rng = random.Random(seed)
+        objs = {1: '<< /Type /Catalog /Pages 2 0 R /AcroForm 4 0 R >>',
+                2: '<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+                5: '<< /Length 0 >>\nstream\n\nendstream'}
+        fields = []
+        annots = []
+        n = 6
+        for i, key in enumerate(self.keys):
+            num = n
+            n += 1
+            rect = '/Rect [72 %d 300 %d]' % (760 - 12 * i, 770 - 12 * i)
+            if key in self.radio_button:
+                kids = []
+                for code in self.radio_button[key]:
+                    objs[n] = ('<< /Parent %d 0 R /Subtype /Widget /P 3 0 R %s '
+                               '/AP << /N << /Choice%s 5 0 R /Off 5 0 R >> >> >>' % (num, rect, code))
+                    kids += ['%d 0 R' % n]
+                    n += 1
+                value = ''
+                if rng.random() < self.fill_rate:
+                    value = ' /V /Choice%s' % rng.choice(self._radio_codes(key))
+                objs[num] = '<< /FT /Btn /Ff 49152 /T %s /Kids [%s]%s >>' % (
+                    _pdf_string(key), ' '.join(kids), value)
+                annots += kids
+            else:
+                objs[num] = '<< /T %s /Subtype /Widget /P 3 0 R %s %s >>' % (
+                    _pdf_string(key), rect, self._value(key, rng, seed))
+                annots += ['%d 0 R' % num]
+            fields += ['%d 0 R' % num]
+        objs[3] = ('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Annots [%s] >>'
+                   % ' '.join(annots))
+        objs[4] = '<< /Fields [%s] >>' % ' '.join(fields)
+        size = max(objs) + 1
+        buf = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = {}
+        for i in sorted(objs):
+            offsets[i] = len(buf)
+            buf += ('%d 0 obj\n%s\nendobj\n' % (i, objs[i])).encode('latin-1')
+        xref = len(buf)
+        buf += ('xref\n0 %d\n0000000000 65535 f \n' % size).encode('ascii')
+        for i in range(1, size):
+            if i in offsets:
+                buf += ('%010d 00000 n \n' % offsets[i]).encode('ascii')
+            else:
+                buf += b'0000000000 65535 f \n'
+        buf += ('trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+                % (size, xref)).encode('ascii')
+        with open(fp, 'wb') as f:
+            f.write(buf)
+
+    def write_many(self, out_fp, n, start=0):
+        """
+        Parameters: out_fp: str
+                        The output directory. Created if needed.
+                    n: int
+                        The number of PDFs.
+                    start: int
+                        The number of the first PDF.
+        Returns:    fps: list
+                        The paths to the PDFs.
+        """
+
+        if not os.path.exists(out_fp):
+            os.makedirs(out_fp)
+        fps = []
+        for i in range(start, start + n):
+            fp = os.path.join(out_fp, 'synthetic_%06d.pdf' % i)
+            self.write(fp, seed=i)
+            fps += [fp]
+        return fps
+
+
+if __name__ == '__main__':
+    root = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+    n_fields = int(sys.argv[3]) if len(sys.argv) > 3 else None
+    fill_rate = float(sys.argv[4]) if len(sys.argv) > 4 else 0.9
+    generator = SyntheticQuestionnaire(os.path.join(root, 'info_wave2.json'),
+                                       os.path.join(root, 'risk_profile_wave2.json'),
+                                       n_fields, fill_rate)
+    generator.write_many(sys.argv[1], int(sys.argv[2]))
@@ -0,0 +1,246 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+columnar_writer.py
+"""
+
+
+import glob
+import math
+import os
+
+
+# The file extension of the partitions and of the combined file.
+ARROW_EXTENSION = '.arrow'
+
+# The number of rows per record batch of the combined file. One small batch
+# per PDF would slow down every later scan.
+CHUNK_ROWS = 1 << 20
+
+# The number of partition arrays buffered per column before they are copied
+# into one array.
+COMPACT_ARRAYS = 256
+
+
+def _schema():
+    """
+    Parameters: None
+    Returns:    schema: pyarrow.Schema
+                    The typed columns of the response master data. The
+                    repeated text columns are dictionary encoded.
+    """
+
+    import pyarrow as pa
+    text = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema([('BPCI ID', text), ('ID', pa.float64()), ('Question', text),
+                      ('Response', text), ('Response Weight', pa.float64()),
+                      ('Risk Level', pa.float64()), ('Risk Score', pa.float64())])
+
+
+def _float(x):
+    """
+    Parameters: x: object
+                    A numeric value of a response row.
+    Returns:    x: float
+                    The value, with NaN as None (a null in Arrow).
+    """
+
+    if x is None or (isinstance(x, float) and math.isnan(x)):
+        return None
+    return float(x)
+
+
+def partition_dir(out_fp, now):
+    """
+    Parameters: out_fp: str
+                    The path to output.
+                now: str
+                    The timestamp string.
+    Returns:    fp: str
+                    The directory that holds the per-PDF partitions of the
+                    response master data of a run.
+    """
+
+    return out_fp + '/response_master_%s_parts' % now
+
+
+def master_file_path(out_fp, now):
+    """
+    Parameters: out_fp: str
+                    The path to output.
+                now: str
+                    The timestamp string.
+    Returns:    fp: str
+                    The path to the combined response master data.
+    """
+
+    return out_fp + '/response_master_%s%s' % (now, ARROW_EXTENSION)
+
+
+def write_partition(fp, data):
+    """
+    Parameters: fp: str
+                    The path to the partition file.
+                data: iterable
+                    The rows of the response data, in the order of
+                    extract_pdf_fields.COLUMNS.
+    Returns:    None
+    """
+
+    import pyarrow as pa
+    schema = _schema()
+    cols = list(zip(*data)) or [[] for _ in schema]
+    arrays = []
+    for field, col in zip(schema, cols):
+        if pa.types.is_dictionary(field.type):
+            arrays += [pa.array(col, pa.string()).dictionary_encode()]
+        else:
+            arrays += [pa.array([_float(x) for x in col], field.type)]
+    table = pa.Table.from_arrays(arrays, schema=schema)
+    folder = os.path.dirname(fp)
+    if not os.path.exists(folder):
+        os.makedirs(folder, exist_ok=True)
+    # Write to a temporary file first, so the combine step never sees half a
+    # partition.
+    tmp = fp + '.tmp'
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp, fp)
+
+
+def _global_dictionaries(fps, schema):
+    """
+    Parameters: fps: list
+                    The paths to the partitions.
+                schema: pyarrow.Schema
+    Returns:    codes: dict
+                    For each dictionary encoded column, the index of each of
+                    its values over all partitions, in order of first
+                    appearance (as pyarrow.Table.unify_dictionaries orders
+                    them).
+    """
+
+    import pyarrow as pa
+    codes = {i: {} for i, x in enumerate(schema) if pa.types.is_dictionary(x.type)}
+    for fp in fps:
+        reader = pa.ipc.open_file(pa.memory_map(fp))
+        for k in range(reader.num_record_batches):
+            batch = reader.get_batch(k)
+            for i, values in codes.items():
+                for x in batch.column(i).dictionary.to_pylist():
+                    values.setdefault(x, len(values))
+    return codes
+
+
+def _write_batch(writer, schema, dictionaries, buffered, n):
+    """
+    Parameters: writer: pyarrow.ipc.RecordBatchFileWriter
+                schema: pyarrow.Schema
+                dictionaries: dict
+                    The combined dictionary of each dictionary encoded
+                    column.
+                buffered: list
+                    For each column, the arrays of the rows not yet written
+                    (the dictionary indices, for the dictionary encoded
+                    columns). The rows written are removed.
+                n: int
+                    The number of rows to write.
+    Returns:    None
+    """
+
+    import pyarrow as pa
+    arrays = []
+    for i, chunks in enumerate(buffered):
+        col = pa.concat_arrays(chunks)
+        # Keep the rest of the rows for the next record batch.
+        buffered[i] = [col.slice(n)] if len(col) > n else []
+        col = col.slice(0, n)
+        if i in dictionaries:
+            col = pa.DictionaryArray.from_arrays(col, dictionaries[i])
+        arrays += [col]
+    writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+
+def combine_partitions(out_fp, now, chunk_rows=CHUNK_ROWS):
+    """
+    Combine the partitions of a run into a single Arrow IPC file. The
+    partitions are memory mapped rather than read, and streamed into the
+    file in record batches of chunk_rows rows, so the memory used is bounded
+    by chunk_rows and the distinct text values, not by the size of the wave.
+    The file is written uncompressed, so it can itself be memory mapped by
+    load_master.
+
+    Parameters: out_fp: str
+                    The path to output.
+                now: str
+                    The timestamp string.
+                chunk_rows: int
+                    The number of rows per record batch of the file.
+    Returns:    fp: str
+                    The path to the combined file, or None if there are no
+                    partitions.
+    """
+
+    import pyarrow as pa
+    # The partitions are named after the PDF files, so sorting them gives the
+    # order of the master CSV file. In an incremental run, a changed PDF
+    # replaces its partition.
+    fps = sorted(glob.glob(os.path.join(partition_dir(out_fp, now), '*' + ARROW_EXTENSION)))
+    if not fps:
+        return None
+    schema = _schema()
+    # An IPC file has one dictionary per column, so a first pass collects the
+    # values of every partition's dictionaries into one.
+    codes = _global_dictionaries(fps, schema)
+    dictionaries = {i: pa.array(list(values), pa.string()) for i, values in codes.items()}
+    # The columns of the rows not yet written, as the dictionary indices of
+    # the text columns, so the batches of one record batch are concatenated
+    # without comparing dictionaries.
+    buffered = [[] for _ in schema]
+    n_buffered = 0
+    fp = master_file_path(out_fp, now)
+    tmp = fp + '.tmp'
+
+    with pa.OSFile(tmp, 'wb') as sink:
+        with pa.ipc.new_file(sink, schema) as writer:
+            for x in fps:
+                reader = pa.ipc.open_file(pa.memory_map(x))
+                for k in range(reader.num_record_batches):
+                    batch = reader.get_batch(k)
+                    for i in range(len(schema)):
+                        col = batch.column(i)
+                        if i in dictionaries:
+                            # Map the partition's dictionary indices to the
+                            # indices of the combined dictionary.
+                            remap = pa.array([codes[i][v] for v in col.dictionary.to_pylist()],
+                                             pa.int32())
+                            col = remap.take(col.indices)
+                        buffered[i] += [col]
+                        if len(buffered[i]) >= COMPACT_ARRAYS:
+                            # Copy the small arrays of the partitions into one,
+                            # which releases the mapped partitions.
+                            buffered[i] = [pa.concat_arrays(buffered[i])]
+                    n_buffered += batch.num_rows
+                    while n_buffered >= chunk_rows:
+                        _write_batch(writer, schema, dictionaries, buffered, chunk_rows)
+                        n_buffered -= chunk_rows
+            if n_buffered > 0:
+                _write_batch(writer, schema, dictionaries, buffered, n_buffered)
+    os.replace(tmp, fp)
+    return fp
+
+
+def load_master(fp):
+    """
+    Parameters: fp: str
+                    The path to a combined Arrow IPC file.
+    Returns:    table: pyarrow.Table
+                    The response master data, memory mapped, so loading does
+                    not copy or parse the file.
+    """
+
+    import pyarrow as pa
+    return pa.ipc.open_file(pa.memory_map(fp)).read_all()
@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+excel_export.py
+"""
+
+
+from concurrent.futures import ProcessPoolExecutor
+import csv
+import math
+import os
+
+
+# Columns converted to numbers when read back from CSV; all others are text.
+FLOAT_COLUMNS = ['ID', 'Response Weight', 'Risk Level', 'Risk Score']
+INT_COLUMNS = ['Global Number', 'Topic Number']
+
+
+def _cell(x):
+    """
+    Parameters: x: object
+                    A value of a response row.
+    Returns:    x: object
+                    The value, with NaN as an empty cell.
+    """
+
+    if isinstance(x, float) and math.isnan(x):
+        return None
+    return x
+
+
+def _typed_rows(reader, header):
+    """
+    Parameters: reader: csv.reader
+                    The reader, positioned after the header.
+                header: list
+                    The column names.
+    Returns:    rows: iterator
+                    The rows, with empty cells as None and the numeric
+                    columns converted back to numbers.
+    """
+
+    converters = []
+    for col in header:
+        if col in FLOAT_COLUMNS:
+            converters += [float]
+        elif col in INT_COLUMNS:
+            converters += [int]
+        else:
+            converters += [None]
+    for row in reader:
+        out = []
+        for val, conv in zip(row, converters):
+            if val == '':
+                out += [None]
+            elif conv is not None:
+                try:
+                    out += [conv(val)]
+                except ValueError:
+                    out += [val]
+            else:
+                out += [val]
+        yield out
+
+
+class ExcelMasterWorkbook:
+    """
+    Class used to build an XLSX file in a single streaming pass, with an
+    openpyxl write-only workbook: rows are appended as they are produced and
+    written out on close(), without reading the CSV files back with pandas.
+    Also used by the deferred stage that converts the per-PDF CSV files.
+    """
+
+    def __init__(self, fp, columns):
+        """
+        Parameters: fp: str
+                        The path to the XLSX file.
+                    columns: list
+                        The column names.
+        Returns:    None
+        """
+
+        from openpyxl import Workbook
+        self._file_path = fp
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet('Sheet1')
+        self._sheet.append(columns)
+
+    def append_csv(self, csv_fp):
+        """
+        Parameters: csv_fp: str
+                        The path to a CSV file with the same columns, whose
+                        rows are copied in (e.g. the rows that an earlier
+                        incremental run appended to a master CSV file).
+        Returns:    None
+        """
+
+        with open(csv_fp, 'r', newline='', encoding='utf-8-sig') as f:
+            reader = csv.reader(f)
+            header = next(reader, None)
+            if header is None:
+                return
+            self.write(_typed_rows(reader, header))
+
+    def append(self, row):
+        """
+        Parameters: row: list
+                        The row to append.
+        Returns:    None
+        """
+
+        self._sheet.append([_cell(x) for x in row])
+
+    def write(self, rows):
+        """
+        Parameters: rows: iterable
+                        The rows to append.
+        Returns:    None
+        """
+
+        for row in rows:
+            self.append(row)
+
+    def close(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        self._workbook.save(self._file_path)
+
+    # Read-only properties.
+    @property
+    def file_path(self):
+        return self._file_path
+
+
+def csv_to_xlsx(csv_fp, xlsx_fp=None):
+    """
+    Parameters: csv_fp: str
+                    The path to a per-PDF response CSV file.
+                xlsx_fp: str
+                    The path to the XLSX file. Defaults to csv_fp with the
+                    extension .xlsx.
+    Returns:    xlsx_fp: str
+    """
+
+    if xlsx_fp is None:
+        xlsx_fp = os.path.splitext(csv_fp)[0] + '.xlsx'
+    with open(csv_fp, 'r', newline='', encoding='utf-8-sig') as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        workbook = ExcelMasterWorkbook(xlsx_fp, header)
+        workbook.write(_typed_rows(reader, header))
+    workbook.close()
+    return xlsx_fp
+
+
+def pending_csv_files(out_fp):
+    """
+    Parameters: out_fp: str
+                    The path to an output directory.
+    Returns:    fps: list
+                    The per-PDF response CSV files that have no XLSX file yet.
+    """
+
+    fps = []
+    for name in sorted(os.listdir(out_fp)):
+        base, ext = os.path.splitext(name)
+        if ext.lower() != '.csv' or not base.startswith('responses_'):
+            continue
+        if not os.path.exists(os.path.join(out_fp, base + '.xlsx')):
+            fps += [os.path.join(out_fp, name)]
+    return fps
+
+
+def export_per_pdf_excel(csv_fps, workers=None, mp_context=None):
+    """
+    Parameters: csv_fps: list
+                    The per-PDF CSV files to convert.
+                workers: int
+                    The number of worker processes. Defaults to the number of
+                    CPUs.
+                mp_context: multiprocessing context
+                    The context of the worker processes. Defaults to the
+                    platform default.
+    Returns:    xlsx_fps: list
+                    The XLSX files written.
+    """
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(csv_fps) < 2:
+        return [csv_to_xlsx(x) for x in csv_fps]
+    n = min(workers, len(csv_fps))
+    chunksize = max(1, min(16, len(csv_fps) // (4 * n)))
+    with ProcessPoolExecutor(max_workers=n, mp_context=mp_context) as executor:
+        return list(executor.map(csv_to_xlsx, csv_fps, chunksize=chunksize))
@@ -0,0 +1,263 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+extract_cli.py
+
+Command line entry point for headless batch runs (cron, servers), e.g.
+
+    python extract_cli.py input/ -j info_wave2.json -o out/ -w 8 \
+        --output deferred --incremental --cache .cache --report run.json
+
+or, for a folder of PDFs of several waves, routed by their field keys,
+
+    python extract_cli.py input/ -j wave1.qtpl -j wave2.qtpl -o out/
+
+Only the standard library is imported up front; the extraction modules (and
+with them pandas) are imported once the arguments have been parsed, and
+tkinter is never imported.
+"""
+
+
+import argparse
+from datetime import datetime
+import json
+import multiprocessing
+import os
+import sys
+import time
+import traceback
+
+
+# The output modes of extract_pdf_fields.OUTPUT_MODES, listed here so that
+# --help does not import the extraction modules.
+OUTPUT_MODES = ['excel', 'csv', 'deferred', 'master']
+
+LOG_LEVELS = ['debug', 'info', 'warning', 'error']
+
+
+def parse_args(argv=None):
+    """
+    Parameters: argv: list
+                    The command line arguments. Defaults to sys.argv[1:].
+    Returns:    args: argparse.Namespace
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Extract the form fields of questionnaire PDFs into CSV/Excel tables.')
+    parser.add_argument('pdf', help='PDF file, or directory of PDF files')
+    parser.add_argument('-j', '--info', required=True, action='append',
+                        help='JSON info file of the questionnaire, or a compiled template '
+                             '(template_compiler.py). Give compiled templates more than once to '
+                             'route each PDF to the template its field keys match, with the '
+                             'output of each template in a folder of the same name under the '
+                             'output directory')
+    parser.add_argument('-o', '--out', default='./out', help='output directory (default: ./out)')
+    parser.add_argument('-r', '--risk-profile', default=None,
+                        help='JSON risk profile (default: ./risk_profile_wave2.json)')
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help='number of worker processes (default: number of CPUs)')
+    parser.add_argument('--output', choices=OUTPUT_MODES, default='excel',
+                        help='per-PDF files: XLSX and CSV (excel), CSV only (csv), CSV now '
+                             'and XLSX after the masters (deferred), or none (master)')
+    parser.add_argument('--master-excel', action='store_true',
+                        help='also write the master files as XLSX')
+    parser.add_argument('--columnar', action='store_true',
+                        help='also write the master data as a memory-mappable Arrow file')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only extract PDFs that are new or changed since the last run, '
+                             'appending to its master files')
+    parser.add_argument('--cache', default=None, metavar='DIR',
+                        help='cache parsed PDFs in DIR, keyed by content')
+    parser.add_argument('--cache-max-mb', type=int, default=None,
+                        help='maximum size of the cache in MB (default: 512)')
+    parser.add_argument('--pypdf', action='store_true',
+                        help='read the form fields with PyPDF3 only')
+    parser.add_argument('--now', default=None,
+                        help='timestamp of the master files (default: current time)')
+    parser.add_argument('--report', default=None, metavar='FILE',
+                        help="write a JSON summary of the run, with the time of each stage and "
+                             "the counters, to FILE ('-' for stdout)")
+    parser.add_argument('--log-level', default='info', choices=LOG_LEVELS,
+                        help='log level (default: info; debug logs every scored field)')
+    parser.add_argument('--log-json', action='store_true',
+                        help='log one JSON object per line, for log collectors')
+    args = parser.parse_args(argv)
+    if not os.path.exists(args.pdf):
+        parser.error('PDF file or directory does not exist: %s' % args.pdf)
+    for info_fp in args.info:
+        if not os.path.isfile(info_fp):
+            parser.error('Info file does not exist: %s' % info_fp)
+    if len(args.info) > 1:
+        # A JSON info file would be scored with the one risk profile and
+        # radio button mapping of the run, whatever its wave; a compiled
+        # template carries its own.
+        from questionnaire_context import is_compiled_template
+        for info_fp in args.info:
+            if not is_compiled_template(info_fp):
+                parser.error('Routing needs compiled templates (template_compiler.py), '
+                             'not a JSON info file: %s' % info_fp)
+        if args.risk_profile is not None:
+            parser.error('-r cannot be used when routing: each compiled template carries '
+                         'its own risk profile.')
+    if args.workers is not None and args.workers < 1:
+        parser.error('Number of workers must be at least 1.')
+    return args
+
+
+def write_report(report, fp):
+    """
+    Parameters: report: dict
+                    The summary of the run.
+                fp: str
+                    The path to the JSON file, or '-' for stdout.
+    Returns:    None
+    """
+
+    if fp == '-':
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write('\n')
+        return
+    with open(fp, 'w') as f:
+        json.dump(report, f, indent=2)
+
+
+def batch_summary(batch, out_fp):
+    """
+    Parameters: batch: BatchExtractor
+                    A batch that has run.
+                out_fp: str
+                    Its output directory.
+    Returns:    summary: dict
+                    The counts, stage times and master files of the batch.
+    """
+
+    summary = {'now': batch.now, 'workers': batch.workers,
+               'n_processed': batch.n_processed, 'n_skipped': batch.n_skipped}
+    summary.update(batch.metrics.as_dict())
+    prefixes = tuple(x % batch.now for x in ['response_master_%s.', 'response_raw_master_%s.',
+                                             'info_%s.'])
+    summary['master_files'] = sorted(os.path.join(out_fp, x) for x in os.listdir(out_fp)
+                                     if x.startswith(prefixes))
+    return summary
+
+
+def run(args):
+    """
+    Parameters: args: argparse.Namespace
+                    The parsed command line arguments.
+    Returns:    report: dict
+                    The summary of the run.
+    """
+
+    # Imported here, so the command line stays light until a run starts.
+    from batch_extract import BatchExtractor, list_pdfs
+    from questionnaire_context import QuestionnaireContext, RISK_PROFILE_FILE_PATH
+    from result_cache import CACHE_MAX_BYTES, ResultCache
+    from run_metrics import configure_logging, get_logger
+    from template_registry import TemplateRegistry
+
+    configure_logging(args.log_level, args.log_json)
+    if not os.path.exists(args.out):
+        os.makedirs(args.out)
+    started = datetime.now()
+    t0 = time.time()
+    routed = len(args.info) > 1
+    report = {'status': 'ok', 'started': started.isoformat(timespec='seconds'),
+              'pdf_file_path': args.pdf, 'info_file_path': args.info if routed else args.info[0],
+              'out_file_path': args.out, 'output': args.output,
+              'master_excel': args.master_excel, 'columnar': args.columnar,
+              'incremental': args.incremental, 'cache': args.cache}
+    risk_fp = RISK_PROFILE_FILE_PATH if args.risk_profile is None else args.risk_profile
+    batch = None
+    batches = []
+    try:
+        cache = None
+        if args.cache is not None:
+            max_bytes = CACHE_MAX_BYTES
+            if args.cache_max_mb is not None:
+                max_bytes = args.cache_max_mb * 1024 * 1024
+            cache = ResultCache(args.cache, max_bytes)
+        kwargs = {'workers': args.workers, 'fast_read': not args.pypdf, 'cache': cache,
+                  'incremental': args.incremental, 'output': args.output,
+                  'master_excel': args.master_excel, 'columnar': args.columnar}
+        if not routed:
+            context = QuestionnaireContext(args.info[0], risk_fp)
+            report['fingerprint'] = context.fingerprint
+            report['template_version'] = context.template_version
+            batch = BatchExtractor(args.pdf, args.info[0], args.out, args.now,
+                                   context=context, **kwargs)
+            batch.run()
+        else:
+            # Each PDF goes to the template its field keys match, in one
+            # pass over the folder, and each template is a batch of its own.
+            registry = TemplateRegistry()
+            for info_fp in args.info:
+                registry.register(info_fp)
+            routes, unmatched = registry.route(list_pdfs(args.pdf), not args.pypdf)
+            report['unmatched'] = [{'pdf_file_path': x, 'reason': y} for x, y in unmatched]
+            for entry in registry.entries:
+                if entry.name not in routes:
+                    continue
+                out_fp = os.path.join(args.out, entry.name)
+                if not os.path.exists(out_fp):
+                    os.makedirs(out_fp)
+                batches += [(entry, out_fp, BatchExtractor(
+                    routes[entry.name], entry.info_file_path, out_fp, args.now,
+                    context=entry.context, **kwargs))]
+                batches[-1][2].run()
+    except KeyboardInterrupt:
+        report['status'] = 'interrupted'
+    except Exception as e:
+        get_logger(__name__).exception('Run failed')
+        report['status'] = 'error'
+        report['error'] = '%s: %s' % (type(e).__name__, e)
+        report['traceback'] = traceback.format_exc()
+    elapsed = time.time() - t0
+    n_processed = None
+    if batch is not None:
+        report.update(batch_summary(batch, args.out))
+        n_processed = batch.n_processed
+    if routed:
+        report['templates'] = {}
+        for entry, out_fp, x in batches:
+            report['templates'][entry.name] = {
+                'info_file_path': entry.info_file_path, 'out_file_path': out_fp,
+                'fingerprint': entry.context.fingerprint,
+                'template_version': entry.context.template_version}
+            report['templates'][entry.name].update(batch_summary(x, out_fp))
+        n_processed = sum(x.n_processed for _, _, x in batches)
+        report['n_processed'] = n_processed
+    report['finished'] = datetime.now().isoformat(timespec='seconds')
+    report['elapsed_seconds'] = round(elapsed, 3)
+    if n_processed is not None and elapsed > 0:
+        report['files_per_second'] = round(n_processed / elapsed, 3)
+    return report
+
+
+def main(argv=None):
+    """
+    Parameters: argv: list
+                    The command line arguments. Defaults to sys.argv[1:].
+    Returns:    code: int
+                    The exit code: 0 on success, 1 on error, 130 if
+                    interrupted.
+    """
+
+    args = parse_args(argv)
+    report = run(args)
+    if args.report is not None:
+        write_report(report, args.report)
+    if report['status'] == 'error':
+        sys.stderr.write('Extraction failed: %s\n' % report['error'])
+        return 1
+    if report['status'] == 'interrupted':
+        return 130
+    return 0
+
+
+if __name__ == '__main__':
+    # Needed for the process pool in the frozen executable.
+    multiprocessing.freeze_support()
+    sys.exit(main())
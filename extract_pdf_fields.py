@@ -10,18 +10,50 @@ extract_pdf_fields.py
 
 
 
-import csv
+from collections import namedtuple
 import datetime
 import json
+import logging
 import os
-import pandas as pd
-import numpy as np
-import PyPDF3
 import sys
+import time
 import warnings
 warnings.filterwarnings("ignore", message="Xref table not zero-indexed. ID numbers for objects will be corrected.")
 import unicodedata
 
+from acroform_reader import read_fields
+from columnar_writer import ARROW_EXTENSION, partition_dir, write_partition
+from master_writer import MasterWriter, write_csv
+from questionnaire_context import QuestionnaireContext, radio_code
+from response_record import NOT_ANSWERED, ResponseRecord
+from risk_table import normalize_quotes
+from run_metrics import RunMetrics, get_logger
+
+
+# pandas and PyPDF3 are imported where they are first needed (the XLSX files
+# and the PyPDF3 reader), so importing this module, and with it starting the
+# GUI or a worker process, stays fast.
+
+# The columns of the response data and the raw response data.
+COLUMNS = ['BPCI ID', 'ID', 'Question','Response', 'Response Weight', 'Risk Level', 'Risk Score']
+COLUMNS_RAW = ['BPCI ID', 'Global Number', 'Topic Number', 'Topic', 'Question', 'Response']
+
+# Output modes for the per-PDF response files: XLSX and CSV files (the
+# default), CSV files only, CSV files now and XLSX files in a later
+# post-processing stage (see excel_export.py), or none (master files only).
+OUTPUT_EXCEL = 'excel'
+OUTPUT_CSV = 'csv'
+OUTPUT_DEFERRED = 'deferred'
+OUTPUT_MASTER = 'master'
+OUTPUT_MODES = [OUTPUT_EXCEL, OUTPUT_CSV, OUTPUT_DEFERRED, OUTPUT_MASTER]
+
+# The normalized response to one PDF field, from which both the scored and the
+# raw output rows are projected.
+FieldResponse = namedtuple('FieldResponse', ['key', 'item_id', 'item', 'answered', 'response'])
+
+log = get_logger(__name__)
+
+
 class ExtractPdfFields:
     """
     Class used to extract fields from a PDF. Input consists of the PDF file
@@ -30,7 +62,8 @@ class ExtractPdfFields:
     descriptive information associated to the field.
     """
 
-    def __init__(self, pdf_fp, info_fp, out_fp, now):
+    def __init__(self, pdf_fp, info_fp, out_fp, now, context=None, fast_read=True,
+                 cache=None):
         """
         Parameters: pdf_fp: str
                         The path to the PDF file.
@@ -40,6 +73,17 @@ class ExtractPdfFields:
                         The path to output
                     now: str
 		    	The timestamp string.
+                    context: QuestionnaireContext
+                        The loaded info map, radio button mapping and risk
+                        profile. If None, it is loaded from info_fp. Pass a
+                        shared context to avoid reloading them for every PDF.
+                    fast_read: bool
+                        If True, read the form fields with the lightweight
+                        AcroFormReader, falling back to PyPDF3 for files it
+                        cannot handle. If False, always use PyPDF3.
+                    cache: ResultCache
+                        If given, reuse the parsed responses of an unchanged
+                        PDF from the cache, and store newly parsed ones.
         Returns:    None
         """
         # Set the imported properties.
@@ -47,50 +91,50 @@ class ExtractPdfFields:
         self._pdf_file_path = pdf_fp
         self._out_file_path = out_fp
         self._now = now
-        # TODO: NT manually update radio button mapping below by trying 1 option at a time
+        self._fast_read = fast_read
+        # The stage times and counters of this PDF.
+        self._metrics = RunMetrics()
+        if context is None:
+            context = QuestionnaireContext(info_fp)
+        self._context = context
         # Radio button mapping
-        self.dict_radio_button = {
-            'Group1':{
-                '1': 'Participated in the past 12 months and currently participating',
-                '2': 'Participated in the past 12 months but not currently participating',
-                '3': 'Did not participate in the past 12 months but currently participating',
-                '4': 'Did not participate in the past 12 months and not currently participating',
-                '9': ''
-            },
-            'Group2':{
-                '5': 'Participated in the past 12 months and currently participating',
-                '6': 'Participated in the past 12 months but not currently participating',
-                '7': 'Did not participate in the past 12 months but currently participating',
-                '8': 'Did not participate in the past 12 months and not currently participating',
-                '9': ''
-            },
-            'Group3':{
-                '10': 'Strongly agree',
-                '11': 'Agree',
-                '12': 'Neutral',
-                '13': 'Disagree',
-                '14': 'Strongly disagree',
-                '15': 'Unsure',
-                '16': 'NA; implementation is in progress',
-                '17': 'NA; implementation not started'
-            },
-            # }
-        }
+        self.dict_radio_button = context.dict_radio_button
         # get risk profile
-        self.risk_profile = self.import_risk_profile()
+        self.risk_profile = context.risk_profile
+        # Look for the parsed responses of this exact PDF and questionnaire.
+        self._cache = cache
+        self._from_cache = False
+        cached = None
+        if cache is not None:
+            with self._metrics.stage('cache_lookup'):
+                self._cache_key = cache.key(pdf_fp, context.fingerprint)
+                cached = cache.get(self._cache_key)
+            self._metrics.count('bytes_hashed', os.path.getsize(pdf_fp))
+            self._metrics.count('cache_hits' if cached is not None else 'cache_misses')
+        self._metrics.count('pdfs')
+        if cached is not None:
+            log.info('Now loading cached %s', self._pdf_file_path)
+            self._from_cache = True
+            self._get_info()
+            self._fields = None
+            self._bpci_id = cached['bpci_id']
+            self._organization_name = cached['organization_name']
+            self._records = [ResponseRecord.from_rows(x, y)
+                             for x, y in zip(cached['data'], cached['data_raw'])]
+            return
         # Extract the needed file information
         self._import()
         # Parse the field info.
-        print('Now parsing %s' % self._pdf_file_path)
+        log.info('Now parsing %s', self._pdf_file_path)
         self._parse_fields()
-
-    def import_risk_profile(self):
-        with open('./risk_profile_wave2.json', 'r') as f:
-            rp = json.load(f)
-        # convert keys (id) to float to match id in info.json
-        rp = {float(k): v for k, v in rp.items()}
-        return rp
-
+        if cache is not None:
+            with self._metrics.stage('cache_store'):
+                # The entries hold plain rows, as rescore.py reads them.
+                cache.put(self._cache_key, {'bpci_id': self.bpci_id,
+                                            'organization_name': self.organization_name,
+                                            'data': list(self.rows()),
+                                            'data_raw': [x.row_raw() + [x.item_id]
+                                                         for x in self._records]})
 
     def _find_bpci_id(self):
         """
@@ -99,9 +143,8 @@ class ExtractPdfFields:
                         The BPCI ID.
         """
 
-        bpci_list = [x for x in self.info.items() if x[1]['text'] == 'BPID']
-        if len(bpci_list) > 0:
-            bpci_item = self.fields[bpci_list[0][0]]
+        if self.context.bpci_key is not None:
+            bpci_item = self.fields[self.context.bpci_key]
             if '/V' in bpci_item.keys():
                 return bpci_item['/V']
             else:
@@ -116,10 +159,8 @@ class ExtractPdfFields:
                         The organization name.
         """
 
-        text = 'Organization Legal Name'
-        name_list = [x for x in self.info.items() if x[1]['text'] == text]
-        if len(name_list) > 0:
-            name_item = self.fields[name_list[0][0]]
+        if self.context.organization_key is not None:
+            name_item = self.fields[self.context.organization_key]
             if '/V' in name_item.keys():
                 name = name_item['/V']
                 # some org legal name can have '-' chars, causing above org to be bytes, so decode in utf-8
@@ -138,7 +179,14 @@ class ExtractPdfFields:
         """
 
         # Import the PDF fields as a dictionary.
-        self._fields = PyPDF3.PdfFileReader(self.pdf_file_path).getFields()
+        with self._metrics.stage('read_fields'):
+            if self._fast_read:
+                self._fields = read_fields(self.pdf_file_path)
+            else:
+                import PyPDF3
+                self._fields = PyPDF3.PdfFileReader(self.pdf_file_path).getFields()
+        self._metrics.count('bytes_read', os.path.getsize(self.pdf_file_path))
+        self._metrics.count('fields', len(self._fields or {}))
 
     def _get_info(self):
         """
@@ -146,9 +194,8 @@ class ExtractPdfFields:
         Returns:    None
         """
 
-        # Import the JSON file as a dictionary.
-        with open(self.info_file_path, 'r') as f:
-            self._info = json.load(f)
+        # The JSON file is loaded once by the shared context.
+        self._info = self.context.info
 
     def _import(self):
         """
@@ -160,117 +207,100 @@ class ExtractPdfFields:
         self._get_info()
         self._get_fields()
 
+    def _normalize_field(self, key, val):
+        """
+        Parameters: key: str
+                        The PDF field key.
+                    val: dict
+                        The PDF field.
+        Returns:    record: FieldResponse
+                        The decoded and parsed response to the field. This is
+                        computed once per field and shared by the scored and
+                        the raw outputs.
+        """
+
+        item = self.info[key]
+        item_id = item['id']
+        # Get any response that may exist.
+        if not '/V' in val.keys():
+            return FieldResponse(key, item_id, item, False, '')
+        content = val['/V']
+        if key in self.dict_radio_button:
+            # radio button, parse separately (Group# in wave 2, RadioButton# in wave 1)
+            radio_button_code = radio_code(content)
+            content = self.dict_radio_button[key][radio_button_code]
+        else:
+            if isinstance(content, bytes):
+                # line breakers in text input may make content as bytes, decode and remove \r, \n, etc.
+                content = content.decode('utf-8', errors='ignore').replace('\r', '').replace('\n', '')
+            content = content.lstrip('/')
+        response = self._parse_response(content, item_id)
+        return FieldResponse(key, item_id, item, True, response)
+
+    def _risk_columns(self, record):
+        """
+        Parameters: record: FieldResponse
+                        The parsed response to a field.
+        Returns:    risk: list
+                        The 'Response Weight', 'Risk Level' and 'Risk Score'.
+        """
+
+        # The compiled risk table handles the missing ('---') and the not
+        # applicable responses (risk score 0, assigned 3 in WAVE 1).
+        return list(self.context.risk_table.score(record.item_id, record.response))
+
     def _parse_fields(self):
         """
         Parameters: None
         Returns:    None
         """
 
-        # Generate a DataFrame from the imported fields.
-        cols = ['BPCI ID', 'ID', 'Question','Response', 'Response Weight', 'Risk Level', 'Risk Score']
-        cols_raw = ['BPCI ID', 'Global Number', 'Topic Number', 'Topic']
-        cols_raw += ['Question', 'Response', 'ID']
         # Get the BPCI ID and the Organization name.
         self._bpci_id = self._find_bpci_id()
         self._organization_name = self._find_organization_name()
         # Loop through each field and fill in the data.
-        data = []
-        data_raw = []
+        records = []
+        # Checked once per PDF, so the per-field logging costs nothing when
+        # disabled.
+        debug = log.isEnabledFor(logging.DEBUG)
+        levels = self.context.risk_table.levels
+        clock = time.perf_counter
+        t_normalize = 0.0
+        t_score = 0.0
+        n_answered = 0
+        t_start = clock()
         for key, val in self.fields.items():
-            # We only want key, val pairs for which we have info.
-            if key in self.info.keys():
-                # Each of the fields for which we need data have a key 'id'.
-                if 'id' in self.info[key].keys():
-                    item_id = self.info[key]['id']
-                    row = [self.bpci_id]
-                    row += [self.info[key]['id']]
-                    row += [self.info[key]['text']]
-                    # Get any response that may exist.
-                    if '/V' in val.keys():
-                        if key[:5]!='Group': # in WAVE1, if key[:11]!='RadioButton'
-                            content = val['/V']
-                            if isinstance(content, PyPDF3.generic.ByteStringObject):
-                                # print('--- content before decode = \n%s ' % content)
-                                # line breakers in text input may make content as bytes, decode and remove \r, \n, etc.
-
-                                content = content.decode('utf-8', errors='ignore').replace('\r', '').replace('\n', '')
-                            else:
-                                pass
-                            content = content.lstrip('/')
-                            response = self._parse_response(content, row[1])
-                            row += [response]
-                        else: # radio button, parse separately
-                            radio_button_code = val['/V'].lstrip('/Choice')
-                            radio_button_content = self.dict_radio_button[key][radio_button_code]
-                            response = self._parse_response(radio_button_content, row[1])
-                            row += [response]
-                    else:
-                        response = ''
-                        row += [response]
-
-                    # Append the risk. - 'Response Weight', 'Risk Level', 'Risk Score'
-                    # missing response in PDF could be '---' or something similar (any length)
-                    if len(response)>0:
-                        if set(response)!= {'-'} and response.lower() not in ['na; implementation is in progress',
-                                                                              'na; implementation not started',
-                                                                              'na']:
-                            #^ N/A or invalid for risk scoring
-                            if self.info[key]['id'] in self.risk_profile.keys():
-                                print('key=%s, val=%s, %s' % (key, val, self.info[key]['id']))
-                                row += [self.risk_profile[self.info[key]['id']][response.lower()]['Response Weights'],
-                                        self.risk_profile[self.info[key]['id']][response.lower()]['Risk Level'],
-                                        self.risk_profile[self.info[key]['id']][response.lower()]['risk_score']]
-                            else:
-                                row += [np.nan, np.nan, np.nan]
-                        else: # response belongs to above exception cases, assign risk score=0 (assigned 3 in WAVE 1)
-                            if self.info[key]['id'] in self.risk_profile.keys(): # if question id in risk profile
-                                # get a valid response (eg the first) item for question id = id in risk profile
-                                valid_resp = list(self.risk_profile[self.info[key]['id']].keys())[0]
-                                q_risk_lvl = self.risk_profile[self.info[key]['id']][valid_resp]['Risk Level']
-                                row += [0, q_risk_lvl, 0*q_risk_lvl]
-                            else:
-                                row += [np.nan, np.nan, np.nan]
-                    else:
-                        row += [np.nan, np.nan, np.nan]
-                    # Append the row to the data.
-                    data += [row]
-
-                    # Now for the raw data.
-                    # 'num' is 0-ordered in items.csv when set_field() for PDF.
-                    # With 2 id-check questions (ID, Org Name) at beginning, num=2 in item.csv
-                    # will need Global Number = 1, thus minus 1 from self.info[key]['num']
-                    # which gets item by num in info.json.
-                    row = [self.bpci_id, self.info[key]['num'] - 1]
-                    row += [self.info[key]['local'], self.info[key]['group']]
-                    row += [self.info[key]['text']]
-                    # Now the response.
-                    if '/V' in val.keys():
-                        if key[:11]!='RadioButton':
-                            content = val['/V']
-                            if isinstance(content, PyPDF3.generic.ByteStringObject):
-                                # line breakers in text input may make content as bytes, decode and remove \r, \n, etc.
-                                content = content.decode('utf-8', errors='ignore').replace('\r', '').replace('\n', '')
-                            else:
-                                pass
-                            content = content.lstrip('/')
-                            row += [self._parse_response(content, item_id)]
-                        else:
-                            radio_button_code = val['/V'].lstrip('/')
-                            radio_button_content = self.dict_radio_button[key][radio_button_code]
-                            row += [self._parse_response(radio_button_content, row[1])]
-                    else:
-                        row += ['Not Selected/ Not Answered']
-                    # Temporarily append the id for sorting purposes.
-                    row += [item_id]
-                    data_raw += [row]
+            # We only want key, val pairs for which we have info. Each of the
+            # fields for which we need data have a key 'id'.
+            if not key in self.info.keys() or not 'id' in self.info[key].keys():
+                continue
+            t0 = clock()
+            field = self._normalize_field(key, val)
+            t1 = clock()
+            item = field.item
+            # One record holds both the scored row, with the risk, and the
+            # raw row. 'num' is 0-ordered in items.csv when set_field() for
+            # PDF. With 2 id-check questions (ID, Org Name) at beginning,
+            # num=2 in item.csv will need Global Number = 1, thus minus 1
+            # from self.info[key]['num'] which gets item by num in info.json.
+            weight, level, score = self._risk_columns(field)
+            raw_response = field.response if field.answered else NOT_ANSWERED
+            records += [ResponseRecord(self.bpci_id, field.item_id, item['text'], field.response,
+                                       weight, level, score, item['num'] - 1, item['local'],
+                                       item['group'], raw_response)]
+            t_score += clock() - t1
+            t_normalize += t1 - t0
+            n_answered += field.answered
+            if debug and len(field.response) > 0 and field.item_id in levels:
+                log.debug('key=%s, response=%s, %s', key, field.response, field.item_id)
         # Sort the data according to the ID.
-        data = sorted(data, key=lambda x: x[1])
-        data_raw = sorted(data_raw, key=lambda x: x[-1])
-        # Now generate the data frame.
-        self._response_data = pd.DataFrame(data, columns=cols)
-        self._response_data_raw = pd.DataFrame(data_raw, columns=cols_raw)
-        # Drop the ID from the raw data.
-        self._response_data_raw.drop('ID', axis=1, inplace=True)
+        records.sort(key=lambda x: x.item_id)
+        self._records = records
+        self._metrics.add_time('parse', clock() - t_start)
+        self._metrics.add_time('normalize', t_normalize)
+        self._metrics.add_time('score', t_score)
+        self._metrics.count('fields_parsed', len(records))
+        self._metrics.count('fields_answered', n_answered)
 
     def _parse_response(self, response, item_id):
         """
@@ -282,26 +312,24 @@ class ExtractPdfFields:
                         The parsed response.
         """
 
-        # Find the info associated to this item ID.
-        check_id = lambda x: 'id' in x.keys() and x['id'] == item_id
-        info = [x for x in self.info.values() if check_id(x)]
+        # Find the response remap table of this item ID.
+        values = self.context.values_by_id.get(item_id)
         w = response
-        if len(info) > 0:
-            if 'values' in info[0] and response in info[0]['values']:
-                w = info[0]['values'][response]
-        w = w.replace("\u2018", "'").replace("\u2019", "'").strip()
+        if values is not None and response in values:
+            w = values[response]
+        w = normalize_quotes(w).strip()
         w = w.replace('N/A', 'NA')
         return w
 
-    def export(self):
+    def _file_names(self):
         """
         Parameters: None
-        Returns:    None
+        Returns:    org: str
+                        The organization name, safe for use in file names.
+                    bpci: str
+                        The lower case BPCI ID.
         """
 
-        # # Generate an output directory, if needed.
-        # if not os.path.exists('./out'):
-        #     os.mkdir('./out')
         org = self.organization_name.lower().strip()
         # some org name has chars not allowed for windows file names, replace as '-'
         bad_fn_chars = ['\\', '/', ':', '*', '?', '\"', '<', '>', '|']
@@ -310,54 +338,172 @@ class ExtractPdfFields:
             for char in bad_fn_chars:
                 org = org.replace(char, '-')
         bpci = self.bpci_id.lower().strip()
+        return org, bpci
+
+    def export(self, output=OUTPUT_EXCEL):
+        """
+        Parameters: output: str
+                        The output mode of the per-PDF files, one of
+                        OUTPUT_MODES.
+        Returns:    None
+        """
+
+        # Write the per-PDF files, then append to the master files.
+        self.export_responses(output)
+        self.export_master()
+
+    def _response_file_paths(self):
+        """
+        Parameters: None
+        Returns:    out: str
+                        The response file path without extension.
+                    out_raw: str
+                        The raw response file path without extension.
+        """
+
+        org, bpci = self._file_names()
         # Begin with the response file name without extension.
         out = self._out_file_path + '/responses_' + bpci + '_' + org
-        # Write responses to XLSX.
-        self.response_data.to_excel(out + '.xlsx', index=False)
-        # Write responses to CSV.
-        self.response_data.to_csv(out + '.csv', index=False, encoding='utf-8-sig')
-        # Append to the master file.
-        out_m = self._out_file_path + '/response_master_%s.csv' % self.now
-        if not os.path.exists(out_m):
-            self.response_data.to_csv(out_m, index=False, encoding='utf-8-sig')
-        else:
-            csv_in = {'mode':'a', 'header':False, 'index':False, 'encoding':'utf-8-sig'}
-            self.response_data.to_csv(out_m, **csv_in)
-        # Append to the master info file.
-        info_m = self._out_file_path + '/info_%s.csv' % self.now
-        if not os.path.exists(info_m):
-            with open(info_m, 'w', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow(['organization', 'bpci_id'])
-                writer.writerow([org, bpci])
-        else:
-            with open(info_m, 'a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([org, bpci])
         # Begin with the raw response file name without extension.
-        out = self._out_file_path + '/responses_raw_' + self.bpci_id.lower().strip()
-        out += '_' + org
-        # Write responses to XLSX.
-        self.response_data_raw.to_excel(out + '.xlsx', index=False)
-        # Write responses to CSV.
-        self.response_data_raw.to_csv(out + '.csv', index=False, encoding='utf-8-sig')
-        # Append to the master file. 
-        out_m = self._out_file_path + '/response_raw_master_%s.csv' % self.now
-        if not os.path.exists(out_m):
-            self.response_data_raw.to_csv(out_m, index=False, encoding='utf-8-sig')
-        else:
-            csv_in = {'mode':'a', 'header':False, 'index':False, 'encoding':'utf-8-sig'}
-            self.response_data_raw.to_csv(out_m, **csv_in)
+        out_raw = self._out_file_path + '/responses_raw_' + self.bpci_id.lower().strip()
+        out_raw += '_' + org
+        return out, out_raw
+
+    def export_responses(self, output=OUTPUT_EXCEL):
+        """
+        Write the per-PDF response files. These file names are unique to the
+        PDF, so this is safe to call from parallel workers.
+
+        Parameters: output: str
+                        The output mode, one of OUTPUT_MODES. With
+                        OUTPUT_DEFERRED only the CSV files are written, and
+                        the XLSX files are left to
+                        excel_export.export_per_pdf_excel.
+        Returns:    fps: list
+                        The CSV files written.
+        """
+
+        if output not in OUTPUT_MODES:
+            raise ValueError('Unknown output mode %s.' % output)
+        if output == OUTPUT_MASTER:
+            return []
+        # # Generate an output directory, if needed.
+        # if not os.path.exists('./out'):
+        #     os.mkdir('./out')
+        out, out_raw = self._response_file_paths()
+        exts = ['.csv'] if output == OUTPUT_CSV else ['.xlsx', '.csv']
+        if self.from_cache:
+            # An unchanged PDF whose files are already in the output
+            # directory: only the master files need rebuilding.
+            paths = [x + ext for x in [out, out_raw] for ext in exts]
+            if all([os.path.exists(x) for x in paths]):
+                self._metrics.count('response_files_reused')
+                return []
+        if output == OUTPUT_EXCEL:
+            # Write responses to XLSX. The data frames are only built for
+            # this, and are not kept.
+            with self._metrics.stage('to_excel'):
+                self.response_data.to_excel(out + '.xlsx', index=False)
+                self.response_data_raw.to_excel(out_raw + '.xlsx', index=False)
+        # Write responses to CSV, streaming the rows.
+        with self._metrics.stage('to_csv'):
+            write_csv(out + '.csv', COLUMNS, self.rows())
+            write_csv(out_raw + '.csv', COLUMNS_RAW, self.rows_raw())
+        return [out + '.csv', out_raw + '.csv']
+
+    def export_columnar(self):
+        """
+        Write the response data as a typed, columnar partition of the master
+        data of the run (see columnar_writer.py). The partition is named after
+        the PDF file, so this is safe to call from parallel workers.
+
+        Parameters: None
+        Returns:    fp: str
+                        The path to the partition.
+        """
+
+        name = os.path.splitext(os.path.basename(self.pdf_file_path))[0]
+        fp = os.path.join(partition_dir(self._out_file_path, self.now), name + ARROW_EXTENSION)
+        if self.from_cache and os.path.exists(fp):
+            return fp
+        with self._metrics.stage('export_columnar'):
+            write_partition(fp, self.rows())
+        return fp
+
+    def export_master(self, writer=None):
+        """
+        Append the responses to the master files shared by every PDF of the
+        run. Only one process may call this at a time.
+
+        Parameters: writer: MasterWriter
+                        The open master files of the run. If None, the
+                        master files are opened just for this PDF.
+        Returns:    None
+        """
+
+        org, bpci = self._file_names()
+        with self._metrics.stage('export_master'):
+            if writer is None:
+                with MasterWriter(self._out_file_path, self.now, COLUMNS, COLUMNS_RAW) as writer:
+                    writer.write(org, bpci, self.rows(), self.rows_raw())
+            else:
+                writer.write(org, bpci, self.rows(), self.rows_raw())
+
+    def rows(self):
+        """
+        Parameters: None
+        Returns:    rows: iterator
+                        The rows of the response data, in the order of
+                        COLUMNS.
+        """
+
+        for record in self._records:
+            yield record.row()
+
+    def rows_raw(self):
+        """
+        Parameters: None
+        Returns:    rows: iterator
+                        The rows of the raw response data, in the order of
+                        COLUMNS_RAW.
+        """
+
+        for record in self._records:
+            yield record.row_raw()
+
+    def __getstate__(self):
+        """
+        Parameters: None
+        Returns:    state: dict
+                        The instance state without the parsed PDF fields and
+                        the JSON lookups, which are only needed while
+                        parsing. This keeps the results cheap to send back
+                        from a worker process.
+        """
+
+        state = self.__dict__.copy()
+        for key in ['_fields', '_info', '_context', '_cache', 'risk_profile',
+                    'dict_radio_button']:
+            state.pop(key, None)
+        return state
 
     # Read-only properties.
     @property
     def bpci_id(self):
         return self._bpci_id
 
+    @property
+    def context(self):
+        return self._context
+
     @property
     def fields(self):
         return self._fields
 
+    @property
+    def from_cache(self):
+        return self._from_cache
+
     @property
     def info(self):
         return self._info
@@ -366,6 +512,10 @@ class ExtractPdfFields:
     def info_file_path(self):
         return self._info_file_path
 
+    @property
+    def metrics(self):
+        return self._metrics
+
     @property
     def now(self):
         return self._now
@@ -378,13 +528,21 @@ class ExtractPdfFields:
     def pdf_file_path(self):
         return self._pdf_file_path
 
+    @property
+    def records(self):
+        return self._records
+
     @property
     def response_data(self):
-        return self._response_data
+        # Built on each use rather than kept, so a batch does not hold a data
+        # frame per PDF.
+        import pandas as pd
+        return pd.DataFrame(list(self.rows()), columns=COLUMNS)
 
     @property
     def response_data_raw(self):
-        return self._response_data_raw
+        import pandas as pd
+        return pd.DataFrame(list(self.rows_raw()), columns=COLUMNS_RAW)
 
 #
 # def main():
@@ -0,0 +1,491 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+field_map_discovery.py
+"""
+
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+
+from acroform_reader import read_fields
+from questionnaire_context import radio_code
+
+
+# Field flags (PDF 1.7, table 226): a button field is a push button, or a
+# radio group, when these bits are set.
+FLAG_RADIO = 1 << 15
+FLAG_PUSHBUTTON = 1 << 16
+
+# Widgets whose tops are closer than this (in points) share a line.
+LINE_TOLERANCE = 4.0
+
+# The alignment costs of a field and an item of incompatible kinds, and of a
+# field or an item left unmatched.
+COST_MISMATCH = 1
+COST_GAP = 1
+
+# Item texts that can only be answered in a text box.
+TEXT_PATTERNS = [r'^BPID$', r'Legal Name$', r'^Please (describe|explain|provide|list)\b',
+                 r'^Please use the comment box']
+
+
+def read_items(items_fp):
+    """
+    Parameters: items_fp: str
+                    The path to the items CSV file.
+    Returns:    items: dict
+                    The item information, by num, as read by GetPdfFields.
+    """
+
+    items = {}
+    with open(items_fp, 'rb') as f:
+        raw = f.read()
+    # Older item files were saved by Excel in the Windows code page.
+    try:
+        text = raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        text = raw.decode('cp1252')
+    reader = csv.reader(io.StringIO(text))
+    cols = next(reader)
+    cols_idx = {}
+    for col in ['num', 'local', 'text', 'group', 'id']:
+        cols_idx[col] = cols.index(col)
+    for row in reader:
+        num = int(row[cols_idx['num']])
+        items[num] = {}
+        for col in ['local', 'text', 'group', 'id']:
+            val = row[cols_idx[col]]
+            if col == 'local':
+                val = int(val)
+            if col == 'id' and len(val) > 0:
+                val = float(val)
+            items[num][col] = val
+    return items
+
+
+def expected_kind(items, num):
+    """
+    Parameters: items: dict
+                    The item information, by num.
+                num: int
+                    The item num.
+    Returns:    kind: str
+                    'text' or 'checkbox' if the item text says how it is
+                    answered, or None if any kind of field will do.
+    """
+
+    text = items[num]['text'].strip()
+    for pattern in TEXT_PATTERNS:
+        if re.search(pattern, text):
+            return 'text'
+    # The options of a check box list are written 'option - question', and
+    # the neighbouring items share the question.
+    if ' - ' in text:
+        question = text.split(' - ', 1)[1]
+        for other in [num - 1, num + 1]:
+            if other in items and ' - ' in items[other]['text'] \
+                    and items[other]['text'].strip().split(' - ', 1)[1] == question:
+                return 'checkbox'
+    return None
+
+
+class FieldMapDiscovery:
+    """
+    Class used to learn the field map of a questionnaire template in one pass,
+    instead of one field at a time as with GetPdfFields. The widgets of the
+    template are put in reading order (page, then top to bottom, then left to
+    right) and aligned with the items in num order, using the item text to
+    tell text boxes from check boxes. The map rests on that alignment alone,
+    so the items that could not be placed with certainty are reported for
+    review, as are the fields that read_fields does not see as placed.
+    """
+
+    def __init__(self, pdf_fp, items_fp):
+        """
+        Parameters: pdf_fp: str
+                        The path to the template PDF, with empty fields.
+                    items_fp: str
+                        The path to the items CSV file.
+        Returns:    None
+        """
+
+        import PyPDF3
+        self._pdf_file_path = pdf_fp
+        self._items = read_items(items_fp)
+        self._reader = PyPDF3.PdfFileReader(pdf_fp)
+        self._field_map = {}
+        self._issues = []
+        self._keys_by_num = {}
+        self._widgets = self._read_widgets()
+
+    def _read_widgets(self):
+        """
+        Parameters: None
+        Returns:    widgets: list
+                        One entry per terminal field, in reading order, with
+                        its key, kind, position and on states.
+        """
+
+        by_key = {}
+        for page_num in range(self._reader.getNumPages()):
+            page = self._reader.getPage(page_num)
+            for annot in page.get('/Annots') or []:
+                annot = annot.getObject()
+                if annot.get('/Subtype') != '/Widget':
+                    continue
+                if '/T' in annot or '/TM' in annot:
+                    field = annot
+                elif annot.get('/Parent') is not None:
+                    field = annot['/Parent'].getObject()
+                else:
+                    # A widget of no field cannot be read by read_fields.
+                    continue
+                key = self._field_key(field)
+                if key is None:
+                    continue
+                rect = [float(x) for x in annot.get('/Rect', [0, 0, 0, 0])]
+                states = [x for x in self._states(annot) if x != '/Off']
+                if key not in by_key:
+                    by_key[key] = {'key': key, 'kind': self._kind(field), 'field': field,
+                                   'page': page_num, 'top': max(rect[1], rect[3]),
+                                   'left': min(rect[0], rect[2]), 'states': [],
+                                   'widgets': 0}
+                widget = by_key[key]
+                widget['widgets'] += 1
+                widget['states'] += [x for x in states if x not in widget['states']]
+                # A field placed at several spots is read where it first
+                # appears.
+                if (page_num, -max(rect[1], rect[3])) < (widget['page'], -widget['top']):
+                    widget['page'], widget['top'] = page_num, max(rect[1], rect[3])
+                    widget['left'] = min(rect[0], rect[2])
+        widgets = [x for x in by_key.values() if x['kind'] is not None]
+        # Reading order. The tops are rounded to lines, so a few points of
+        # misalignment between widgets of one line do not change the order.
+        widgets.sort(key=lambda x: (x['page'], -round(x['top'] / LINE_TOLERANCE), x['left']))
+        return widgets
+
+    def _states(self, annot):
+        """
+        Parameters: annot: dict
+                        A widget annotation.
+        Returns:    states: list
+                        The names of its normal appearance states.
+        """
+
+        if '/AP' not in annot or '/N' not in annot['/AP']:
+            return []
+        normal = annot['/AP']['/N']
+        return list(normal.keys()) if isinstance(normal, dict) else []
+
+    def _field_key(self, field):
+        """
+        Parameters: field: dict
+                        A terminal field.
+        Returns:    key: str
+                        The key of the field in read_fields: its /TM
+                        (mapping name) if any, else its partial name /T, or
+                        None if it has neither.
+        """
+
+        key = field.get('/TM', field.get('/T'))
+        return None if key is None else str(key)
+
+    def _inherited(self, field, attr):
+        """
+        Parameters: field: dict
+                    attr: str
+        Returns:    val: object
+                        The value of the attribute, inherited from the
+                        parent fields if needed.
+        """
+
+        while field is not None:
+            if attr in field:
+                return field[attr]
+            field = field['/Parent'].getObject() if '/Parent' in field else None
+        return None
+
+    def _kind(self, field):
+        """
+        Parameters: field: dict
+                        A terminal field.
+        Returns:    kind: str
+                        'text', 'checkbox', 'radio' or 'choice', or None for
+                        push buttons and signatures.
+        """
+
+        field_type = self._inherited(field, '/FT')
+        flags = int(self._inherited(field, '/Ff') or 0)
+        if field_type == '/Tx':
+            return 'text'
+        if field_type == '/Ch':
+            return 'choice'
+        if field_type == '/Btn':
+            if flags & FLAG_PUSHBUTTON:
+                return None
+            return 'radio' if flags & FLAG_RADIO else 'checkbox'
+        return None
+
+    def _align(self):
+        """
+        Parameters: None
+        Returns:    pairs: list
+                        The (widget index, item num) pairs of the alignment,
+                        with None for a widget or an item left unmatched.
+                    uncertain: set
+                        The item nums that another alignment of the same cost
+                        pairs differently.
+        """
+
+        # Edit distance between the widgets in reading order and the items in
+        # num order: a pair of incompatible kinds costs less than leaving both
+        # unmatched, so unmatched entries only appear when the counts differ.
+        nums = sorted(self._items.keys())
+        kinds = [expected_kind(self._items, x) for x in nums]
+        n, m = len(self._widgets), len(nums)
+        pair = [[0 if kinds[j] in [None, self._widgets[i]['kind']] else COST_MISMATCH
+                 for j in range(m)] for i in range(n)]
+        # A field named after the text of an item (e.g. BPID) is that item.
+        texts = {self._items[x]['text'].strip(): j for j, x in enumerate(nums)}
+        for i, widget in enumerate(self._widgets):
+            if widget['key'] in texts:
+                named = texts[widget['key']]
+                for j in range(m):
+                    if j != named:
+                        pair[i][j] = COST_MISMATCH
+                for k in range(n):
+                    if k != i:
+                        pair[k][named] = COST_MISMATCH
+        cost = [[0] * (m + 1) for _ in range(n + 1)]
+        for i in range(1, n + 1):
+            cost[i][0] = i * COST_GAP
+        for j in range(1, m + 1):
+            cost[0][j] = j * COST_GAP
+        for i in range(1, n + 1):
+            for j in range(1, m + 1):
+                cost[i][j] = min(cost[i - 1][j - 1] + pair[i - 1][j - 1],
+                                 cost[i - 1][j] + COST_GAP, cost[i][j - 1] + COST_GAP)
+        # Two alignments of the least cost: one leaves entries unmatched as
+        # late as possible, the other as early as possible. Where they
+        # differ, the position of the missing entries is a guess.
+        alignments = []
+        for late in [True, False]:
+            pairs = []
+            i, j = n, m
+            while i > 0 or j > 0:
+                diagonal = i > 0 and j > 0 and cost[i][j] == cost[i - 1][j - 1] + pair[i - 1][j - 1]
+                skip_widget = i > 0 and cost[i][j] == cost[i - 1][j] + COST_GAP
+                skip_item = j > 0 and cost[i][j] == cost[i][j - 1] + COST_GAP
+                if diagonal and (late or not (skip_widget or skip_item)):
+                    pairs += [(i - 1, nums[j - 1])]
+                    i, j = i - 1, j - 1
+                elif skip_widget:
+                    pairs += [(i - 1, None)]
+                    i -= 1
+                else:
+                    pairs += [(None, nums[j - 1])]
+                    j -= 1
+            alignments += [pairs[::-1]]
+        early = {num: i for i, num in alignments[1] if num is not None}
+        uncertain = {num for i, num in alignments[0] if num is not None and early[num] != i}
+        return alignments[0], uncertain
+
+    def _report(self, reason, key=None, num=None):
+        """
+        Parameters: reason: str
+                    key: str
+                        The field key, if any.
+                    num: int
+                        The item num, if any.
+        Returns:    None
+        """
+
+        issue = {'reason': reason, 'key': key, 'num': num}
+        if num is not None:
+            issue['text'] = self._items[num]['text']
+        self._issues += [issue]
+
+    def discover(self):
+        """
+        Parameters: None
+        Returns:    field_map: dict
+                        The map of field keys to item information, in the
+                        format of the info JSON file.
+        """
+
+        self._issues = []
+        self._field_map = {}
+        self._keys_by_num = {}
+        same_line = set()
+        for a, b in zip(self._widgets, self._widgets[1:]):
+            if (a['page'], round(a['top'] / LINE_TOLERANCE)) == \
+                    (b['page'], round(b['top'] / LINE_TOLERANCE)) \
+                    and 'checkbox' not in [a['kind'], b['kind']]:
+                same_line |= {a['key'], b['key']}
+        pairs, uncertain = self._align()
+        for i, num in pairs:
+            if i is None:
+                self._report('no field for item', num=num)
+                continue
+            widget = self._widgets[i]
+            if num is None:
+                self._report('no item for field', key=widget['key'])
+                continue
+            kind = expected_kind(self._items, num)
+            if kind not in [None, widget['kind']]:
+                self._report('%s field for a %s item' % (widget['kind'], kind), widget['key'], num)
+            elif num in uncertain:
+                self._report('position uncertain, a field is missing nearby', widget['key'], num)
+            elif widget['key'] in same_line:
+                self._report('several fields on one line, read left to right', widget['key'], num)
+            elif widget['widgets'] > 1 and widget['kind'] != 'radio':
+                self._report('field placed at several spots', widget['key'], num)
+            self._keys_by_num[num] = widget['key']
+            self._field_map[widget['key']] = {'num': num}
+            for col in ['local', 'text', 'group', 'id']:
+                self._field_map[widget['key']][col] = self._items[num][col]
+        # The keys of the widgets are those of read_fields, which also lists
+        # the fields without a widget on any page.
+        fields = read_fields(self._pdf_file_path) or {}
+        nums = {v: k for k, v in self._keys_by_num.items()}
+        for widget in self._widgets:
+            if widget['key'] not in fields:
+                self._report('field not read by read_fields', widget['key'], nums.get(widget['key']))
+        keys = {x['key'] for x in self._widgets}
+        for key in fields.keys():
+            if key not in keys and fields[key].get('/FT') is not None:
+                self._report('field not placed on any page', key)
+        return self.field_map
+
+    def radio_mapping(self, fallback=None):
+        """
+        Parameters: fallback: dict
+                        The radio button mapping whose labels are used for
+                        the groups without an /Opt array, e.g.
+                        RADIO_BUTTON_MAPPING.
+        Returns:    mapping: dict
+                        The option label of each code, by radio group key,
+                        for the on states of the /Kids of every group, in
+                        the order of fallback and then in natural order.
+                    unresolved: list
+                        The (key, state, reason) of each on state without a
+                        label.
+        """
+
+        # The on state of each kid (its /AP /N names other than /Off) is the
+        # value of the group when the kid is selected. With an /Opt array,
+        # the export value of the kid at index i (or of state /i) is Opt[i];
+        # otherwise the label can only come from the fallback mapping.
+        if fallback is None:
+            fallback = {}
+        mapping = {}
+        unresolved = []
+        for widget in self._widgets:
+            if widget['kind'] != 'radio':
+                continue
+            key, field = widget['key'], widget['field']
+            options = self._inherited(field, '/Opt')
+            if options is not None:
+                options = [x.getObject() for x in options.getObject()]
+                # An option may also be an [export value, display text] pair.
+                options = [str(x[-1] if isinstance(x, list) else x) for x in options]
+            known = fallback.get(key, {})
+            kids = [x.getObject() for x in field.get('/Kids', [])] or [field]
+            mapping[key] = {}
+            for i, kid in enumerate(kids):
+                for state in self._states(kid):
+                    code = radio_code(state)
+                    if state == '/Off' or code in mapping[key]:
+                        continue
+                    if options is not None:
+                        index = int(state[1:]) if state[1:].isdigit() else i
+                        if index < len(options):
+                            mapping[key][code] = options[index]
+                        else:
+                            unresolved += [(key, state, 'no /Opt entry %d' % index)]
+                    elif code in known:
+                        mapping[key][code] = known[code]
+                    else:
+                        unresolved += [(key, state, 'no /Opt and not in the mapping')]
+            # Codes that the template has no button for, e.g. a blank choice,
+            # keep their label, so older PDFs still decode.
+            for code, label in known.items():
+                if code not in mapping[key]:
+                    mapping[key][code] = label
+        # The widgets come in the order the PDF lists them, so the groups and
+        # codes are put in the order of the fallback mapping, the others after
+        # them in natural order, for the same mapping from any PDF.
+        def order(known):
+            known = list(known)
+            return lambda x: ((0, known.index(x), '') if x in known else
+                              (1, int(x) if x.isdigit() else float('inf'), x))
+        mapping = {key: {code: mapping[key][code]
+                         for code in sorted(mapping[key], key=order(fallback.get(key, {})))}
+                   for key in sorted(mapping, key=order(fallback))}
+        return mapping, sorted(unresolved)
+
+    def write(self, fp=None, report_fp=None):
+        """
+        Parameters: fp: str
+                        The path of the field map JSON file. Defaults to the
+                        template path with the .json extension, as written
+                        by GetPdfFields.
+                    report_fp: str
+                        The path of a JSON file listing the items to review.
+        Returns:    None
+        """
+
+        if fp is None:
+            fp = './{0}.json'.format(os.path.splitext(os.path.basename(self._pdf_file_path))[0])
+        with open(fp, 'w') as out:
+            json.dump(self.field_map, out, indent=2)
+        if report_fp is not None:
+            with open(report_fp, 'w') as out:
+                json.dump(self.issues, out, indent=2)
+
+    # Read-only properties.
+    @property
+    def field_map(self):
+        return self._field_map
+
+    @property
+    def issues(self):
+        return self._issues
+
+    @property
+    def items(self):
+        return self._items
+
+    @property
+    def radio_states(self):
+        return {x['key']: x['states'] for x in self._widgets if x['kind'] == 'radio'}
+
+    @property
+    def widgets(self):
+        return self._widgets
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Learn the field map of a questionnaire template.')
+    parser.add_argument('pdf', help='the template PDF, with empty fields')
+    parser.add_argument('-i', '--items', default='./items.csv', help='the items CSV file')
+    parser.add_argument('-o', '--output', default=None, help='the field map JSON file')
+    parser.add_argument('--report', default=None, help='write the items to review to a JSON file')
+    args = parser.parse_args()
+    discovery = FieldMapDiscovery(args.pdf, args.items)
+    discovery.discover()
+    discovery.write(args.output, args.report)
+    print('%d of %d items mapped' % (len(discovery.field_map), len(discovery.items)))
+    for issue in discovery.issues:
+        print('--- review: %s (field %s, item %s)' % (issue['reason'], issue['key'], issue['num']))
+
+
+if __name__ == '__main__':
+    main()
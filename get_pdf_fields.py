@@ -10,6 +10,7 @@ get_pdf_fields.py
 
 
 import csv
+import hashlib
 import os
 import json
 import PyPDF3
@@ -17,18 +18,39 @@ import shutil
 import warnings
 import codecs
 
+from acroform_reader import read_fields
+
+
+def _digest(field):
+    """
+    Parameters: field: dict
+                    A PDF field.
+    Returns:    digest: bytes
+                    A digest of the field value, or None if the field has no
+                    value.
+    """
+
+    if not '/V' in field.keys():
+        return None
+    return hashlib.blake2b(repr(field['/V']).encode('utf-8'), digest_size=16).digest()
+
+
 class GetPdfFields:
     """
     Class used to determine the fields associated to each entry in a PDF.
     """
 
-    def __init__(self, pdf_fp, items_fp):
+    def __init__(self, pdf_fp, items_fp, fast_read=True):
         """
         Parameters: fp: str
                         The path to the PDF file.
+                    fast_read: bool
+                        If True, read the form fields with the lightweight
+                        AcroFormReader, falling back to PyPDF3 as needed.
         Returns:    None
         """
 
+        self.fast_read = fast_read
         # Set the PDF file path.
         self.pdf_file_path = pdf_fp
         self.pdf_basename = os.path.basename(pdf_fp)
@@ -51,18 +73,13 @@ class GetPdfFields:
                         original and copy PDFs.
         """
 
-        # Check for differences in the two PDF fields.
+        # Compare the digests of the edited PDF with those of the snapshot of
+        # the last known values. A value that was added, or changed, counts as
+        # a difference; a value that was removed does not.
         w = []
-        for key, val in self.pdf_fields['o'].items():
-            copy_val = self.pdf_fields['c'][key]
-            if '/V' in val.keys():
-                if '/V' in copy_val.keys():
-                    if val['/V'] != copy_val['/V']:
-                        w += [key]
-                else:
-                    # In this case there is a value added, that did not exist
-                    # before, so a change has been made.
-                    w += [key]
+        for key, digest in self._digests.items():
+            if digest is not None and digest != self._snapshot.get(key):
+                w += [key]
         return w
 
     def _copy_pdf(self):
@@ -117,17 +134,28 @@ class GetPdfFields:
         Returns:    None
         """
 
-        self.pdf_fields = {}
-        # Import the original PDF.
-        pdf = self.pdf_file_path
-        #pdf = codecs.open(self.pdf_file_path, 'rb', encoding='utf-8')
-        # Set the PDF fields.
-        self.pdf_fields['o'] = PyPDF3.PdfFileReader(pdf).getFields()
-        # Import the copy PDF.
-        pdf = self.pdf_copy_file_path
-        #pdf = codecs.open(self.pdf_copy_file_path, 'rb', encoding='utf-8')
+        # Only the edited PDF is parsed, and only if its bytes changed since
+        # it was last parsed. The values of the copy are those of the
+        # snapshot, kept in memory.
+        with open(self.pdf_file_path, 'rb') as f:
+            file_digest = hashlib.sha256(f.read()).digest()
+        if file_digest == self._file_digest:
+            return
         # Set the PDF fields.
-        self.pdf_fields['c'] = PyPDF3.PdfFileReader(pdf).getFields()
+        self.pdf_fields['o'] = read_fields(self.pdf_file_path, self.fast_read)
+        self._digests = {k: _digest(v) for k, v in self.pdf_fields['o'].items()}
+        self._file_digest = file_digest
+
+    def _take_snapshot(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        # The current values of the edited PDF become the last known values,
+        # which later edits are compared with.
+        self.pdf_fields['c'] = self.pdf_fields['o']
+        self._snapshot = self._digests
 
     def _set_current_item(self):
         """
@@ -166,7 +194,13 @@ class GetPdfFields:
         if not all(check):
             self._copy_pdf()
             self._field_map = {}
-        # We always reimport the PDF fields, since they can change at any time
+            self._file_digest = None
+            self.pdf_fields = {}
+            # The copy is the original, so its values are the snapshot.
+            self._import_pdf_fields()
+            self._take_snapshot()
+            return
+        # We always check the PDF fields, since they can change at any time
         # (due to human interaction).
         self._import_pdf_fields()
 
@@ -218,11 +252,10 @@ class GetPdfFields:
         group = self.current_item[3]
         local = self.current_item[1]
         print('--- Next field to be set for group %s local %s' % (group, local))
-        # Since a field has been set, we copy over the edited PDF to the
-        # temporary PDF. This allows us to keep changing fields without having
-        # to reset everything with each step.
-        os.remove('./.tmp/tmp.pdf')
-        shutil.copy(self.pdf_file_path, './.tmp/tmp.pdf')
+        # Since a field has been set, the values of the edited PDF become the
+        # snapshot. This allows us to keep changing fields without having to
+        # reset everything with each step.
+        self._take_snapshot()
 
     def write(self, reset=True, purge=False):
         """
@@ -248,6 +281,9 @@ class GetPdfFields:
             if not purge:
                 # Recreate the temporary directory.
                 self._copy_pdf()
+                # The original values are the snapshot again.
+                self._import_pdf_fields()
+                self._take_snapshot()
 
     # Read-only properties.
     @property
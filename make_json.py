@@ -50,4 +50,11 @@ info = {k:v for k, v in info_list}
 info = OrderedDict(info_list, key=lambda x: x[1]['id'])
 info.pop('key')
 with open('./info.json', 'w') as f:
-    json.dump(info, f, indent=4)
\ No newline at end of file
+    json.dump(info, f, indent=4)
+########################################################################
+
+# compile the template used by the extraction (checked against items.csv,
+# with the radio button mapping and the risk profile)
+import template_compiler
+template = template_compiler.compile_template('./info.json', items_fp, './risk_profile_wave2.json')
+template_compiler.write_template(template, './info.qtpl')
@@ -0,0 +1,179 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+manifest.py
+"""
+
+
+import hashlib
+import json
+import os
+
+
+# The manifest file name, in the output directory.
+MANIFEST_FILE_NAME = 'manifest.json'
+
+
+def file_sha256(fp):
+    """
+    Parameters: fp: str
+                    The path to a file.
+    Returns:    h: str
+                    The SHA-256 hex digest of the file contents.
+    """
+
+    h = hashlib.sha256()
+    with open(fp, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ProcessedManifest:
+    """
+    Class used to record which PDFs have been extracted into the master files
+    of an output directory. For each PDF it stores the path, size,
+    modification time and SHA-256 hash, together with the timestamp of the
+    master files they were appended to and the fingerprint of the
+    questionnaire they were extracted with. An incremental run then extracts
+    only the PDFs that are new, and appends them to the same master files.
+    """
+
+    def __init__(self, out_fp):
+        """
+        Parameters: out_fp: str
+                        The path to the output directory.
+        Returns:    None
+        """
+
+        self._file_path = os.path.join(out_fp, MANIFEST_FILE_NAME)
+        self._now = None
+        self._fingerprint = None
+        self._files = {}
+        if os.path.exists(self._file_path):
+            with open(self._file_path, 'r') as f:
+                manifest = json.load(f)
+            self._now = manifest.get('now')
+            self._fingerprint = manifest.get('fingerprint')
+            self._files = manifest.get('files', {})
+
+    def _key(self, pdf_fp):
+        """
+        Parameters: pdf_fp: str
+                        The path to the PDF file.
+        Returns:    key: str
+                        The normalized path used as manifest key.
+        """
+
+        return os.path.normcase(os.path.abspath(pdf_fp))
+
+    def is_current(self, pdf_fp):
+        """
+        Parameters: pdf_fp: str
+                        The path to the PDF file.
+        Returns:    w: bool
+                        True if the PDF was already processed and has not
+                        changed since.
+        """
+
+        entry = self._files.get(self._key(pdf_fp))
+        if entry is None:
+            return False
+        st = os.stat(pdf_fp)
+        if st.st_size != entry['size']:
+            return False
+        if st.st_mtime == entry['mtime']:
+            return True
+        # The file was touched: only a change of contents counts.
+        if file_sha256(pdf_fp) != entry['sha256']:
+            return False
+        entry['mtime'] = st.st_mtime
+        return True
+
+    def is_recorded(self, pdf_fp):
+        """
+        Parameters: pdf_fp: str
+                        The path to the PDF file.
+        Returns:    w: bool
+                        True if the PDF has rows in the master files.
+        """
+
+        return self._key(pdf_fp) in self._files
+
+    def pending(self, pdfs):
+        """
+        Parameters: pdfs: list
+                        The PDF file paths.
+        Returns:    pdfs: list
+                        The PDFs that are new or changed.
+        """
+
+        return [x for x in pdfs if not self.is_current(x)]
+
+    def record(self, pdf_fp, sha256=None):
+        """
+        Parameters: pdf_fp: str
+                        The path to a processed PDF file.
+                    sha256: str
+                        The hash of the file, if already known.
+        Returns:    None
+        """
+
+        st = os.stat(pdf_fp)
+        if sha256 is None:
+            sha256 = file_sha256(pdf_fp)
+        self._files[self._key(pdf_fp)] = {'path': pdf_fp, 'size': st.st_size,
+                                          'mtime': st.st_mtime, 'sha256': sha256}
+
+    def reset(self, now, fingerprint=None):
+        """
+        Parameters: now: str
+                        The timestamp of a new set of master files.
+                    fingerprint: str
+                        The fingerprint of the questionnaire they are
+                        extracted with.
+        Returns:    None
+        """
+
+        # A new set of master files has to contain every PDF again.
+        self._now = now
+        self._fingerprint = fingerprint
+        self._files = {}
+
+    def save(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        # Write to a temporary file first, so an interrupted run never leaves
+        # a truncated manifest.
+        tmp = self._file_path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'now': self.now, 'fingerprint': self.fingerprint, 'files': self._files},
+                      f, indent=2)
+        os.replace(tmp, self._file_path)
+
+    # Read-only properties.
+    @property
+    def file_path(self):
+        return self._file_path
+
+    @property
+    def files(self):
+        return self._files
+
+    @property
+    def fingerprint(self):
+        return self._fingerprint
+
+    # Properties with read/write access.
+    @property
+    def now(self):
+        return self._now
+
+    @now.setter
+    def now(self, val):
+        self._now = val
@@ -0,0 +1,272 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+master_writer.py
+"""
+
+
+import csv
+import io
+import math
+import os
+
+
+# Default number of buffered rows, and of buffered characters, after which
+# the buffers are written to the master files.
+FLUSH_ROWS = 5000
+FLUSH_BYTES = 1 << 20
+
+
+def _format_row(row):
+    """
+    Parameters: row: list
+                    A row of values.
+    Returns:    row: list
+                    The row with missing values (None, NaN) as empty strings,
+                    as pandas writes them.
+    """
+
+    return ['' if x is None or (isinstance(x, float) and math.isnan(x)) else x
+            for x in row]
+
+
+def write_csv(fp, columns, rows):
+    """
+    Parameters: fp: str
+                    The path to the CSV file.
+                columns: list
+                    The column names.
+                rows: iterable
+                    The rows, e.g. a generator. They are written as they
+                    come, as pandas.to_csv would write them, without building
+                    a data frame.
+    Returns:    None
+    """
+
+    with open(fp, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f, lineterminator=os.linesep)
+        writer.writerow(columns)
+        writer.writerows(_format_row(x) for x in rows)
+
+
+class _MasterFile:
+    """
+    One master CSV file, opened once in append mode. Rows go through a csv
+    writer into an in-memory buffer, which is written to the file when it
+    reaches the flush thresholds.
+    """
+
+    def __init__(self, fp, header, encoding, lineterminator, flush_rows, flush_bytes):
+        """
+        Parameters: fp: str
+                        The path to the CSV file.
+                    header: list
+                        The column names, written if the file is new.
+                    encoding: str
+                        The file encoding.
+                    lineterminator: str
+                        The line terminator.
+                    flush_rows: int
+                    flush_bytes: int
+        Returns:    None
+        """
+
+        is_new = not os.path.exists(fp) or os.path.getsize(fp) == 0
+        self.file = open(fp, 'a', newline='', encoding=encoding)
+        self.buffer = io.StringIO()
+        self.writer = csv.writer(self.buffer, lineterminator=lineterminator)
+        self.flush_rows = flush_rows
+        self.flush_bytes = flush_bytes
+        self.n_buffered = 0
+        if is_new:
+            self.writer.writerow(header)
+            self.n_buffered += 1
+
+    def write_row(self, row):
+        """
+        Parameters: row: list
+                        The row to append.
+        Returns:    None
+        """
+
+        self.writer.writerow(_format_row(row))
+        self.n_buffered += 1
+        if self.n_buffered >= self.flush_rows or self.buffer.tell() >= self.flush_bytes:
+            self.flush()
+
+    def write(self, rows):
+        """
+        Parameters: rows: iterable
+                        The rows to append, e.g. a generator.
+        Returns:    n: int
+                        The number of rows appended.
+        """
+
+        n = 0
+        for row in rows:
+            self.write_row(row)
+            n += 1
+        return n
+
+    def flush(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        if self.n_buffered > 0:
+            self.file.write(self.buffer.getvalue())
+            self.buffer.seek(0)
+            self.buffer.truncate()
+            self.n_buffered = 0
+        self.file.flush()
+
+    def close(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        self.flush()
+        self.file.close()
+
+
+class MasterWriter:
+    """
+    Class used to append responses to the master files of a run:
+    response_master_<now>.csv, response_raw_master_<now>.csv and
+    info_<now>.csv. Each file is opened once for the whole run, and rows are
+    streamed through buffered csv writers rather than written with pandas per
+    PDF. Optionally, the master XLSX files are built in the same pass. Use as
+    a context manager, or call close() at the end of the batch.
+    """
+
+    def __init__(self, out_fp, now, columns, columns_raw,
+                 flush_rows=FLUSH_ROWS, flush_bytes=FLUSH_BYTES, excel=False):
+        """
+        Parameters: out_fp: str
+                        The path to output.
+                    now: str
+                        The timestamp string.
+                    columns: list
+                        The columns of the response master file.
+                    columns_raw: list
+                        The columns of the raw response master file.
+                    flush_rows: int
+                        The number of buffered rows per file after which
+                        they are written out.
+                    flush_bytes: int
+                        The number of buffered characters per file after
+                        which they are written out.
+                    excel: bool
+                        If True, also build response_master_<now>.xlsx and
+                        response_raw_master_<now>.xlsx as the rows stream
+                        through, saved on close().
+        Returns:    None
+        """
+
+        self._out_file_path = out_fp
+        self._now = now
+        args = (flush_rows, flush_bytes)
+        # The response files are written as pandas.to_csv would, the info file
+        # as csv.writer does by default.
+        fp = out_fp + '/response_master_%s.csv' % now
+        self._responses = _MasterFile(fp, columns, 'utf-8-sig', os.linesep, *args)
+        fp = out_fp + '/response_raw_master_%s.csv' % now
+        self._responses_raw = _MasterFile(fp, columns_raw, 'utf-8-sig', os.linesep, *args)
+        fp = out_fp + '/info_%s.csv' % now
+        self._info = _MasterFile(fp, ['organization', 'bpci_id'], None, '\r\n', *args)
+        self._excel = []
+        if excel:
+            from excel_export import ExcelMasterWorkbook
+            for name, cols in [('response_master', columns),
+                               ('response_raw_master', columns_raw)]:
+                fp = out_fp + '/%s_%s' % (name, now)
+                workbook = ExcelMasterWorkbook(fp + '.xlsx', cols)
+                # A write-only workbook cannot be appended to, so the rows of
+                # earlier (incremental) runs are copied from the CSV file.
+                if os.path.getsize(fp + '.csv') > 0:
+                    workbook.append_csv(fp + '.csv')
+                self._excel += [workbook]
+        self._n_rows = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def write(self, org, bpci, data, data_raw):
+        """
+        Parameters: org: str
+                        The organization name, as used in file names.
+                    bpci: str
+                        The lower case BPCI ID.
+                    data: iterable
+                        The rows of the response data, e.g. a generator.
+                    data_raw: iterable
+                        The rows of the raw response data.
+        Returns:    None
+        """
+
+        if self._excel:
+            # Each row goes to both files, so the rows are only iterated once.
+            n = self._write_both(self._responses, self._excel[0], data)
+            self._info.write_row([org, bpci])
+            self._write_both(self._responses_raw, self._excel[1], data_raw)
+        else:
+            n = self._responses.write(data)
+            self._info.write_row([org, bpci])
+            self._responses_raw.write(data_raw)
+        self._n_rows += n
+
+    def _write_both(self, master_file, workbook, rows):
+        """
+        Parameters: master_file: _MasterFile
+                    workbook: excel_export.ExcelMasterWorkbook
+                    rows: iterable
+        Returns:    n: int
+                        The number of rows appended.
+        """
+
+        n = 0
+        for row in rows:
+            master_file.write_row(row)
+            workbook.append(row)
+            n += 1
+        return n
+
+    def flush(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        for f in [self._responses, self._info, self._responses_raw]:
+            f.flush()
+
+    def close(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        for f in [self._responses, self._info, self._responses_raw]:
+            f.close()
+        for workbook in self._excel:
+            workbook.close()
+
+    # Read-only properties.
+    @property
+    def n_rows(self):
+        return self._n_rows
+
+    @property
+    def now(self):
+        return self._now
+
+    @property
+    def out_file_path(self):
+        return self._out_file_path
@@ -0,0 +1,290 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+questionnaire_context.py
+"""
+
+
+import hashlib
+import json
+import pickle
+import zlib
+
+from risk_table import RiskTable, parse_risk_profile
+
+
+# Default location of the risk profile, relative to the working directory.
+RISK_PROFILE_FILE_PATH = './risk_profile_wave2.json'
+
+# The header of a compiled template (see template_compiler.py): the magic
+# bytes, the format version, the SHA-256 digest of the canonical form of the
+# content (the questionnaire fingerprint) and the CRC-32 of the pickled
+# payload that follows.
+TEMPLATE_MAGIC = b'EPQT'
+TEMPLATE_VERSION = 2
+TEMPLATE_HEADER_SIZE = len(TEMPLATE_MAGIC) + 1 + 32 + 4
+
+# Radio button mapping. template_compiler.py -p derives the codes of each
+# group from the questionnaire PDF and takes the labels from its /Opt array;
+# the labels below are only needed for the groups without one.
+RADIO_BUTTON_MAPPING = {
+    'Group1':{
+        '1': 'Participated in the past 12 months and currently participating',
+        '2': 'Participated in the past 12 months but not currently participating',
+        '3': 'Did not participate in the past 12 months but currently participating',
+        '4': 'Did not participate in the past 12 months and not currently participating',
+        '9': ''
+    },
+    'Group2':{
+        '5': 'Participated in the past 12 months and currently participating',
+        '6': 'Participated in the past 12 months but not currently participating',
+        '7': 'Did not participate in the past 12 months but currently participating',
+        '8': 'Did not participate in the past 12 months and not currently participating',
+        '9': ''
+    },
+    'Group3':{
+        '10': 'Strongly agree',
+        '11': 'Agree',
+        '12': 'Neutral',
+        '13': 'Disagree',
+        '14': 'Strongly disagree',
+        '15': 'Unsure',
+        '16': 'NA; implementation is in progress',
+        '17': 'NA; implementation not started'
+    },
+}
+
+
+def radio_code(state):
+    """
+    Parameters: state: str
+                    The appearance state name of a radio button, e.g.
+                    '/Choice3', as found in the /V value of its group.
+    Returns:    code: str
+                    The option code of the radio button mapping, e.g. '3'.
+    """
+
+    return state.lstrip('/Choice')
+
+
+def is_compiled_template(fp):
+    """
+    Parameters: fp: str
+                    The path to a JSON info file or compiled template.
+    Returns:    compiled: bool
+                    True if the file starts with the magic of a compiled
+                    template.
+    """
+
+    with open(fp, 'rb') as f:
+        return f.read(len(TEMPLATE_MAGIC)) == TEMPLATE_MAGIC
+
+
+def parse_template(raw):
+    """
+    Parameters: raw: bytes
+                    The contents of a compiled template.
+    Returns:    template: dict
+                    The info map ('info'), radio button mapping
+                    ('radio_button') and risk profile ('risk_profile').
+                digest: str
+                    The hex SHA-256 digest of the canonical form of the
+                    template.
+    """
+
+    if not raw.startswith(TEMPLATE_MAGIC):
+        raise ValueError('Not a compiled template.')
+    version = raw[len(TEMPLATE_MAGIC)]
+    if version != TEMPLATE_VERSION:
+        msg = 'Compiled template version %d is not supported (expected %d), please recompile it.'
+        raise ValueError(msg % (version, TEMPLATE_VERSION))
+    digest = raw[len(TEMPLATE_MAGIC) + 1:TEMPLATE_HEADER_SIZE - 4]
+    crc = int.from_bytes(raw[TEMPLATE_HEADER_SIZE - 4:TEMPLATE_HEADER_SIZE], 'big')
+    payload = raw[TEMPLATE_HEADER_SIZE:]
+    # The digest was taken over the canonical form when compiled; the cheap
+    # checksum of the payload is enough to catch a damaged file.
+    if zlib.crc32(payload) != crc:
+        raise ValueError('Compiled template is corrupt (checksum mismatch).')
+    return pickle.loads(payload), digest.hex()
+
+
+class QuestionnaireContext:
+    """
+    Class holding everything about a questionnaire that does not change from
+    one PDF to the next: the info map (PDF field key to item information), the
+    radio button mapping and the risk profile. The files are loaded and
+    validated once, so a single context can be shared by any number of
+    ExtractPdfFields instances, and is sent only once to each worker of a
+    process pool.
+    """
+
+    def __init__(self, info_fp, risk_fp=RISK_PROFILE_FILE_PATH,
+                 radio_button=None):
+        """
+        Parameters: info_fp: str
+                        The path to the JSON info file, or to a compiled
+                        template (see template_compiler.py), which carries
+                        its own risk profile and radio button mapping.
+                    risk_fp: str
+                        The path to the JSON (or binary) risk profile.
+                        Unused with a compiled template.
+                    radio_button: dict
+                        The radio button mapping, by field key and then by
+                        option code. Defaults to RADIO_BUTTON_MAPPING.
+                        Unused with a compiled template.
+        Returns:    None
+        """
+
+        self._info_file_path = info_fp
+        self._risk_file_path = risk_fp
+        with open(info_fp, 'rb') as f:
+            raw = f.read()
+        if raw.startswith(TEMPLATE_MAGIC):
+            # The template was validated when compiled, and its digest is the
+            # version of the questionnaire.
+            template, self._fingerprint = parse_template(raw)
+            self._risk_file_path = info_fp
+            self._template_version = TEMPLATE_VERSION
+            self._info = template['info']
+            self._dict_radio_button = template['radio_button']
+            self._risk_profile = template['risk_profile']
+        else:
+            if radio_button is None:
+                radio_button = RADIO_BUTTON_MAPPING
+            self._dict_radio_button = radio_button
+            self._template_version = None
+            # The version of the questionnaire: it changes whenever the info
+            # file, the risk profile or the radio button mapping change.
+            hasher = hashlib.sha256()
+            hasher.update(raw)
+            self._info = self._import_info(raw)
+            self._risk_profile = self._import_risk_profile(hasher)
+            hasher.update(json.dumps(radio_button, sort_keys=True).encode('utf-8'))
+            self._fingerprint = hasher.hexdigest()
+        self._risk_table = RiskTable(self._risk_profile)
+        self._index()
+
+    def _import_info(self, raw):
+        """
+        Parameters: raw: bytes
+                        The contents of the JSON info file.
+        Returns:    info: dict
+                        The validated info map.
+        """
+
+        # Import the JSON file as a dictionary.
+        info = json.loads(raw.decode('utf-8'))
+        if not isinstance(info, dict):
+            msg = 'Info file %s must contain a JSON object.' % self.info_file_path
+            raise ValueError(msg)
+        # Every field used for output needs the full item description.
+        required = ['num', 'local', 'text', 'group']
+        for key, val in info.items():
+            if not isinstance(val, dict):
+                msg = 'Info entry %s must be a JSON object.' % key
+                raise ValueError(msg)
+            if 'id' in val.keys():
+                missing = [x for x in required if x not in val.keys()]
+                if len(missing) > 0:
+                    msg = 'Info entry %s is missing %s.' % (key, ', '.join(missing))
+                    raise ValueError(msg)
+        return info
+
+    def _import_risk_profile(self, hasher):
+        """
+        Parameters: hasher: hashlib hash
+                        The hash of the questionnaire version, updated with
+                        the file contents.
+        Returns:    rp: dict
+                        The risk profile, keyed by the float item id.
+        """
+
+        with open(self.risk_file_path, 'rb') as f:
+            raw = f.read()
+        hasher.update(raw)
+        # A JSON file, or the binary form written by risk_profile_builder.
+        return parse_risk_profile(raw)
+
+    def _index(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        # The field keys of the two identification items, which are looked up
+        # by their text in every PDF.
+        self._bpci_key = self._find_key('BPID')
+        self._organization_key = self._find_key('Organization Legal Name')
+        # Item id to info entry, and item id to the response remap table. If
+        # several entries share an id, the first one wins.
+        self._info_by_id = {}
+        self._values_by_id = {}
+        for val in self.info.values():
+            if 'id' in val.keys() and val['id'] not in self._info_by_id:
+                self._info_by_id[val['id']] = val
+                if 'values' in val.keys():
+                    self._values_by_id[val['id']] = val['values']
+
+    def _find_key(self, text):
+        """
+        Parameters: text: str
+                        The item text.
+        Returns:    key: str
+                        The first field key with the given text, or None.
+        """
+
+        for key, val in self.info.items():
+            if val['text'] == text:
+                return key
+        return None
+
+    # Read-only properties.
+    @property
+    def bpci_key(self):
+        return self._bpci_key
+
+    @property
+    def dict_radio_button(self):
+        return self._dict_radio_button
+
+    @property
+    def fingerprint(self):
+        return self._fingerprint
+
+    @property
+    def info(self):
+        return self._info
+
+    @property
+    def info_by_id(self):
+        return self._info_by_id
+
+    @property
+    def info_file_path(self):
+        return self._info_file_path
+
+    @property
+    def organization_key(self):
+        return self._organization_key
+
+    @property
+    def risk_file_path(self):
+        return self._risk_file_path
+
+    @property
+    def risk_profile(self):
+        return self._risk_profile
+
+    @property
+    def risk_table(self):
+        return self._risk_table
+
+    @property
+    def template_version(self):
+        return self._template_version
+
+    @property
+    def values_by_id(self):
+        return self._values_by_id
@@ -0,0 +1,192 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+rescore.py
+
+Re-score finished output against a new risk profile, without parsing any
+PDFs: the 'Response Weight', 'Risk Level' and 'Risk Score' columns are
+recomputed in bulk with RiskTable.score_frame. The input is a response master
+file, a raw response master file (with the info file, for the item ids), or
+the result cache. For example
+
+    python rescore.py out/response_master_20200301_120000.csv -r risk_profile_wave2.json
+    python rescore.py out/response_raw_master_20200301_120000.csv -j info_wave2.json \
+        -r risk_profile_wave2.json
+"""
+
+
+import argparse
+import os
+import sys
+
+from response_record import NOT_ANSWERED
+from risk_table import RISK_COLUMNS, RiskTable
+
+# The columns of the response master file, as extract_pdf_fields.COLUMNS.
+COLUMNS = ['BPCI ID', 'ID', 'Question', 'Response'] + RISK_COLUMNS
+
+
+def _read_master(fp, nrows=None):
+    """
+    Parameters: fp: str
+                    The path to a master CSV file.
+                nrows: int
+                    The number of rows to read, or None for all.
+    Returns:    df: pandas.DataFrame
+                    The file, with every column read as text.
+    """
+
+    import pandas as pd
+    return pd.read_csv(fp, dtype=str, keep_default_na=False, encoding='utf-8-sig', nrows=nrows)
+
+
+def rescore_master(master_fp, risk_table, out_fp=None):
+    """
+    Parameters: master_fp: str
+                    The path to a response master CSV file.
+                risk_table: RiskTable
+                    The new risk profile.
+                out_fp: str
+                    The path to the re-scored file. Defaults to master_fp
+                    with the suffix '_rescored'.
+    Returns:    out_fp: str
+    """
+
+    df = _read_master(master_fp)
+    df['ID'] = df['ID'].astype(float)
+    df = risk_table.score_frame(df)
+    if out_fp is None:
+        out_fp = os.path.splitext(master_fp)[0] + '_rescored.csv'
+    df.to_csv(out_fp, index=False, encoding='utf-8-sig')
+    return out_fp
+
+
+def rescore_raw_master(raw_fp, context, risk_table, out_fp=None):
+    """
+    Parameters: raw_fp: str
+                    The path to a raw response master CSV file.
+                context: QuestionnaireContext
+                    The questionnaire of the file, used to map the 'Global
+                    Number' of each row back to the item id and text.
+                risk_table: RiskTable
+                    The new risk profile.
+                out_fp: str
+                    The path to the re-scored file, with the columns of the
+                    response master file. Defaults to raw_fp with the suffix
+                    '_rescored'.
+    Returns:    out_fp: str
+    """
+
+    import pandas as pd
+    df = _read_master(raw_fp)
+    # The raw rows hold the 'num' of the item minus one (see
+    # ExtractPdfFields._parse_fields).
+    by_num = {}
+    for val in context.info_by_id.values():
+        by_num.setdefault(val['num'] - 1, val)
+    items = df['Global Number'].astype(int).map(by_num)
+    if items.isna().any():
+        missing = sorted(set(df['Global Number'][items.isna()]))
+        msg = 'Global Number %s of %s not found in %s.' % (', '.join(missing), raw_fp,
+                                                           context.info_file_path)
+        raise ValueError(msg)
+    response = df['Response'].where(df['Response'] != NOT_ANSWERED, '')
+    scored = pd.DataFrame({'BPCI ID': df['BPCI ID'], 'ID': [x['id'] for x in items],
+                           'Question': df['Question'], 'Response': response})
+    scored = risk_table.score_frame(scored)
+    if out_fp is None:
+        out_fp = os.path.splitext(raw_fp)[0] + '_rescored.csv'
+    scored.to_csv(out_fp, index=False, encoding='utf-8-sig')
+    return out_fp
+
+
+def rescore_cache(cache, pdfs, context, new_context):
+    """
+    Re-key the cached results of the PDFs from one questionnaire version to
+    another that differs only by its risk profile, re-scoring the rows on the
+    way, so the next extraction with new_context loads every PDF from the
+    cache. The PDFs are hashed, not parsed.
+
+    Parameters: cache: ResultCache
+                    The result cache.
+                pdfs: list
+                    The PDF file paths.
+                context: QuestionnaireContext
+                    The questionnaire the cache entries were made with.
+                new_context: QuestionnaireContext
+                    The questionnaire with the new risk profile.
+    Returns:    n: int
+                    The number of cache entries re-scored.
+    """
+
+    import pandas as pd
+    if new_context.info != context.info or new_context.dict_radio_button != context.dict_radio_button:
+        msg = 'Only the risk profile may differ between the two questionnaires.'
+        raise ValueError(msg)
+    n = 0
+    for pdf in pdfs:
+        payload = cache.get(cache.key(pdf, context.fingerprint))
+        if payload is None:
+            continue
+        df = pd.DataFrame(payload['data'], columns=COLUMNS)
+        risk = new_context.risk_table.score_frame(df)[RISK_COLUMNS].values.tolist()
+        payload = dict(payload)
+        payload['data'] = [x[:4] + y for x, y in zip(payload['data'], risk)]
+        cache.put(cache.key(pdf, new_context.fingerprint), payload)
+        n += 1
+    cache.evict()
+    return n
+
+
+def main(argv=None):
+    """
+    Parameters: argv: list
+                    The command line arguments. Defaults to sys.argv[1:].
+    Returns:    code: int
+    """
+
+    parser = argparse.ArgumentParser(
+        description='Re-score response master files against a new risk profile.')
+    parser.add_argument('master', nargs='?', default=None,
+                        help='response master or raw response master CSV file')
+    parser.add_argument('-r', '--risk-profile', required=True, help='new JSON risk profile')
+    parser.add_argument('-j', '--info', default=None,
+                        help='JSON info file (needed for raw masters and the cache)')
+    parser.add_argument('-o', '--out', default=None, help='re-scored CSV file')
+    parser.add_argument('--cache', default=None, metavar='DIR',
+                        help='re-score the cached results of the PDFs in --pdf instead')
+    parser.add_argument('--pdf', default=None, help='PDF file or directory, with --cache')
+    parser.add_argument('--old-risk-profile', default=None,
+                        help='risk profile the cache entries were made with, with --cache')
+    args = parser.parse_args(argv)
+    if args.cache is not None:
+        if args.pdf is None or args.info is None or args.old_risk_profile is None:
+            parser.error('--cache needs --pdf, --info and --old-risk-profile.')
+        from batch_extract import list_pdfs
+        from questionnaire_context import QuestionnaireContext
+        from result_cache import ResultCache
+        context = QuestionnaireContext(args.info, args.old_risk_profile)
+        new_context = QuestionnaireContext(args.info, args.risk_profile)
+        pdfs = list_pdfs(args.pdf)
+        n = rescore_cache(ResultCache(args.cache), pdfs, context, new_context)
+        print('Re-scored %d of %d cached PDFs.' % (n, len(pdfs)))
+        return 0
+    if args.master is None:
+        parser.error('A master file, or --cache, is needed.')
+    risk_table = RiskTable.load(args.risk_profile)
+    if 'Global Number' in _read_master(args.master, nrows=0).columns:
+        if args.info is None:
+            parser.error('A raw master file needs --info.')
+        from questionnaire_context import QuestionnaireContext
+        context = QuestionnaireContext(args.info, args.risk_profile)
+        out_fp = rescore_raw_master(args.master, context, risk_table, args.out)
+    else:
+        out_fp = rescore_master(args.master, risk_table, args.out)
+    print('Re-scored responses written to %s' % out_fp)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
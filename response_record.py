@@ -0,0 +1,122 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+response_record.py
+"""
+
+
+# The raw response of a field that was left empty.
+NOT_ANSWERED = 'Not Selected/ Not Answered'
+
+
+class ResponseRecord:
+    """
+    Class used to hold the extracted response to one questionnaire item. One
+    record carries both the scored row (extract_pdf_fields.COLUMNS) and the
+    raw row (extract_pdf_fields.COLUMNS_RAW), which share the BPCI ID, the
+    question and the response, so a PDF keeps one small slotted object per
+    item rather than two lists. Records are collected across a batch, and
+    data frames are built from them only where a table is needed.
+    """
+
+    __slots__ = ('bpci_id', 'item_id', 'question', 'response', 'weight', 'level', 'score',
+                 'global_number', 'topic_number', 'topic', 'raw_response')
+
+    def __init__(self, bpci_id, item_id, question, response, weight, level, score,
+                 global_number, topic_number, topic, raw_response):
+        """
+        Parameters: bpci_id: str
+                        The BPCI ID.
+                    item_id: float
+                        The item id.
+                    question: str
+                        The question text.
+                    response: str
+                        The parsed response.
+                    weight: float
+                        The response weight, NaN if not scored.
+                    level: float
+                        The risk level, NaN if not scored.
+                    score: float
+                        The risk score, NaN if not scored.
+                    global_number: int
+                        The global number of the item.
+                    topic_number: int
+                        The number of the item within its topic.
+                    topic: str
+                        The topic (group) of the item.
+                    raw_response: str
+                        The response of the raw data, NOT_ANSWERED for an
+                        empty field.
+        Returns:    None
+        """
+
+        self.bpci_id = bpci_id
+        self.item_id = item_id
+        self.question = question
+        self.response = response
+        self.weight = weight
+        self.level = level
+        self.score = score
+        self.global_number = global_number
+        self.topic_number = topic_number
+        self.topic = topic
+        self.raw_response = raw_response
+
+    @classmethod
+    def from_rows(cls, row, row_raw):
+        """
+        Parameters: row: list
+                        A row of the response data.
+                    row_raw: list
+                        The row of the raw response data of the same item,
+                        optionally followed by the item id.
+        Returns:    record: ResponseRecord
+        """
+
+        return cls(row[0], row[1], row[2], row[3], row[4], row[5], row[6],
+                   row_raw[1], row_raw[2], row_raw[3], row_raw[5])
+
+    def __reduce__(self):
+        # A plain tuple of the values, which pickles much faster (e.g. back
+        # from a worker process) than the default state of a slotted class.
+        return (ResponseRecord, self.values())
+
+    def __eq__(self, other):
+        return isinstance(other, ResponseRecord) and self.values() == other.values()
+
+    def __repr__(self):
+        return 'ResponseRecord(%s)' % ', '.join(repr(x) for x in self.values())
+
+    def values(self):
+        """
+        Parameters: None
+        Returns:    values: tuple
+                        The values of the slots, in order.
+        """
+
+        return (self.bpci_id, self.item_id, self.question, self.response, self.weight,
+                self.level, self.score, self.global_number, self.topic_number, self.topic,
+                self.raw_response)
+
+    def row(self):
+        """
+        Parameters: None
+        Returns:    row: list
+                        The row of the response data.
+        """
+
+        return [self.bpci_id, self.item_id, self.question, self.response, self.weight,
+                self.level, self.score]
+
+    def row_raw(self):
+        """
+        Parameters: None
+        Returns:    row: list
+                        The row of the raw response data.
+        """
+
+        return [self.bpci_id, self.global_number, self.topic_number, self.topic,
+                self.question, self.raw_response]
@@ -0,0 +1,201 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+result_cache.py
+"""
+
+
+import hashlib
+import os
+import pickle
+import tempfile
+import zlib
+
+
+# Marks the format of a cache entry, so older entries are never misread.
+CACHE_MAGIC = b'EPFC\x01'
+
+# Default maximum size of the cache directory, in bytes.
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+
+class ResultCache:
+    """
+    Class used to store the parsed responses of each PDF on disk, so that
+    re-running an extraction on a folder only parses the PDFs that changed.
+    Entries are keyed by a hash of the PDF bytes and of the questionnaire
+    version (QuestionnaireContext.fingerprint), so changing the info file or
+    the risk profile invalidates every entry. Each entry is a zlib-compressed
+    pickle of the parsed rows. When the cache grows past max_bytes, evict()
+    removes the least recently used entries; it scans the whole directory, so
+    it is called once per batch (by BatchExtractor.run), not once per entry.
+
+    The cache holds only a directory path, so it can be sent to worker
+    processes; writes are atomic, so workers may share one cache.
+    """
+
+    def __init__(self, cache_dir, max_bytes=CACHE_MAX_BYTES):
+        """
+        Parameters: cache_dir: str
+                        The path to the cache directory. Created if needed.
+                    max_bytes: int
+                        The maximum total size of the cache entries.
+        Returns:    None
+        """
+
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        if not os.path.exists(cache_dir):
+            os.makedirs(cache_dir)
+
+    def _path(self, key):
+        """
+        Parameters: key: str
+                        The entry key.
+        Returns:    path: str
+                        The path to the entry file.
+        """
+
+        return os.path.join(self.cache_dir, key[:2], key + '.bin')
+
+    def key(self, pdf_fp, fingerprint):
+        """
+        Parameters: pdf_fp: str
+                        The path to the PDF file.
+                    fingerprint: str
+                        The questionnaire version.
+        Returns:    key: str
+                        The cache key of the PDF.
+        """
+
+        h = hashlib.sha256(fingerprint.encode('utf-8'))
+        with open(pdf_fp, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def get(self, key):
+        """
+        Parameters: key: str
+                        The entry key.
+        Returns:    payload: object
+                        The cached payload, or None if there is no (valid)
+                        entry for key.
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                raw = f.read()
+        except OSError:
+            return None
+        if not raw.startswith(CACHE_MAGIC):
+            self.invalidate(key)
+            return None
+        try:
+            payload = pickle.loads(zlib.decompress(raw[len(CACHE_MAGIC):]))
+        except (zlib.error, pickle.UnpicklingError, EOFError):
+            self.invalidate(key)
+            return None
+        # Mark the entry as recently used, for eviction.
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return payload
+
+    def put(self, key, payload):
+        """
+        Parameters: key: str
+                        The entry key.
+                    payload: object
+                        The picklable payload to store.
+        Returns:    None
+        """
+
+        path = self._path(key)
+        folder = os.path.dirname(path)
+        if not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        raw = CACHE_MAGIC + zlib.compress(pickle.dumps(payload, pickle.HIGHEST_PROTOCOL))
+        # Write to a temporary file first, so a reader never sees half an entry.
+        fd, tmp = tempfile.mkstemp(dir=folder, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(raw)
+        os.replace(tmp, path)
+
+    def invalidate(self, key):
+        """
+        Parameters: key: str
+                        The entry key.
+        Returns:    None
+        """
+
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        for path, _, _ in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def evict(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        entries = self._entries()
+        total = sum(x[1] for x in entries)
+        if total <= self.max_bytes:
+            return
+        # Remove the least recently used entries first.
+        for path, size, _ in sorted(entries, key=lambda x: x[2]):
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def _entries(self):
+        """
+        Parameters: None
+        Returns:    entries: list
+                        The (path, size, mtime) of every cache entry.
+        """
+
+        entries = []
+        for folder in os.scandir(self.cache_dir):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                if not entry.name.endswith('.bin'):
+                    continue
+                try:
+                    st = entry.stat()
+                except OSError:
+                    continue
+                entries += [(entry.path, st.st_size, st.st_mtime)]
+        return entries
+
+    # Read-only properties.
+    @property
+    def cache_dir(self):
+        return self._cache_dir
+
+    @property
+    def max_bytes(self):
+        return self._max_bytes
@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+risk_profile_builder.py
+
+Build the risk profile used by extract_pdf_fields.py from the response
+weights of the ACQ data template, for any wave. The scripts
+get_risk_profile_wave2.py and get_risk_profile_STABLE_WAVE1.py call it with
+their wave's file and column names.
+"""
+
+
+import json
+
+from risk_table import dump_risk_profile, normalize_quotes
+
+
+# The columns kept from the template, besides the item id.
+OPTION_COLUMN = 'Response Option'
+WEIGHT_COLUMN = 'Response Weights'
+LEVEL_COLUMN = 'Risk Level'
+SCORE_COLUMN = 'risk_score'
+
+
+def normalize_options(options):
+    """
+    Parameters: options: pandas.Series
+                    The response option strings.
+    Returns:    options: pandas.Series
+                    The options as the parsed responses are looked up: with
+                    plain quotes, 'N/A' as 'NA', stripped and in lower case.
+    """
+
+    options = options.astype(str).map(normalize_quotes)
+    options = options.str.replace('N/A', 'NA', regex=False)
+    return options.str.strip().str.lower()
+
+
+def read_acq_template(template_fp, id_col='New ID v2',
+                      questions_sheet='Question Characteristics',
+                      responses_sheet='Response Weights'):
+    """
+    Parameters: template_fp: str
+                    The path to the ACQ data template workbook.
+                id_col: str
+                    The column of the item id (the id in info.json).
+                questions_sheet: str
+                    The sheet of the question level data.
+                responses_sheet: str
+                    The sheet of the response level data.
+    Returns:    df: pandas.DataFrame
+                    The response weights, with the risk level of each
+                    question merged in.
+    """
+
+    import pandas as pd
+    # Both sheets come from a single read of the workbook.
+    sheets = pd.read_excel(template_fp, sheet_name=[questions_sheet, responses_sheet])
+    questions = sheets[questions_sheet]
+    responses = sheets[responses_sheet]
+    # Keep the question columns that are not already in the responses.
+    cols = [id_col] + [x for x in questions.columns if x not in responses.columns]
+    return pd.merge(responses, questions[cols], how='left', on=id_col)
+
+
+def _number(x):
+    """
+    Parameters: x: float
+    Returns:    x: int or float
+                    The value, as an int if it is integral, so the JSON file
+                    reads as the template does.
+    """
+
+    x = float(x)
+    return int(x) if x.is_integer() else x
+
+
+def build_risk_profile(df, id_col='New ID v2', replacements=None, drop_zero_score=True):
+    """
+    Parameters: df: pandas.DataFrame
+                    The response weights, with columns id_col,
+                    'Response Option', 'Response Weights' and 'Risk Level'.
+                id_col: str
+                    The column of the item id (the id in info.json).
+                replacements: dict
+                    Optional corrections of the normalized response options,
+                    e.g. to match the option strings of the questionnaire.
+                drop_zero_score: bool
+                    If True, drop the options with a risk score of 0 (the not
+                    applicable or missing options), as in wave 2.
+    Returns:    profile: dict
+                    The risk profile, by float item id and then by normalized
+                    response option, mapping to the 'Response Weights',
+                    'Risk Level' and 'risk_score'.
+    """
+
+    # Drop invalid responses (no weight) and items that are not in the
+    # output (no id, e.g. Salesforce questions).
+    df = df[df[WEIGHT_COLUMN].notna() & df[id_col].notna()]
+    options = normalize_options(df[OPTION_COLUMN])
+    if replacements:
+        options = options.replace(replacements)
+    df = df.assign(**{'_id': df[id_col].astype(float), '_option': options,
+                      SCORE_COLUMN: df[WEIGHT_COLUMN] * df[LEVEL_COLUMN]})
+    if drop_zero_score:
+        df = df[df[SCORE_COLUMN] != 0]
+    profile = {}
+    cols = [WEIGHT_COLUMN, LEVEL_COLUMN, SCORE_COLUMN]
+    for item_id, group in df.groupby('_id', sort=True):
+        values = [[_number(x) for x in row] for row in group[cols].values.tolist()]
+        # As in a dict built row by row, a repeated option keeps its last row.
+        profile[item_id] = {option: dict(zip(cols, row))
+                            for option, row in zip(group['_option'], values)}
+    return profile
+
+
+def write_risk_profile(profile, fp):
+    """
+    Parameters: profile: dict
+                    The risk profile, as built by build_risk_profile.
+                fp: str
+                    The output path: a .json file, or any other extension
+                    for the compact binary form (see
+                    risk_table.dump_risk_profile). Both are read by
+                    QuestionnaireContext.
+    Returns:    None
+    """
+
+    if fp.lower().endswith('.json'):
+        with open(fp, 'w') as f:
+            json.dump(profile, f, sort_keys=True, indent=4)
+    else:
+        dump_risk_profile(profile, fp)
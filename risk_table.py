@@ -0,0 +1,223 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+risk_table.py
+"""
+
+
+import json
+import math
+import pickle
+import sys
+import zlib
+
+
+# Responses that are not applicable for risk scoring: they get a weight and a
+# score of 0 (3 in wave 1), at the risk level of the item.
+NA_RESPONSES = ['na; implementation is in progress', 'na; implementation not started', 'na']
+
+# The risk columns, in output order.
+RISK_COLUMNS = ['Response Weight', 'Risk Level', 'Risk Score']
+
+NAN_RISK = (math.nan, math.nan, math.nan)
+
+# Typographic quotes replaced by plain ones in the parsed responses and in
+# the response options of the risk profile, so the two agree.
+QUOTES = {'\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"'}
+
+# Marks the compact binary form of a risk profile.
+RISK_PROFILE_MAGIC = b'EPRP\x01'
+
+
+def dump_risk_profile(profile, fp):
+    """
+    Parameters: profile: dict
+                    The risk profile, by item id and then by response.
+                fp: str
+                    The path to the binary file: RISK_PROFILE_MAGIC followed
+                    by a zlib-compressed pickle of the profile.
+    Returns:    None
+    """
+
+    with open(fp, 'wb') as f:
+        f.write(RISK_PROFILE_MAGIC + zlib.compress(pickle.dumps(profile, pickle.HIGHEST_PROTOCOL)))
+
+
+def parse_risk_profile(raw):
+    """
+    Parameters: raw: bytes
+                    The contents of a JSON or binary risk profile file.
+    Returns:    profile: dict
+                    The risk profile, keyed by the float item id.
+    """
+
+    if raw.startswith(RISK_PROFILE_MAGIC):
+        profile = pickle.loads(zlib.decompress(raw[len(RISK_PROFILE_MAGIC):]))
+    else:
+        profile = json.loads(raw.decode('utf-8'))
+    # convert keys (id) to float to match id in info.json
+    return {float(k): v for k, v in profile.items()}
+
+
+def normalize_quotes(text):
+    """
+    Parameters: text: str
+    Returns:    text: str
+                    The text with plain quotes.
+    """
+
+    for old, new in QUOTES.items():
+        text = text.replace(old, new)
+    return text
+
+
+def normalize_response(response):
+    """
+    Parameters: response: str
+                    A parsed response.
+    Returns:    code: str
+                    The interned response code used as key of the risk table.
+    """
+
+    return sys.intern(response.lower())
+
+
+def _is_missing(response):
+    """
+    Parameters: response: str
+                    A parsed response.
+    Returns:    w: bool
+                    True if the response is a placeholder for a missing
+                    response, e.g. '---' (any length).
+    """
+
+    return set(response) == {'-'}
+
+
+class RiskTable:
+    """
+    Class holding a risk profile compiled for scoring: a flat table keyed by
+    (item id, normalized response code), with the weight, level and score as
+    floats, so a response is scored with a single lookup. A whole frame of
+    responses is scored with one vectorized join (score_frame), which is also
+    what re-scoring finished output against a new risk profile uses.
+    """
+
+    def __init__(self, risk_profile):
+        """
+        Parameters: risk_profile: dict
+                        The risk profile, by float item id and then by lower
+                        case response, as loaded by QuestionnaireContext.
+        Returns:    None
+        """
+
+        self._scores = {}
+        # The risk level of each item, used for the not applicable responses.
+        self._levels = {}
+        for item_id, responses in risk_profile.items():
+            item_id = float(item_id)
+            for response, risk in responses.items():
+                key = (item_id, normalize_response(response))
+                self._scores[key] = (float(risk['Response Weights']), float(risk['Risk Level']),
+                                     float(risk['risk_score']))
+                # The level of the first response, as for any valid response.
+                if item_id not in self._levels:
+                    self._levels[item_id] = float(risk['Risk Level'])
+        self._frame = None
+
+    @classmethod
+    def load(cls, risk_fp):
+        """
+        Parameters: risk_fp: str
+                        The path to a JSON or binary risk profile.
+        Returns:    table: RiskTable
+        """
+
+        with open(risk_fp, 'rb') as f:
+            return cls(parse_risk_profile(f.read()))
+
+    def score(self, item_id, response):
+        """
+        Parameters: item_id: float
+                        The item id.
+                    response: str
+                        The parsed response.
+        Returns:    risk: tuple
+                        The 'Response Weight', 'Risk Level' and 'Risk Score',
+                        NaN if the item is not scored or the response is
+                        empty. Raises KeyError for a response of a scored
+                        item that is not in the risk profile.
+        """
+
+        if len(response) == 0 or item_id not in self._levels:
+            return NAN_RISK
+        code = normalize_response(response)
+        if _is_missing(response) or code in NA_RESPONSES:
+            return (0.0, self._levels[item_id], 0.0)
+        return self._scores[(item_id, code)]
+
+    def frame(self):
+        """
+        Parameters: None
+        Returns:    df: pandas.DataFrame
+                        The table as a frame with columns '_id', '_code' and
+                        RISK_COLUMNS, built once.
+        """
+
+        if self._frame is None:
+            import pandas as pd
+            keys = list(self._scores.keys())
+            vals = list(self._scores.values())
+            df = pd.DataFrame(vals, columns=RISK_COLUMNS)
+            df.insert(0, '_code', [x[1] for x in keys])
+            df.insert(0, '_id', [x[0] for x in keys])
+            self._frame = df
+        return self._frame
+
+    def score_frame(self, df, id_col='ID', response_col='Response'):
+        """
+        Parameters: df: pandas.DataFrame
+                        The responses, one per row.
+                    id_col: str
+                        The column of the item ids.
+                    response_col: str
+                        The column of the parsed responses.
+        Returns:    df: pandas.DataFrame
+                        A copy of df with RISK_COLUMNS filled in by a single
+                        join on (item id, normalized response). Unlike
+                        score(), a response that is not in the risk profile
+                        gets NaN rather than raising.
+        """
+
+        import numpy as np
+        import pandas as pd
+        response = df[response_col].fillna('').astype(str)
+        ids = df[id_col].astype(float)
+        keys = pd.DataFrame({'_id': ids.values, '_code': response.str.lower().values})
+        # A left merge keeps the order of the responses.
+        risk = keys.merge(self.frame(), how='left', on=['_id', '_code'])
+        levels = ids.map(self._levels).values
+        not_applicable = response.str.fullmatch(r'-+').values | keys['_code'].isin(NA_RESPONSES).values
+        not_applicable &= ~np.isnan(levels)
+        blank = (response == '').values | np.isnan(levels)
+        out = df.copy()
+        for col in RISK_COLUMNS:
+            vals = risk[col].values.copy()
+            if col == 'Risk Level':
+                vals[not_applicable] = levels[not_applicable]
+            else:
+                vals[not_applicable] = 0.0
+            vals[blank] = np.nan
+            out[col] = vals
+        return out
+
+    # Read-only properties.
+    @property
+    def levels(self):
+        return self._levels
+
+    @property
+    def scores(self):
+        return self._scores
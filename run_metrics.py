@@ -0,0 +1,219 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+run_metrics.py
+
+Per-stage wall times and counters of an extraction run. ExtractPdfFields
+records its own stages (reading the fields, normalizing the responses,
+scoring, writing the files) in a RunMetrics of its own, which travels back
+from the worker process with the parsed PDF; BatchExtractor merges them into
+the metrics of the run and adds its own stages. The result is exported as a
+JSON run report, or logged as one structured record.
+"""
+
+
+from contextlib import contextmanager
+import json
+import logging
+import time
+
+
+# The name of the root logger of the extraction modules.
+LOGGER_NAME = 'bpci_extract'
+
+
+def get_logger(name):
+    """
+    Parameters: name: str
+                    The module name.
+    Returns:    logger: logging.Logger
+                    The logger of the module, below the LOGGER_NAME logger,
+                    so that configure_logging sets the level of all of them.
+    """
+
+    return logging.getLogger(LOGGER_NAME + '.' + name)
+
+
+class TextFormatter(logging.Formatter):
+    """
+    Class used to format log records as text lines, with the metrics passed
+    with extra={'metrics': ...} appended as JSON.
+    """
+
+    def format(self, record):
+        """
+        Parameters: record: logging.LogRecord
+        Returns:    line: str
+        """
+
+        line = super().format(record)
+        if hasattr(record, 'metrics'):
+            line += ' ' + json.dumps(record.metrics)
+        return line
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Class used to format log records as one JSON object per line, for log
+    collectors. The metrics passed with extra={'metrics': ...} are included.
+    """
+
+    def format(self, record):
+        """
+        Parameters: record: logging.LogRecord
+        Returns:    line: str
+        """
+
+        entry = {'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+                 'level': record.levelname, 'logger': record.name,
+                 'message': record.getMessage()}
+        if hasattr(record, 'metrics'):
+            entry['metrics'] = record.metrics
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry)
+
+
+def configure_logging(level=logging.INFO, json_format=False, stream=None):
+    """
+    Parameters: level: int or str
+                    The log level of the extraction modules, e.g. 'DEBUG' to
+                    log every scored field.
+                json_format: bool
+                    If True, log one JSON object per line.
+                stream: file
+                    The stream to log to. Defaults to stderr.
+    Returns:    logger: logging.Logger
+                    The LOGGER_NAME logger.
+    """
+
+    logger = logging.getLogger(LOGGER_NAME)
+    if isinstance(level, str):
+        level = getattr(logging, level.upper())
+    logger.setLevel(level)
+    handler = logging.StreamHandler(stream)
+    if json_format:
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(TextFormatter('%(asctime)s %(levelname)s %(message)s'))
+    # Configuring twice replaces the handler instead of logging twice.
+    for x in list(logger.handlers):
+        logger.removeHandler(x)
+    logger.addHandler(handler)
+    logger.propagate = False
+    return logger
+
+
+class RunMetrics:
+    """
+    Class used to accumulate the wall time of named stages and named counters
+    (bytes read, fields, cache hits, ...). It holds only two dicts, so it is
+    cheap to pickle back from a worker process, and merging the metrics of
+    every PDF gives the totals of the run. The stages of the PDFs run in
+    parallel, so their sum can exceed the wall time of the run ('total').
+    """
+
+    def __init__(self):
+        """
+        Parameters: None
+        Returns:    None
+        """
+
+        self._seconds = {}
+        self._counts = {}
+
+    @contextmanager
+    def stage(self, name):
+        """
+        Parameters: name: str
+                        The stage name. The wall time of the with block is
+                        added to the stage.
+        Returns:    None
+        """
+
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - t0)
+
+    def add_time(self, name, seconds):
+        """
+        Parameters: name: str
+                        The stage name.
+                    seconds: float
+                        The wall time to add.
+        Returns:    None
+        """
+
+        self._seconds[name] = self._seconds.get(name, 0.0) + seconds
+
+    def count(self, name, n=1):
+        """
+        Parameters: name: str
+                        The counter name.
+                    n: int
+                        The amount to add.
+        Returns:    None
+        """
+
+        self._counts[name] = self._counts.get(name, 0) + n
+
+    def merge(self, other):
+        """
+        Parameters: other: RunMetrics
+                        Metrics to add to these, e.g. those of one PDF.
+        Returns:    None
+        """
+
+        for name, seconds in other.seconds.items():
+            self.add_time(name, seconds)
+        for name, n in other.counts.items():
+            self.count(name, n)
+
+    def as_dict(self):
+        """
+        Parameters: None
+        Returns:    metrics: dict
+                        The stage times in seconds and the counters, ready
+                        for json.dump.
+        """
+
+        return {'stages': {k: round(v, 6) for k, v in sorted(self._seconds.items())},
+                'counts': dict(sorted(self._counts.items()))}
+
+    def write_report(self, fp, **info):
+        """
+        Parameters: fp: str
+                        The path to the JSON run report.
+                    info: dict
+                        Other entries of the report, e.g. the run timestamp.
+        Returns:    None
+        """
+
+        report = dict(info)
+        report.update(self.as_dict())
+        with open(fp, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    def log(self, logger, message='run metrics', level=logging.INFO):
+        """
+        Parameters: logger: logging.Logger
+                    message: str
+                    level: int
+        Returns:    None
+        """
+
+        if logger.isEnabledFor(level):
+            logger.log(level, message, extra={'metrics': self.as_dict()})
+
+    # Read-only properties.
+    @property
+    def counts(self):
+        return self._counts
+
+    @property
+    def seconds(self):
+        return self._seconds
@@ -18,7 +18,8 @@ setup(
     version = "0.1",
     description = "A tool to automatically extract information from PDF and export as CSV/Excel tables",
     options={"build_exe": build_exe_options},
-    executables = [Executable("GUI.py", base=base)])
+    executables = [Executable("GUI.py", base=base),
+                   Executable("extract_cli.py")])
 
 
 
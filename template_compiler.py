@@ -0,0 +1,210 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+template_compiler.py
+
+Compile the info file of a questionnaire, checked against its items CSV
+file, together with the radio button mapping and the risk profile, into one
+versioned binary template that QuestionnaireContext (and so ExtractPdfFields
+and batch_extract.py) loads in place of the JSON info file. This replaces the
+round trip of make_json.py through temp_json.xlsx.
+
+With the blank questionnaire PDF (-p), the radio button mapping is derived
+from the PDF instead of taken from RADIO_BUTTON_MAPPING.
+
+Usage: python template_compiler.py info_wave2.json -i items.csv
+           -r risk_profile_wave2.json [-p questionnaire.pdf] -o wave2.qtpl
+"""
+
+
+import argparse
+import hashlib
+import json
+import pickle
+import zlib
+
+from field_map_discovery import FieldMapDiscovery, read_items
+from questionnaire_context import (QuestionnaireContext, RADIO_BUTTON_MAPPING,
+                                   RISK_PROFILE_FILE_PATH, TEMPLATE_MAGIC, TEMPLATE_VERSION)
+from risk_table import normalize_quotes
+
+
+def _normalize_text(text):
+    """
+    Parameters: text: str
+    Returns:    text: str
+                    The text with plain quotes and single spaces, as the
+                    question texts of the info files were edited by hand.
+    """
+
+    return ' '.join(normalize_quotes(text).split())
+
+
+def validate_info(info, items):
+    """
+    Parameters: info: dict
+                    The info map, as loaded by QuestionnaireContext.
+                items: dict
+                    The item information, by num (see
+                    field_map_discovery.read_items).
+    Returns:    errors: list
+                    A message for each entry that does not agree with the
+                    items, each item without an entry, and each id or num
+                    used twice.
+    """
+
+    errors = []
+    keys_by_num = {}
+    keys_by_id = {}
+    for key, val in info.items():
+        num = val.get('num')
+        if num not in items:
+            errors += ['%s: num %r is not in the items.' % (key, num)]
+            continue
+        if num in keys_by_num:
+            errors += ['%s: num %r is also used by %s.' % (key, num, keys_by_num[num])]
+        keys_by_num[num] = key
+        item = items[num]
+        for col in ['local', 'group', 'id']:
+            if val.get(col, '') != item[col]:
+                errors += ['%s: %s is %r, item %d has %r.' % (key, col, val.get(col), num, item[col])]
+        if _normalize_text(str(val.get('text'))) != _normalize_text(item['text']):
+            errors += ['%s: text differs from item %d.' % (key, num)]
+        if val.get('id') not in [None, '']:
+            if val['id'] in keys_by_id:
+                errors += ['%s: id %r is also used by %s.' % (key, val['id'], keys_by_id[val['id']])]
+            keys_by_id[val['id']] = key
+    for num in sorted(set(items) - set(keys_by_num)):
+        errors += ['Item %d (%s) has no field.' % (num, items[num]['text'][:60])]
+    return errors
+
+
+def compile_template(info_fp, items_fp, risk_fp=RISK_PROFILE_FILE_PATH, radio_button=None,
+                     template_pdf=None):
+    """
+    Parameters: info_fp: str
+                    The path to the JSON info file.
+                items_fp: str
+                    The path to the items CSV file.
+                risk_fp: str
+                    The path to the JSON (or binary) risk profile.
+                radio_button: dict
+                    The radio button mapping. Defaults to
+                    RADIO_BUTTON_MAPPING.
+                template_pdf: str
+                    The path to the blank questionnaire PDF. If given, the
+                    radio button mapping is derived from the appearance
+                    states and /Opt arrays of its radio groups, with the
+                    labels of radio_button for the groups without /Opt.
+    Returns:    template: dict
+                    The info map, sorted by id (the entries without an id
+                    last), the radio button mapping of its radio groups and
+                    the risk profile.
+    """
+
+    if template_pdf is not None:
+        radio_button = derive_radio_mapping(template_pdf, info_fp, items_fp, radio_button)
+    context = QuestionnaireContext(info_fp, risk_fp, radio_button)
+    errors = validate_info(context.info, read_items(items_fp))
+    if len(errors) > 0:
+        msg = 'Info file %s does not agree with %s:\n%s' % (info_fp, items_fp, '\n'.join(errors))
+        raise ValueError(msg)
+
+    def order(entry):
+        item_id = entry[1].get('id')
+        if isinstance(item_id, (int, float)):
+            return (0, item_id, entry[1]['num'])
+        return (1, 0, entry[1]['num'])
+
+    info = dict(sorted(context.info.items(), key=order))
+    # The default mapping is that of wave 2; keep only the groups of this
+    # questionnaire, as derive_radio_mapping does.
+    radio_button = {k: v for k, v in context.dict_radio_button.items() if k in info}
+    return {'info': info, 'radio_button': radio_button, 'risk_profile': context.risk_profile}
+
+
+def derive_radio_mapping(template_pdf, info_fp, items_fp, fallback=None):
+    """
+    Parameters: template_pdf: str
+                    The path to the blank questionnaire PDF.
+                info_fp: str
+                    The path to the JSON info file.
+                items_fp: str
+                    The path to the items CSV file.
+                fallback: dict
+                    The mapping whose labels are used for the radio groups
+                    without an /Opt array. Defaults to RADIO_BUTTON_MAPPING.
+    Returns:    mapping: dict
+                    The option label of each code, by radio group key, for
+                    the radio groups of the info file.
+    """
+
+    if fallback is None:
+        fallback = RADIO_BUTTON_MAPPING
+    with open(info_fp, 'r', encoding='utf-8') as f:
+        keys = set(json.load(f).keys())
+    mapping, unresolved = FieldMapDiscovery(template_pdf, items_fp).radio_mapping(fallback)
+    unresolved = [x for x in unresolved if x[0] in keys]
+    if len(unresolved) > 0:
+        msg = 'Radio buttons of %s without a label (add them to the mapping):\n%s' % (
+            template_pdf, '\n'.join('%s %s: %s' % x for x in unresolved))
+        raise ValueError(msg)
+    return {k: v for k, v in mapping.items() if k in keys}
+
+
+def template_digest(template):
+    """
+    Parameters: template: dict
+                    The template, as built by compile_template.
+    Returns:    digest: bytes
+                    The SHA-256 digest of the canonical form of the template
+                    (JSON with sorted keys), so equal templates have equal
+                    digests whatever the order their tables were built in.
+    """
+
+    canonical = json.dumps(template, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode('utf-8')).digest()
+
+
+def write_template(template, fp):
+    """
+    Parameters: template: dict
+                    The template, as built by compile_template.
+                fp: str
+                    The output path.
+    Returns:    digest: str
+                    The hex SHA-256 digest of the template, which becomes
+                    the questionnaire fingerprint (cache keys, run reports).
+    """
+
+    payload = pickle.dumps(template, pickle.HIGHEST_PROTOCOL)
+    digest = template_digest(template)
+    with open(fp, 'wb') as f:
+        f.write(TEMPLATE_MAGIC + bytes([TEMPLATE_VERSION]) + digest
+                + zlib.crc32(payload).to_bytes(4, 'big') + payload)
+    return digest.hex()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compile a questionnaire template.')
+    parser.add_argument('info', help='the JSON info file')
+    parser.add_argument('-i', '--items', default='./items.csv', help='the items CSV file')
+    parser.add_argument('-r', '--risk-profile', default=RISK_PROFILE_FILE_PATH,
+                        help='the JSON (or binary) risk profile')
+    parser.add_argument('-p', '--pdf', default=None,
+                        help='the blank questionnaire PDF, to derive the radio button mapping from')
+    parser.add_argument('-o', '--output', required=True, help='the compiled template')
+    args = parser.parse_args()
+    try:
+        template = compile_template(args.info, args.items, args.risk_profile,
+                                    template_pdf=args.pdf)
+    except ValueError as e:
+        parser.exit(1, '%s\n' % e)
+    digest = write_template(template, args.output)
+    print('%d fields written to %s (sha256 %s)' % (len(template['info']), args.output, digest))
+
+
+if __name__ == '__main__':
+    main()
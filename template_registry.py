@@ -0,0 +1,238 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+template_registry.py
+"""
+
+
+import hashlib
+import json
+import os
+
+from acroform_reader import read_fields
+from questionnaire_context import (QuestionnaireContext, RISK_PROFILE_FILE_PATH, TEMPLATE_MAGIC,
+                                   parse_template)
+
+
+# The least share of field keys (intersection over union) that a PDF and a
+# template have in common for the PDF to be routed to the template.
+MIN_SIMILARITY = 0.5
+
+# A PDF is not routed if the second best template is this close to the best.
+AMBIGUITY_MARGIN = 0.05
+
+
+def template_keys(info_fp):
+    """
+    Parameters: info_fp: str
+                    The path to the JSON info file or compiled template.
+    Returns:    keys: frozenset
+                    The PDF field keys of the template.
+    """
+
+    with open(info_fp, 'rb') as f:
+        raw = f.read()
+    if raw.startswith(TEMPLATE_MAGIC):
+        return frozenset(parse_template(raw)[0]['info'].keys())
+    return frozenset(json.loads(raw.decode('utf-8')).keys())
+
+
+def key_fingerprint(keys):
+    """
+    Parameters: keys: iterable
+                    Field keys.
+    Returns:    fingerprint: str
+                    The hex SHA-256 digest of the sorted set of keys.
+    """
+
+    return hashlib.sha256('\n'.join(sorted(set(keys))).encode('utf-8')).hexdigest()
+
+
+class TemplateEntry:
+    """
+    Class holding one template of a TemplateRegistry: its name, which is also
+    the name of its output folder, its field keys and its questionnaire
+    context.
+    """
+
+    def __init__(self, name, info_fp, risk_fp, keys):
+        """
+        Parameters: name: str
+                    info_fp: str
+                        The path to the JSON info file or compiled template.
+                    risk_fp: str
+                        The path to the risk profile of a JSON info file.
+                    keys: frozenset
+                        The field keys of the template.
+        Returns:    None
+        """
+
+        self._name = name
+        self._info_file_path = info_fp
+        self._risk_file_path = risk_fp
+        self._keys = keys
+        self._fingerprint = key_fingerprint(keys)
+        self._context = None
+
+    # Read-only properties.
+    @property
+    def context(self):
+        # Loaded when the first PDF is routed to the template.
+        if self._context is None:
+            self._context = QuestionnaireContext(self.info_file_path, self.risk_file_path)
+        return self._context
+
+    @property
+    def fingerprint(self):
+        return self._fingerprint
+
+    @property
+    def info_file_path(self):
+        return self._info_file_path
+
+    @property
+    def keys(self):
+        return self._keys
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def risk_file_path(self):
+        return self._risk_file_path
+
+
+class TemplateRegistry:
+    """
+    Class used to tell which questionnaire template a PDF was filled in on,
+    from its field keys alone. Each template is fingerprinted by its set of
+    keys, and an inverted index maps every key to the templates that use it,
+    so a PDF is matched by one lookup of its fingerprint or, if its keys
+    differ slightly from the template (extra or missing fields), by counting
+    the shared keys of each template through the index.
+    """
+
+    def __init__(self, min_similarity=MIN_SIMILARITY, margin=AMBIGUITY_MARGIN):
+        """
+        Parameters: min_similarity: float
+                        The least intersection over union of the keys of a
+                        PDF and a template for a match.
+                    margin: float
+                        The least lead of the best template over the second
+                        best for a match.
+        Returns:    None
+        """
+
+        self._min_similarity = min_similarity
+        self._margin = margin
+        self._entries = []
+        self._by_fingerprint = {}
+        self._index = {}
+
+    def register(self, info_fp, risk_fp=RISK_PROFILE_FILE_PATH, name=None):
+        """
+        Parameters: info_fp: str
+                        The path to the JSON info file or compiled template.
+                    risk_fp: str
+                        The path to the risk profile of a JSON info file.
+                        A compiled template carries its own.
+                    name: str
+                        The name of the template. Defaults to the file name
+                        without its extension.
+        Returns:    entry: TemplateEntry
+        """
+
+        keys = template_keys(info_fp)
+        if name is None:
+            name = os.path.splitext(os.path.basename(info_fp))[0]
+        if name in [x.name for x in self._entries]:
+            raise ValueError('A template named %s is already registered.' % name)
+        entry = TemplateEntry(name, info_fp, risk_fp, keys)
+        # Templates with the same keys cannot be told apart by the PDFs.
+        if entry.fingerprint in self._by_fingerprint:
+            other = self._entries[self._by_fingerprint[entry.fingerprint]]
+            msg = 'Template %s has the same field keys as %s.' % (info_fp, other.info_file_path)
+            raise ValueError(msg)
+        self._by_fingerprint[entry.fingerprint] = len(self._entries)
+        for key in keys:
+            self._index.setdefault(key, []).append(len(self._entries))
+        self._entries += [entry]
+        return entry
+
+    def match(self, keys):
+        """
+        Parameters: keys: iterable
+                        The field keys of a PDF.
+        Returns:    entry: TemplateEntry
+                        The matching template, or None if no template is
+                        close enough or two are equally close.
+                    similarity: float
+                        The intersection over union of the keys of the PDF
+                        and of the best template.
+        """
+
+        keys = set(keys)
+        i = self._by_fingerprint.get(key_fingerprint(keys))
+        if i is not None:
+            return self._entries[i], 1.0
+        shared = [0] * len(self._entries)
+        for key in keys:
+            for i in self._index.get(key, []):
+                shared[i] += 1
+        scores = sorted(((shared[i] / (len(keys) + len(x.keys) - shared[i]), i)
+                         for i, x in enumerate(self._entries) if shared[i] > 0), reverse=True)
+        if len(scores) == 0:
+            return None, 0.0
+        best, i = scores[0]
+        if best < self._min_similarity:
+            return None, best
+        if len(scores) > 1 and best - scores[1][0] < self._margin:
+            return None, best
+        return self._entries[i], best
+
+    def route(self, pdf_fps, fast_read=True):
+        """
+        Parameters: pdf_fps: list
+                        The paths to the PDF files.
+                    fast_read: bool
+                        If True, read the form fields with the lightweight
+                        AcroFormReader, falling back to PyPDF3 as needed.
+        Returns:    routes: dict
+                        The PDF files of each template, by template name, in
+                        the order of registration and then of pdf_fps.
+                    unmatched: list
+                        The PDF files that match no template, with the
+                        reason.
+        """
+
+        routes = {x.name: [] for x in self._entries}
+        unmatched = []
+        for pdf_fp in pdf_fps:
+            try:
+                fields = read_fields(pdf_fp, fast_read) or {}
+            except Exception as e:
+                unmatched += [(pdf_fp, 'unreadable: %s' % e)]
+                continue
+            entry, similarity = self.match(fields.keys())
+            if entry is None:
+                unmatched += [(pdf_fp, 'no single template matches (best similarity %.2f)'
+                               % similarity)]
+                continue
+            routes[entry.name] += [pdf_fp]
+        return {k: v for k, v in routes.items() if len(v) > 0}, unmatched
+
+    # Read-only properties.
+    @property
+    def entries(self):
+        return self._entries
+
+    @property
+    def margin(self):
+        return self._margin
+
+    @property
+    def min_similarity(self):
+        return self._min_similarity
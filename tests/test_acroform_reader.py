@@ -0,0 +1,80 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+test_acroform_reader.py
+
+Usage: python -m pytest tests
+"""
+
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path[:0] = [ROOT]
+
+from acroform_reader import AcroFormReader
+
+
+# A form with one field three levels deep: Section > Question > two radio
+# widgets, next to a plain text field.
+NESTED_FORM = [
+    '<< /Type /Catalog /Pages 2 0 R /AcroForm << /Fields [4 0 R 8 0 R] >> >>',
+    '<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+    '<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Annots [6 0 R 7 0 R 8 0 R] >>',
+    '<< /T (Section) /Kids [5 0 R] >>',
+    '<< /T (Question) /Parent 4 0 R /FT /Btn /Ff 49152 /V /1 /Kids [6 0 R 7 0 R] >>',
+    '<< /Type /Annot /Subtype /Widget /Parent 5 0 R /Rect [0 0 10 10] >>',
+    '<< /Type /Annot /Subtype /Widget /Parent 5 0 R /Rect [20 0 30 10] >>',
+    '<< /Type /Annot /Subtype /Widget /T (Name) /FT /Tx /V (Org) /Rect [0 20 100 30] >>',
+]
+
+
+def write_pdf(fp, objects):
+    """
+    Parameters: fp: str
+                    The path to the PDF file.
+                objects: list
+                    The objects, numbered from 1.
+    Returns:    None
+    """
+
+    buf = b'%PDF-1.7\n'
+    offsets = []
+    for i, obj in enumerate(objects, 1):
+        offsets += [len(buf)]
+        buf += ('%d 0 obj\n%s\nendobj\n' % (i, obj)).encode('latin-1')
+    xref = len(buf)
+    buf += ('xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)).encode('ascii')
+    for offset in offsets:
+        buf += ('%010d 00000 n \n' % offset).encode('ascii')
+    buf += ('trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+            % (len(objects) + 1, xref)).encode('ascii')
+    with open(fp, 'wb') as f:
+        f.write(buf)
+
+
+class TestAcroFormReader(unittest.TestCase):
+
+    def test_nested_fields(self):
+        # A field tree loop error here would make read_fields fall back to
+        # PyPDF3 for every form with nested fields.
+        with tempfile.TemporaryDirectory() as tmp:
+            fp = os.path.join(tmp, 'nested.pdf')
+            write_pdf(fp, NESTED_FORM)
+            with AcroFormReader(fp) as reader:
+                fields = reader.get_fields()
+            import PyPDF3
+            expected = PyPDF3.PdfFileReader(fp).getFields()
+        self.assertEqual(list(fields), list(expected))
+        self.assertEqual(list(fields), ['Question', 'Section', 'Name'])
+        self.assertEqual(fields['Question']['/V'], '/1')
+        self.assertEqual(fields['Name']['/V'], 'Org')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+
+"""
+Sun 18 Oct 2026
+
+test_template_routing.py
+
+Routing of a mixed-wave folder through extract_cli.py.
+
+Usage: python -m pytest tests
+"""
+
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'benchmarks')]
+
+import extract_cli
+from synthetic_pdfs import SyntheticQuestionnaire
+from template_compiler import compile_template, write_template
+
+
+# The info, items and risk profile files of each wave.
+WAVES = {'wave1': ('INFO_STABLE_WAVE1.json', 'ITEMS_STABLE_WAVE1.csv',
+                   'RISK_PROFILE_STABLE_WAVE1.json'),
+         'wave2': ('info_wave2.json', 'items.csv', 'risk_profile_wave2.json')}
+
+
+class TestTemplateRouting(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.pdf_fp = os.path.join(self.tmp, 'pdf')
+        self.templates = []
+        for i, (name, (info, items, risk)) in enumerate(sorted(WAVES.items())):
+            info, items, risk = [os.path.join(ROOT, x) for x in [info, items, risk]]
+            fp = os.path.join(self.tmp, name + '.qtpl')
+            write_template(compile_template(info, items, risk), fp)
+            self.templates += [fp]
+            SyntheticQuestionnaire(info, risk).write_many(self.pdf_fp, 3, start=10 * i)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def run_cli(self, *argv):
+        report_fp = os.path.join(self.tmp, 'report.json')
+        argv = [self.pdf_fp, '-o', os.path.join(self.tmp, 'out'), '--output', 'master',
+                '-w', '1', '--now', 'T', '--log-level', 'error', '--report', report_fp] + list(argv)
+        code = extract_cli.main(argv)
+        with open(report_fp, 'r') as f:
+            return code, json.load(f)
+
+    def test_mixed_waves(self):
+        argv = []
+        for fp in self.templates:
+            argv += ['-j', fp]
+        code, report = self.run_cli(*argv)
+        self.assertEqual(code, 0, report.get('traceback'))
+        self.assertEqual(report['unmatched'], [])
+        self.assertEqual({k: v['n_processed'] for k, v in report['templates'].items()},
+                         {'wave1': 3, 'wave2': 3})
+        for name in WAVES:
+            master_fp = os.path.join(self.tmp, 'out', name, 'response_master_T.csv')
+            with open(master_fp, 'r', encoding='utf-8') as f:
+                bpids = {x.split(',')[0] for x in f.readlines()[1:]}
+            self.assertEqual(len(bpids), 3)
+
+    def test_json_info_files_rejected(self):
+        argv = []
+        for info, _, _ in WAVES.values():
+            argv += ['-j', os.path.join(ROOT, info)]
+        with self.assertRaises(SystemExit):
+            self.run_cli(*argv)
+
+
+if __name__ == '__main__':
+    unittest.main()